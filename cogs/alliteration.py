@@ -7,9 +7,12 @@ from discord.ext import commands
 import aiofiles
 import logging
 from typing import Dict, Set, Optional, List
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 import json
 
+import nyxsessions
+from nyxoutbound import Priority
+
 try:
     from anthropic import Anthropic
     ANTHROPIC_AVAILABLE = True
@@ -21,6 +24,7 @@ except ImportError:
 NYX_COLOR = 0x76b887
 STORAGE_PATH = os.getenv("STORAGE_PATH", "./nyxnotes")
 os.makedirs(STORAGE_PATH, exist_ok=True)
+GAME_DURATION = 30  # Seconds players have to submit
 
 class AlliterationGame(commands.Cog):
     """
@@ -34,6 +38,7 @@ class AlliterationGame(commands.Cog):
         self.logger = logging.getLogger("AlliterationGame")
         self.active_games = {}  # channel_id: game_data
         self.topic_shuffle_file = os.path.join(STORAGE_PATH, 'alliteration_topics.json')
+        self.snapshot_file = os.path.join(STORAGE_PATH, 'snapshots', 'alliteration_games.json')
         
         # Define all available topics with categories
         self.all_topics = [
@@ -98,6 +103,9 @@ class AlliterationGame(commands.Cog):
             # Initialize topic shuffle system
             await self.initialize_topic_shuffle()
             
+            # Resume games snapshotted by the previous shutdown or reload
+            await self.restore_games()
+            
             self.logger.info("AlliterationGame cog loaded successfully")
             
         except Exception as e:
@@ -105,35 +113,42 @@ class AlliterationGame(commands.Cog):
             raise
 
     async def cog_unload(self):
-        """Called when cog is unloaded - cleanup active games"""
+        """Called when cog is unloaded - snapshot active games so cog_load can resume them"""
         try:
             self.logger.info("AlliterationGame cog unloading...")
             
-            # End any active games with delays for rate limiting
-            for channel_id in list(self.active_games.keys()):
+            # Only when there is something to resume - a snapshot file makes the next start load this cog eagerly
+            if self.active_games:
                 try:
-                    channel = self.bot.get_channel(channel_id)
-                    if channel:
-                        embed = discord.Embed(
-                            title="Game Ended",
-                            description="Alliteration game ended due to bot restart.",
-                            color=self.nyx_color
-                        )
-                        await self.bot.safe_send(channel, embed=embed)
-                    
-                    # Rate limiting delay
-                    await asyncio.sleep(0.5)
+                    await asyncio.to_thread(nyxsessions.save_snapshot, self.snapshot_file, self.active_games)
+                    self.logger.info(f"Snapshotted {len(self.active_games)} alliteration games")
                 except Exception as e:
-                    self.logger.error(f"Error ending game in channel {channel_id}: {e}")
-                finally:
-                    # Always remove from active games
-                    self.active_games.pop(channel_id, None)
+                    self.logger.error(f"Error snapshotting alliteration games: {e}")
+            # Stops this instance's collection loops; the reloaded cog resumes them
+            self.active_games.clear()
             
             self.logger.info("AlliterationGame cog unloaded successfully")
             
         except Exception as e:
             self.logger.error(f"Error during AlliterationGame cog unload: {e}")
 
+    async def restore_games(self):
+        """Restore games from the warm-restart snapshot and restart their collection loops."""
+        try:
+            snapshot = await asyncio.to_thread(nyxsessions.load_snapshot, self.snapshot_file)
+        except Exception as e:
+            self.logger.error(f"Error loading alliteration snapshot: {e}")
+            return
+        
+        for channel_id, game in (snapshot or {}).items():
+            channel = self.bot.get_channel(channel_id)
+            if not channel or "ends_at" not in game:
+                continue
+            self.active_games[channel_id] = game
+            asyncio.create_task(self.run_game(channel))
+        if self.active_games:
+            self.logger.info(f"Restored {len(self.active_games)} alliteration games from snapshot")
+
     async def initialize_topic_shuffle(self):
         """Initialize the topic shuffling system"""
         try:
@@ -316,7 +331,7 @@ Respond with only "VALID" or "INVALID" followed by a brief reason."""
                     "**How to play:**\n"
                     "• Submit valid alliterative phrases for the topic\n"
                     "• Each valid submission earns **5 🪙**\n"
-                    "• You have **30 seconds** to submit as many as you can!\n"
+                    f"• You have **{GAME_DURATION} seconds** to submit as many as you can!\n"
                     "• Be creative and appropriate!"
                 ),
                 color=self.nyx_color
@@ -324,76 +339,15 @@ Respond with only "VALID" or "INVALID" followed by a brief reason."""
             game_embed.set_footer(text="Timer starts now! Submit your alliterations!")
             
             result = await self.bot.safe_send(ctx.channel, embed=game_embed)
-            if not result:
-                await self.bot.safe_send(ctx.channel, f"🎭 Alliteration Game: Submit {topic_info['description']} - 30 seconds starting now!")
+            if result.should_fallback:
+                await self.bot.safe_send(ctx.channel, f"🎭 Alliteration Game: Submit {topic_info['description']} - {GAME_DURATION} seconds starting now!")
 
-            # Collect submissions for 30 seconds
-            timeout_duration = 30
-            end_time = asyncio.get_event_loop().time() + timeout_duration
-            
-            def check(msg):
-                # Only messages in same channel, from real users, not bots
-                if (msg.channel != ctx.channel or msg.author.bot):
-                    return False
-                
-                # Don't process if game was cancelled
-                if ctx.channel.id not in self.active_games:
-                    return False
-                
-                return True  # Let all messages through for validation
-
-            # Game collection loop
-            while asyncio.get_event_loop().time() < end_time and ctx.channel.id in self.active_games:
-                remaining_time = end_time - asyncio.get_event_loop().time()
-                if remaining_time <= 0:
-                    break
-                
-                try:
-                    msg = await self.bot.wait_for('message', timeout=remaining_time, check=check)
-                    
-                    # Skip if game was ended
-                    if ctx.channel.id not in self.active_games:
-                        break
-                    
-                    submission = msg.content.strip()
-                    user_id = msg.author.id
-                    
-                    # Validate submission using AI or basic validation
-                    is_valid = await self.validate_alliteration_with_ai(submission, topic_info)
-                    
-                    if is_valid:
-                        # Double-check game still exists (race condition protection)
-                        if ctx.channel.id not in self.active_games:
-                            break
-                        
-                        game = self.active_games[ctx.channel.id]
-                        
-                        # Initialize user data if needed
-                        if user_id not in game["user_submissions"]:
-                            game["user_submissions"][user_id] = set()
-                        
-                        # Store display name and add submission
-                        game["user_display_names"][user_id] = msg.author.display_name
-                        game["user_submissions"][user_id].add(submission.lower())  # Normalize for deduplication
-                        
-                        # Silent checkmark for valid submissions (with rate limiting)
-                        try:
-                            await msg.add_reaction("✅")
-                        except discord.HTTPException:
-                            pass  # Skip if rate limited
-                    
-                except asyncio.TimeoutError:
-                    break  # Time's up
-                except Exception as e:
-                    self.logger.error(f"Error during game collection: {e}")
-                    break
-
-            # Game ended - process results
-            if ctx.channel.id not in self.active_games:
-                return  # Game was cancelled
-            
-            game = self.active_games.pop(ctx.channel.id)
-            await self.award_points_and_show_results(ctx, game)
+            # Timer starts once the announcement is out; stored so a restart can resume it
+            game = self.active_games.get(ctx.channel.id)
+            if game is None:
+                return  # Ended (or handed to a reloaded cog) while the announcement was sending
+            game["ends_at"] = datetime.now(timezone.utc) + timedelta(seconds=GAME_DURATION)
+            await self.run_game(ctx.channel)
             
         except Exception as e:
             self.logger.error(f"Error in start_alliteration_game: {e}")
@@ -406,10 +360,78 @@ Respond with only "VALID" or "INVALID" followed by a brief reason."""
                 color=discord.Color.red()
             )
             result = await self.bot.safe_send(ctx.channel, embed=error_embed)
-            if not result:
+            if result.should_fallback:
                 await self.bot.safe_send(ctx.channel, f"❌ Game error: {str(e)}")
 
-    async def award_points_and_show_results(self, ctx: commands.Context, game: dict):
+    async def run_game(self, channel):
+        """Collect submissions until the game's end time, then award points. Also resumes restored games."""
+        game = self.active_games[channel.id]
+        topic_info = game["topic"]
+        
+        # Collect submissions until the stored end time (survives a restart)
+        remaining_wall = (game["ends_at"] - datetime.now(timezone.utc)).total_seconds()
+        end_time = asyncio.get_event_loop().time() + max(0, remaining_wall)
+        
+        # This channel's messages (from real users) are routed here by the bot's message router
+        inbox = self.bot.router.open_inbox(channel.id, "alliteration")
+        # Checkmarks are grouped per run, so a reloaded cog's run of this game keeps its own
+        reaction_group = f"alliteration:{channel.id}:{id(inbox)}"
+
+        # Game collection loop
+        while asyncio.get_event_loop().time() < end_time and channel.id in self.active_games:
+            remaining_time = end_time - asyncio.get_event_loop().time()
+            if remaining_time <= 0:
+                break
+            
+            try:
+                msg = await asyncio.wait_for(inbox.get(), timeout=remaining_time)
+                
+                # Skip if game was ended
+                if channel.id not in self.active_games:
+                    break
+                
+                submission = msg.content.strip()
+                user_id = msg.author.id
+                
+                # Validate submission using AI or basic validation
+                is_valid = await self.validate_alliteration_with_ai(submission, topic_info)
+                
+                if is_valid:
+                    # Double-check game still exists (race condition protection)
+                    if channel.id not in self.active_games:
+                        break
+                    
+                    game = self.active_games[channel.id]
+                    
+                    # Initialize user data if needed
+                    if user_id not in game["user_submissions"]:
+                        game["user_submissions"][user_id] = set()
+                    
+                    # Store display name and add submission
+                    game["user_display_names"][user_id] = msg.author.display_name
+                    game["user_submissions"][user_id].add(submission.lower())  # Normalize for deduplication
+                    
+                    # Silent checkmark for valid submissions (queued and paced by the reaction scheduler)
+                    self.bot.reactions.schedule(msg, "✅", Priority.BULK, group=reaction_group)
+                
+            except asyncio.TimeoutError:
+                break  # Time's up
+            except Exception as e:
+                self.logger.error(f"Error during game collection: {e}")
+                break
+
+        # Game ended - stop collecting; checkmarks still queued are stale now
+        self.bot.router.close_inbox(channel.id, "alliteration", inbox)
+        self.bot.reactions.cancel_group(reaction_group)
+        
+        # Game ended - process results
+        if channel.id not in self.active_games:
+            return  # Game was cancelled (or handed to a reloaded cog)
+        
+        game = self.active_games.pop(channel.id)
+        await self.award_points_and_show_results(channel, game)
+
+    async def award_points_and_show_results(self, channel, game: dict):
         """Award points and display game results"""
         try:
             user_submissions = game["user_submissions"]
@@ -423,7 +445,7 @@ Respond with only "VALID" or "INVALID" followed by a brief reason."""
                     color=self.nyx_color
                 )
                 embed.set_footer(text="Thanks for playing the alliteration game!")
-                await self.bot.safe_send(ctx.channel, embed=embed)
+                await self.bot.safe_send(channel, embed=embed)
                 return
 
             # Award points to all participants (5 points per valid submission)
@@ -484,15 +506,15 @@ Respond with only "VALID" or "INVALID" followed by a brief reason."""
             results_embed.set_footer(text="Congratulations on completing the alliteration challenge!")
             
             # Send results
-            result = await self.bot.safe_send(ctx.channel, embed=results_embed)
-            if not result:
+            result = await self.bot.safe_send(channel, embed=results_embed)
+            if result.should_fallback:
                 fallback_text = (
                     f"🎭 Alliteration Game Complete!\n"
                     f"Topic: {topic_info['topic'].title()}\n"
                     f"Total Points Awarded: {total_points_awarded} 🪙\n"
                     f"Players: {len(user_submissions)}"
                 )
-                await self.bot.safe_send(ctx.channel, fallback_text)
+                await self.bot.safe_send(channel, fallback_text)
                 
         except Exception as e:
             self.logger.error(f"Error awarding points and showing results: {e}")
@@ -501,7 +523,7 @@ Respond with only "VALID" or "INVALID" followed by a brief reason."""
                 description="Game completed but there was an error displaying results.",
                 color=discord.Color.red()
             )
-            await self.bot.safe_send(ctx.channel, embed=error_embed)
+            await self.bot.safe_send(channel, embed=error_embed)
 
     @commands.command(name='alliterations', aliases=['alliteration', 'allit'])
     async def alliterations_command(self, ctx: commands.Context):
@@ -538,7 +560,7 @@ Respond with only "VALID" or "INVALID" followed by a brief reason."""
             embed.add_field(name="Method", value=validation_method, inline=True)
             
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 await self.bot.safe_send(ctx.channel, f'"{submission}" - Valid: {"Yes" if is_valid else "No"} - Points: {5 if is_valid else 0} 🪙')
                 
         except Exception as e:
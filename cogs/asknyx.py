@@ -3,10 +3,15 @@ import os
 import json
 import asyncio
 import aiofiles
+import codecs
+import re
+import math
 import time
+from collections import OrderedDict
+from html.parser import HTMLParser
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List
-from discord.ext import commands
+from discord.ext import commands, tasks
 import discord
 import logging
 
@@ -21,18 +26,295 @@ NYX_COLOR = 0x76b887
 STORAGE_PATH = os.getenv("STORAGE_PATH", "./nyxnotes")
 os.makedirs(STORAGE_PATH, exist_ok=True)
 
+# ★ Search cache settings - TTLs in seconds per provider
+SEARCH_CACHE_TTLS = {
+    "google": 6 * 3600,      # Google CSE results stay fresh for a while and cost quota
+    "duckduckgo": 3600,      # Shorter so we retry Google once the quota resets
+}
+SEARCH_CACHE_NEGATIVE_TTL = 300  # Empty results are only remembered briefly
+SEARCH_CACHE_MAX_ENTRIES = 500
+
+# ★ Search-necessity classifier features
+RECENCY_PATTERN = re.compile(
+    r"\b(latest|newest|recent(ly)?|current(ly)?|today|tonight|yesterday|tomorrow|now|"
+    r"this (week|month|year|season)|last (night|week|month|year)|news|update[sd]?|"
+    r"breaking|trending|released?|announced?|score[sd]?|won|winner|results?|"
+    r"price|stock|weather|forecast|schedule|upcoming|still|anymore)\b"
+)
+DATE_PATTERN = re.compile(
+    r"\b(19|20)\d{2}\b|\b(jan(uary)?|feb(ruary)?|mar(ch)?|apr(il)?|june?|july?|"
+    r"aug(ust)?|sep(t(ember)?)?|oct(ober)?|nov(ember)?|dec(ember)?)\b|\b\d{1,2}/\d{1,2}\b"
+)
+EVENT_PATTERN = re.compile(
+    r"\b(election|elections|olympics|world cup|super bowl|oscars|grammys|emmys|playoffs?|"
+    r"finals|championship|tournament|season \d+|episode|patch|version|v\d+|launch|"
+    r"lawsuit|scandal|war|ceo|president|prime minister)\b"
+)
+TIMELESS_PATTERN = re.compile(
+    r"^(what (is|are) (a|an)\b|what does .+ mean|define\b|definition of|meaning of|"
+    r"explain\b|how (do|does|can|should) (i|you|we|one)\b|why (do|does|is|are)\b|"
+    r"write\b|tell me a (joke|story|poem)|give me (a|an|some) (joke|idea|tip|advice)|"
+    r"what('s| is) the difference between|can you (help|explain|write))"
+)
+# Only openers and explicit references - a bare "it" or "that" appears in plenty of fresh questions
+FOLLOW_UP_PATTERN = re.compile(
+    r"^(why|how so|really|and|also|what about|but|so|then|ok(ay)?|wait|tell me more|"
+    r"elaborate|explain (that|more|further)|can you elaborate|go on|more)\b|"
+    r"\b(you said|you mentioned)\b"
+)
+FOLLOW_UP_WINDOW = 600  # Seconds a previous exchange counts as "the conversation"
+HISTORY_CACHE_MAX_USERS = 256  # Users whose history stays in memory
+QUESTION_COOLDOWN = 30.0  # Seconds between questions per user
+
+# ★ Result-page enrichment settings
+ENRICH_PAGES = os.getenv("ASKNYX_ENRICH_PAGES", "true").lower() in ("1", "true", "yes")
+ENRICH_TOP_K = 3                 # Pages fetched per question
+ENRICH_CONCURRENCY = 3           # Simultaneous page fetches
+ENRICH_LATENCY_BUDGET = 3.0      # Seconds for the whole stage; late pages are dropped
+PAGE_FETCH_TIMEOUT = 4.0         # Per-page timeout (the budget usually wins first)
+PAGE_MAX_BYTES = 256 * 1024      # Stop reading a page after this many bytes
+PAGE_EXTRACT_CHARS = 800         # Readable text kept per page
+PAGE_CACHE_TTL = 3600
+PAGE_CACHE_MAX_ENTRIES = 200
+
+class ReadableTextParser(HTMLParser):
+    """
+    Streaming HTML parser that keeps paragraph-like text and skips page chrome.
+    Feed it chunks as they arrive; ``done`` flips once enough text is collected.
+    """
+    SKIP_TAGS = {"script", "style", "noscript", "svg", "nav", "header", "footer", "aside", "form", "button", "iframe"}
+    TEXT_TAGS = {"p", "li", "h1", "h2", "h3", "blockquote", "td", "dd"}
+
+    def __init__(self, max_chars: int = PAGE_EXTRACT_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+        self.length = 0
+        self.done = False
+        self._skip_depth = 0
+        self._text_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.TEXT_TAGS:
+            self._text_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self.TEXT_TAGS and self._text_depth:
+            self._text_depth -= 1
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        # Chunks can split words, so keep raw data and normalize whitespace at the end
+        if self.done or self._skip_depth or not self._text_depth:
+            return
+        self.parts.append(data)
+        self.length += len(data)
+        if self.length >= self.max_chars * 2:
+            self.done = True
+
+    def get_text(self) -> str:
+        text = " ".join("".join(self.parts).split())
+        if len(text) > self.max_chars:
+            text = text[:self.max_chars - 3].rsplit(" ", 1)[0] + "..."
+        return text
+
+class PageTextCache:
+    """Small LRU of extracted page text per URL with a fixed TTL."""
+
+    def __init__(self, ttl: int = PAGE_CACHE_TTL, max_entries: int = PAGE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, url: str) -> Optional[str]:
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        text, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[url]
+            return None
+        self._entries.move_to_end(url)
+        return text
+
+    def put(self, url: str, text: str):
+        self._entries[url] = (text, time.time() + self.ttl)
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+class SearchCache:
+    """
+    LRU cache of formatted web search results keyed by normalized query.
+    Entries expire per provider and are persisted as compact JSON so the
+    cache survives restarts.
+    """
+
+    def __init__(self, cache_file: str, max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query so trivially different phrasings share a key."""
+        text = re.sub(r"[^\w\s]", " ", query.lower())
+        return " ".join(text.split())
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return the live entry for a query (``results`` may be empty) or None."""
+        entry = self.peek(query)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(self.normalize(query))
+        self.hits += 1
+        return entry
+
+    def peek(self, query: str) -> Optional[Dict[str, Any]]:
+        """Like get() but without touching LRU order or hit statistics."""
+        key = self.normalize(query)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry["expires_at"] <= time.time():
+            del self._entries[key]
+            self._dirty = True
+            return None
+        return entry
+
+    def put(self, query: str, provider: str, results: str, links: Optional[List[str]] = None):
+        """Store results (and their source links) for a query; empty results are negatively cached."""
+        key = self.normalize(query)
+        if not key:
+            return
+
+        ttl = SEARCH_CACHE_TTLS.get(provider, SEARCH_CACHE_NEGATIVE_TTL) if results else SEARCH_CACHE_NEGATIVE_TTL
+        self._entries[key] = {
+            "provider": provider,
+            "results": results,
+            "links": links or [],
+            "expires_at": time.time() + ttl
+        }
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def purge_expired(self) -> int:
+        """Drop expired entries and return how many were removed."""
+        now = time.time()
+        expired = [key for key, entry in self._entries.items() if entry["expires_at"] <= now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._dirty = True
+        return len(expired)
+
+    async def load(self):
+        """Load cached entries from disk, skipping anything already expired."""
+        if not os.path.exists(self.cache_file):
+            return
+
+        try:
+            async with aiofiles.open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = await f.read()
+            if not data.strip():
+                return
+
+            now = time.time()
+            # Compact row format: [key, provider, results, expires_at, links]
+            for row in json.loads(data).get("entries", []):
+                key, provider, results, expires_at = row[:4]
+                if expires_at > now:
+                    self._entries[key] = {
+                        "provider": provider,
+                        "results": results,
+                        "links": row[4] if len(row) > 4 else [],
+                        "expires_at": expires_at
+                    }
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        except Exception as e:
+            logging.getLogger("asknyx").error(f"Error loading search cache: {e}")
+            self._entries.clear()
+
+    async def save(self, force: bool = False):
+        """Write the cache to disk if it changed since the last save."""
+        if not self._dirty and not force:
+            return
+
+        self.purge_expired()
+        rows = [
+            [key, entry["provider"], entry["results"], round(entry["expires_at"], 1), entry.get("links", [])]
+            for key, entry in self._entries.items()
+        ]
+
+        try:
+            temp_file = self.cache_file + '.tmp'
+            async with aiofiles.open(temp_file, 'w', encoding='utf-8') as f:
+                await f.write(json.dumps({"v": 1, "entries": rows}, separators=(',', ':'), ensure_ascii=False))
+            os.replace(temp_file, self.cache_file)
+            self._dirty = False
+        except Exception as e:
+            logging.getLogger("asknyx").error(f"Error saving search cache: {e}")
+
+    def __len__(self):
+        return len(self._entries)
+
 class AskNyx(commands.Cog):
     """Ask Nyx questions with web search capabilities while maintaining her personality."""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.storage_path = STORAGE_PATH
-        self.asknyx_history_file = os.path.join(self.storage_path, 'asknyx_history.json')
+        self.asknyx_history_dir = os.path.join(self.storage_path, 'asknyx_history')
+        self.legacy_history_file = os.path.join(self.storage_path, 'asknyx_history.json')
+        self._history_cache: "OrderedDict[str, List[Dict]]" = OrderedDict()  # Hot users only
         self._lock = asyncio.Lock()
         self.logger = logging.getLogger("asknyx")
         
-        # Rate limiting for API calls
-        self._user_cooldowns = {}
+        # Search results cache (saves Google CSE quota across restarts)
+        self.search_cache = SearchCache(os.path.join(self.storage_path, 'search_cache.json'))
+        self.page_cache = PageTextCache()
+        
+        # Search classifier stats: how often we skip and how long searches take
+        self.search_stats = {
+            'searched': 0,
+            'skipped': 0,
+            'cached': 0,
+            'search_seconds': 0.0
+        }
+        
+        # Background history writes (kept off the reply path)
+        self._pending_writes = set()
+        self.write_stats = {
+            'completed': 0,
+            'failed': 0
+        }
+        
+        # Singleflight: normalized question -> future of the leader's answer / search results
+        self._inflight_answers: Dict[str, asyncio.Future] = {}
+        self._inflight_searches: Dict[str, asyncio.Future] = {}
+        self.singleflight_stats = {
+            'leaders': 0,
+            'answer_followers': 0,
+            'search_followers': 0
+        }
         
         # Ensure storage directory exists
         os.makedirs(self.storage_path, exist_ok=True)
@@ -76,6 +358,18 @@ You're Nyx answering questions with the help of current web information while ma
                     else:
                         self.logger.warning("⚠️ ANTHROPIC_API_KEY not found in environment")
             
+            # Per-user question cooldown on the bot's shared cooldown service
+            self.bot.cooldowns.configure("asknyx", "user", 1, QUESTION_COOLDOWN)
+            
+            # Move the old single-file history into per-user shards
+            await self.migrate_legacy_history()
+            
+            # Restore cached search results and start periodic flushing
+            await self.search_cache.load()
+            self.logger.info(f"Search cache loaded ({len(self.search_cache)} entries)")
+            if not self.search_cache_flush_task.is_running():
+                self.search_cache_flush_task.start()
+            
             self.logger.info("AskNyx cog loaded successfully")
         except Exception as e:
             self.logger.error(f"Error in asknyx cog_load: {e}")
@@ -85,53 +379,95 @@ You're Nyx answering questions with the help of current web information while ma
         """Called when cog is unloaded - clean up gracefully"""
         try:
             self.logger.info("AskNyx cog unloading...")
+            
+            if self.search_cache_flush_task.is_running():
+                self.search_cache_flush_task.cancel()
+            await self.search_cache.save()
+            await self.flush_pending_writes()
+            
             self.logger.info("AskNyx cog unloaded successfully")
         except Exception as e:
             self.logger.error(f"Error during asknyx cog unload: {e}")
 
-    async def load_asknyx_history(self) -> Dict:
-        """Load AskNyx conversation history from persistent storage."""
-        async with self._lock:
-            if os.path.exists(self.asknyx_history_file):
-                try:
-                    async with aiofiles.open(self.asknyx_history_file, 'r', encoding='utf-8') as f:
-                        data = await f.read()
-                        if data.strip():
-                            return json.loads(data)
-                except Exception as e:
-                    self.logger.error(f"Error loading asknyx history: {e}")
+    @tasks.loop(minutes=10)
+    async def search_cache_flush_task(self):
+        """Persist the search cache periodically instead of on every query."""
+        try:
+            await self.search_cache.save()
+            self.logger.debug(
+                f"Search cache: {len(self.search_cache)} entries, "
+                f"{self.search_cache.hits} hits / {self.search_cache.misses} misses"
+            )
+        except Exception as e:
+            self.logger.error(f"Error in search cache flush task: {e}")
+
+    def _user_history_file(self, user_id: str) -> str:
+        """Path of one user's history shard."""
+        return os.path.join(self.asknyx_history_dir, f"{user_id}.json")
+
+    async def migrate_legacy_history(self):
+        """Split the old single-file history into per-user shards (runs once)."""
+        if not os.path.exists(self.legacy_history_file):
+            return
+        
+        try:
+            async with aiofiles.open(self.legacy_history_file, 'r', encoding='utf-8') as f:
+                data = await f.read()
+            history = json.loads(data) if data.strip() else {}
             
-            return {}
+            for user_id, user_history in history.items():
+                if not os.path.exists(self._user_history_file(user_id)):
+                    await self.save_user_history(user_id, user_history)
+            
+            os.rename(self.legacy_history_file, self.legacy_history_file + '.migrated')
+            self.logger.info(f"Migrated asknyx history for {len(history)} users to per-user files")
+        except Exception as e:
+            self.logger.error(f"Error migrating legacy asknyx history: {e}")
 
-    async def save_asknyx_history(self, history: Dict):
-        """Save AskNyx conversation history to persistent storage."""
-        async with self._lock:
+    async def load_user_history(self, user_id: str) -> List[Dict]:
+        """Load one user's AskNyx history, served from the hot-user LRU when possible."""
+        cached = self._history_cache.get(user_id)
+        if cached is not None:
+            self._history_cache.move_to_end(user_id)
+            return list(cached)
+        
+        user_history = []
+        history_file = self._user_history_file(user_id)
+        if os.path.exists(history_file):
             try:
-                os.makedirs(os.path.dirname(self.asknyx_history_file), exist_ok=True)
-                
-                temp_file = self.asknyx_history_file + '.tmp'
-                async with aiofiles.open(temp_file, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(history, indent=2, ensure_ascii=False))
-                
-                if os.path.exists(self.asknyx_history_file):
-                    backup_file = self.asknyx_history_file + '.backup'
-                    if os.path.exists(backup_file):
-                        os.remove(backup_file)
-                    os.rename(self.asknyx_history_file, backup_file)
-                    
-                os.rename(temp_file, self.asknyx_history_file)
-                self.logger.debug(f"AskNyx history saved successfully")
-                
+                async with aiofiles.open(history_file, 'r', encoding='utf-8') as f:
+                    data = await f.read()
+                    if data.strip():
+                        user_history = json.loads(data)
             except Exception as e:
-                self.logger.error(f"Error saving asknyx history: {e}")
-                # Try to restore backup if save failed
-                backup_file = self.asknyx_history_file + '.backup'
-                if os.path.exists(backup_file) and not os.path.exists(self.asknyx_history_file):
-                    try:
-                        os.rename(backup_file, self.asknyx_history_file)
-                        self.logger.info("Restored asknyx history from backup")
-                    except Exception as restore_error:
-                        self.logger.error(f"Failed to restore backup: {restore_error}")
+                self.logger.error(f"Error loading asknyx history for {user_id}: {e}")
+        
+        self._cache_user_history(user_id, user_history)
+        return list(user_history)
+
+    async def save_user_history(self, user_id: str, user_history: List[Dict]):
+        """Atomically write one user's history shard and refresh the LRU."""
+        try:
+            os.makedirs(self.asknyx_history_dir, exist_ok=True)
+            history_file = self._user_history_file(user_id)
+            
+            temp_file = history_file + '.tmp'
+            async with aiofiles.open(temp_file, 'w', encoding='utf-8') as f:
+                await f.write(json.dumps(user_history, indent=2, ensure_ascii=False))
+            os.replace(temp_file, history_file)
+            
+            self._cache_user_history(user_id, user_history)
+            self.logger.debug(f"AskNyx history saved for {user_id}")
+        except Exception as e:
+            self.logger.error(f"Error saving asknyx history for {user_id}: {e}")
+            raise
+
+    def _cache_user_history(self, user_id: str, user_history: List[Dict]):
+        """Keep a user's history hot, evicting the least recently used users."""
+        self._history_cache[user_id] = list(user_history)
+        self._history_cache.move_to_end(user_id)
+        while len(self._history_cache) > HISTORY_CACHE_MAX_USERS:
+            self._history_cache.popitem(last=False)
 
     @commands.command(name="asknyx")
     async def asknyx(self, ctx, *, question: str = None):
@@ -147,26 +483,24 @@ You're Nyx answering questions with the help of current web information while ma
 
         # Rate limiting check
         user_id = ctx.author.id
-        now = time.time()
-        
-        if user_id in self._user_cooldowns:
-            if now - self._user_cooldowns[user_id] < 30.0:  # 30 second cooldown
-                remaining = int(30 - (now - self._user_cooldowns[user_id]))
-                embed = discord.Embed(
-                    title="⏰ Cooldown Active",
-                    description=f"Please wait {remaining} seconds before asking another question.",
-                    color=0xff0000
-                )
-                await self.bot.safe_send(ctx.channel, embed=embed)
-                return
-
-        self._user_cooldowns[user_id] = now
+        if not self.bot.cooldowns.try_acquire("asknyx", user_id=user_id):
+            remaining = math.ceil(self.bot.cooldowns.retry_after("asknyx", user_id=user_id))
+            embed = discord.Embed(
+                title="⏰ Cooldown Active",
+                description=f"Please wait {remaining} seconds before asking another question.",
+                color=0xff0000
+            )
+            await self.bot.safe_send(ctx.channel, embed=embed)
+            return
 
         # Send thinking message
-        thinking_msg = await self.bot.safe_send(ctx.channel, "🔍 Searching for the most current information...")
+        thinking_result = await self.bot.safe_send(ctx.channel, "🔍 Searching for the most current information...")
         
-        if not thinking_msg:
+        if not thinking_result:
+            # Nothing was asked yet - don't make them wait out the cooldown to retry
+            self.bot.cooldowns.reset("asknyx", user_id=user_id)
             return
+        thinking_msg = thinking_result.message
 
         try:
             await self.process_question(ctx, question, thinking_msg)
@@ -188,104 +522,447 @@ You're Nyx answering questions with the help of current web information while ma
         try:
             user_id = str(ctx.author.id)
             
-            # Load conversation history
-            history = await self.load_asknyx_history()
-            user_history = history.get(user_id, [])
-            
-            # Perform web search
-            search_results = await self.perform_web_search(question)
-            
-            # Build conversation context with last 5 exchanges
-            conversation = []
-            
-            # Add recent conversation history (last 5 Q&As)
-            recent_history = user_history[-5:] if len(user_history) > 5 else user_history
-            for exchange in recent_history:
-                conversation.append({
-                    'role': 'user',
-                    'content': exchange['question']
-                })
-                conversation.append({
-                    'role': 'assistant', 
-                    'content': exchange['answer']
-                })
+            # Identical questions already in flight share one answer (see answer_question_shared)
+            reply, had_search_results = await self.answer_question_shared(question, user_id)
             
-            # Prepare the current question with search context
-            search_context = ""
-            if search_results:
-                search_context = f"\n\nCurrent web search results for this topic:\n{search_results}"
-            
-            current_question = f"{question}{search_context}"
-            conversation.append({
-                'role': 'user',
-                'content': current_question
-            })
-            
-            # Generate response using Anthropic
-            reply = "I'm having trouble accessing current information right now, but I'll do my best to help with what I know!"
+            # Send response first - nothing below depends on the history write
+            embed = discord.Embed(
+                title="💭 Nyx's Response",
+                description=reply,
+                color=NYX_COLOR
+            )
+            embed.set_footer(text=f"Asked by {ctx.author.display_name}", icon_url=ctx.author.display_avatar.url)
             
-            if hasattr(self.bot, 'anthropic_client') and self.bot.anthropic_client:
+            try:
+                await thinking_msg.edit(content="", embed=embed)
+            except:
+                await self.bot.safe_send(ctx.channel, embed=embed)
                 try:
-                    response = self.bot.anthropic_client.messages.create(
-                        model="claude-sonnet-4-20250514",
-                        max_tokens=500,
-                        temperature=0.7,
-                        system=self.nyx_personality,
-                        messages=conversation[-6:]  # Last 6 messages for context
-                    )
-                    
-                    reply = response.content[0].text
-                except Exception as e:
-                    self.logger.error(f"Error generating response: {e}")
-                    reply = "I'm having a moment of technical difficulty, but I'm still here! Try asking me something else."
+                    await thinking_msg.delete()
+                except:
+                    pass
             
-            # Save exchange to history
+            # Persist the exchange in the background
             exchange = {
                 'question': question,
                 'answer': reply,
                 'timestamp': datetime.now(timezone.utc).isoformat(),
-                'had_search_results': bool(search_results),
+                'had_search_results': had_search_results,
                 'channel_id': ctx.channel.id,
                 'channel_name': ctx.channel.name
             }
+            self.schedule_history_write(user_id, exchange)
+            
+        except Exception as e:
+            self.logger.error(f"Error processing question: {e}")
+            raise
+
+    async def answer_question_shared(self, question: str, user_id: str) -> tuple:
+        """
+        Answer a question, sharing the whole answer with identical in-flight questions
+        when it doesn't depend on the asker.
+        
+        Askers with personal context (a recent exchange, or a follow-up question) get
+        their own completion; they can still share the web search (see search_if_needed).
+        """
+        user_history = await self.load_user_history(user_id)
+        if self.has_personal_context(question, user_history):
+            return await self.answer_question(question, user_history)
+        
+        # Nothing personal goes into the prompt, so the answer depends on the question alone
+        return await self.singleflight(
+            self._inflight_answers, question,
+            lambda: self.answer_question(question, []),
+            'answer_followers'
+        )
+
+    def has_personal_context(self, question: str, user_history: List[Dict]) -> bool:
+        """True if this user's conversation belongs in the prompt (a follow-up, or an exchange within FOLLOW_UP_WINDOW)."""
+        if self.looks_like_follow_up(question):
+            return True
+        if not user_history:
+            return False
+        try:
+            last_asked = datetime.fromisoformat(user_history[-1]['timestamp'])
+            return (datetime.now(timezone.utc) - last_asked).total_seconds() <= FOLLOW_UP_WINDOW
+        except (KeyError, ValueError, TypeError):
+            return True  # Can't tell - keep their conversation rather than share
+
+    async def singleflight(self, inflight: Dict[str, asyncio.Future], question: str, run, stat: str):
+        """
+        Run `run()` once per normalized question in flight.
+        
+        The first asker leads; anyone asking the same thing meanwhile awaits the
+        leader's result instead (counted under singleflight_stats[stat]).
+        """
+        key = SearchCache.normalize(question)
+        if not key:
+            return await run()
+        
+        leader = inflight.get(key)
+        if leader is not None:
+            self.singleflight_stats[stat] += 1
+            result = await asyncio.shield(leader)
+            if result is not None:
+                return result
+            # The leader failed - run this one independently
+            return await run()
+        
+        future = asyncio.get_running_loop().create_future()
+        inflight[key] = future
+        self.singleflight_stats['leaders'] += 1
+        try:
+            result = await run()
+            future.set_result(result)
+            return result
+        finally:
+            if not future.done():
+                future.set_result(None)
+            inflight.pop(key, None)
+
+    async def answer_question(self, question: str, user_history: List[Dict]) -> tuple:
+        """
+        Build context from `user_history` (empty for shared answers) and ask the model.
+        
+        Returns:
+            Tuple of (reply, had_search_results)
+        """
+        search_results = await self.search_if_needed(question, user_history)
+        
+        # Build conversation context with last 5 exchanges
+        conversation = []
+        
+        # Add recent conversation history (last 5 Q&As)
+        recent_history = user_history[-5:] if len(user_history) > 5 else user_history
+        for exchange in recent_history:
+            conversation.append({
+                'role': 'user',
+                'content': exchange['question']
+            })
+            conversation.append({
+                'role': 'assistant', 
+                'content': exchange['answer']
+            })
+        
+        # Prepare the current question with search context
+        search_context = ""
+        if search_results:
+            search_context = f"\n\nCurrent web search results for this topic:\n{search_results}"
+        
+        current_question = f"{question}{search_context}"
+        conversation.append({
+            'role': 'user',
+            'content': current_question
+        })
+        
+        # Generate response using Anthropic
+        reply = "I'm having trouble accessing current information right now, but I'll do my best to help with what I know!"
+        
+        if hasattr(self.bot, 'anthropic_client') and self.bot.anthropic_client:
+            try:
+                # Run the blocking client call off the event loop
+                response = await asyncio.to_thread(
+                    self.bot.anthropic_client.messages.create,
+                    model="claude-sonnet-4-20250514",
+                    max_tokens=500,
+                    temperature=0.7,
+                    system=self.nyx_personality,
+                    messages=conversation[-6:]  # Last 6 messages for context
+                )
+                
+                reply = response.content[0].text
+            except Exception as e:
+                self.logger.error(f"Error generating response: {e}")
+                reply = "I'm having a moment of technical difficulty, but I'm still here! Try asking me something else."
+        
+        return reply, bool(search_results)
+
+    async def search_if_needed(self, question: str, user_history: List[Dict]) -> str:
+        """Run the web search if the classifier wants one (shared with identical in-flight searches)."""
+        should_search, search_reason = self.needs_web_search(question, user_history)
+        
+        self.logger.debug(f"Search {'performed' if should_search else 'skipped'} ({search_reason}): {question}")
+        if not should_search:
+            self.search_stats['skipped'] += 1
+            return ""
+        
+        return await self.singleflight(
+            self._inflight_searches, question,
+            lambda: self.run_search(question),
+            'search_followers'
+        )
+
+    async def run_search(self, question: str) -> str:
+        """Web search plus optional page excerpts - depends on the question alone."""
+        search_results = await self.perform_web_search(question)
+        
+        # Optionally add readable text from the top result pages
+        if ENRICH_PAGES:
+            cached = self.search_cache.peek(question)
+            links = cached.get('links', []) if cached else []
+            if links:
+                page_excerpts = await self.enrich_search_results(links)
+                if page_excerpts:
+                    search_results = f"{search_results}\n\n📄 **Page excerpts:**\n\n{page_excerpts}"
+        return search_results
+
+    async def enrich_search_results(self, links: List[str]) -> str:
+        """
+        Fetch the top result pages concurrently and extract readable text.
+        
+        Pages that miss the overall latency budget are dropped rather than waited on.
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            return ""
+        
+        links = links[:ENRICH_TOP_K]
+        excerpts: Dict[str, str] = {}
+        to_fetch = []
+        for url in links:
+            cached_text = self.page_cache.get(url)
+            if cached_text is not None:
+                excerpts[url] = cached_text
+            else:
+                to_fetch.append(url)
+        
+        if to_fetch:
+            semaphore = asyncio.Semaphore(ENRICH_CONCURRENCY)
+            timeout = aiohttp.ClientTimeout(total=PAGE_FETCH_TIMEOUT)
+            headers = {"User-Agent": "Mozilla/5.0 (compatible; NyxBot/1.0)"}
             
+            async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
+                page_tasks = {
+                    asyncio.create_task(self.fetch_page_text(session, semaphore, url)): url
+                    for url in to_fetch
+                }
+                done, pending = await asyncio.wait(page_tasks.keys(), timeout=ENRICH_LATENCY_BUDGET)
+                
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    self.logger.debug(f"Dropped {len(pending)} page(s) that missed the enrichment budget")
+                    await asyncio.gather(*pending, return_exceptions=True)
+                
+                for task in done:
+                    url = page_tasks[task]
+                    if task.exception() is not None:
+                        self.logger.debug(f"Page fetch failed for {url}: {task.exception()}")
+                        continue
+                    text = task.result()
+                    # Cache empty extractions too so broken pages aren't refetched
+                    self.page_cache.put(url, text)
+                    excerpts[url] = text
+        
+        return "\n\n".join(
+            f"🔗 {url}\n{excerpts[url]}" for url in links if excerpts.get(url)
+        )
+
+    async def fetch_page_text(self, session, semaphore, url: str) -> str:
+        """Stream one page through the readable-text parser, capped in bytes."""
+        async with semaphore:
+            async with session.get(url, allow_redirects=True) as response:
+                content_type = response.headers.get("Content-Type", "")
+                if response.status != 200 or "html" not in content_type:
+                    return ""
+                
+                parser = ReadableTextParser()
+                try:
+                    decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+                except LookupError:
+                    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                bytes_read = 0
+                async for chunk in response.content.iter_chunked(8192):
+                    bytes_read += len(chunk)
+                    # Incremental, so characters split across chunks survive
+                    parser.feed(decoder.decode(chunk))
+                    if parser.done or bytes_read >= PAGE_MAX_BYTES:
+                        break
+                
+                return parser.get_text()
+
+    def schedule_history_write(self, user_id: str, exchange: Dict):
+        """Persist an exchange without blocking the reply; failures are tracked."""
+        task = asyncio.create_task(self.append_history_exchange(user_id, exchange))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._on_history_write_done)
+
+    def _on_history_write_done(self, task):
+        """Track completion of a background history write."""
+        self._pending_writes.discard(task)
+        if task.cancelled():
+            self.write_stats['failed'] += 1
+            return
+        
+        error = task.exception()
+        if error:
+            self.write_stats['failed'] += 1
+            self.logger.error(f"Background asknyx history write failed: {error}")
+        else:
+            self.write_stats['completed'] += 1
+
+    async def append_history_exchange(self, user_id: str, exchange: Dict):
+        """Append one exchange to a user's history (read-modify-write is serialized)."""
+        async with self._lock:
+            user_history = await self.load_user_history(user_id)
             user_history.append(exchange)
             
             # Keep only last 10 exchanges per user
-            if len(user_history) > 10:
-                user_history = user_history[-10:]
-            
-            history[user_id] = user_history
-            await self.save_asknyx_history(history)
+            await self.save_user_history(user_id, user_history[-10:])
+
+    async def flush_pending_writes(self):
+        """Wait for outstanding background history writes to land on disk."""
+        if self._pending_writes:
+            self.logger.info(f"Waiting for {len(self._pending_writes)} pending history writes...")
+            await asyncio.gather(*list(self._pending_writes), return_exceptions=True)
+
+    def looks_like_follow_up(self, question: str) -> bool:
+        """Cheap check for questions that may refer back to the previous answer."""
+        text = " ".join(question.lower().split())
+        return len(text.split()) <= 12 and bool(FOLLOW_UP_PATTERN.search(text))
+
+    def needs_web_search(self, question: str, user_history: List[Dict]) -> tuple:
+        """
+        Decide locally whether a question needs a web search.
+        
+        Returns:
+            Tuple of (should_search, reason)
+        """
+        text = " ".join(question.lower().split())
+        
+        # Anything time-sensitive always gets fresh results
+        if RECENCY_PATTERN.search(text):
+            return True, "recency"
+        if DATE_PATTERN.search(text):
+            return True, "date"
+        if EVENT_PATTERN.search(text):
+            return True, "event"
+        
+        # Capitalized names mid-sentence usually mean people, products or events
+        if re.search(r"(?<!^)(?<![.!?] )\b[A-Z][a-z]+(?: [A-Z][a-z]+)+", question.strip()):
+            return True, "named_entity"
+        
+        # Short follow-ups to a recent answer are answered from the conversation
+        if user_history and self.looks_like_follow_up(question):
+            try:
+                last_asked = datetime.fromisoformat(user_history[-1]['timestamp'])
+                if (datetime.now(timezone.utc) - last_asked).total_seconds() <= FOLLOW_UP_WINDOW:
+                    return False, "follow_up"
+            except (KeyError, ValueError, TypeError):
+                pass
+        
+        # Definitions, explanations and creative requests don't change over time
+        if TIMELESS_PATTERN.search(text):
+            return False, "timeless"
+        
+        # When unsure, search - a wrong skip costs accuracy, a wrong search only costs time
+        return True, "default"
+
+    def get_search_stats(self) -> Dict[str, Any]:
+        """Summarize how often search was skipped and the estimated time saved."""
+        searched = self.search_stats['searched']
+        skipped = self.search_stats['skipped']
+        total = searched + skipped + self.search_stats['cached']
+        avg_search = self.search_stats['search_seconds'] / searched if searched else 0.0
+        return {
+            'total': total,
+            'searched': searched,
+            'cached': self.search_stats['cached'],
+            'skipped': skipped,
+            'skip_rate': skipped / total if total else 0.0,
+            'avg_search_seconds': avg_search,
+            'seconds_saved': skipped * avg_search
+        }
+
+    @commands.command(name="asknyxstats", hidden=True)
+    @commands.has_permissions(administrator=True)
+    async def asknyx_stats(self, ctx):
+        """Admin command to show search skip rate and cache effectiveness."""
+        try:
+            stats = self.get_search_stats()
+            cache_lookups = self.search_cache.hits + self.search_cache.misses
+            cache_hit_rate = self.search_cache.hits / cache_lookups if cache_lookups else 0.0
             
-            # Send response
             embed = discord.Embed(
-                title="💭 Nyx's Response",
-                description=reply,
+                title="🔍 AskNyx Search Stats",
                 color=NYX_COLOR
             )
-            embed.set_footer(text=f"Asked by {ctx.author.display_name}", icon_url=ctx.author.display_avatar.url)
-            
-            try:
-                await thinking_msg.edit(content="", embed=embed)
-            except:
-                await self.bot.safe_send(ctx.channel, embed=embed)
-                try:
-                    await thinking_msg.delete()
-                except:
-                    pass
+            embed.add_field(
+                name="Search Classifier",
+                value=(
+                    f"**{stats['total']}** questions\n"
+                    f"**{stats['skipped']}** searches skipped ({stats['skip_rate']:.0%})\n"
+                    f"Avg search: **{stats['avg_search_seconds']:.2f}s**\n"
+                    f"Est. time saved: **{stats['seconds_saved']:.1f}s**"
+                ),
+                inline=True
+            )
+            embed.add_field(
+                name="Shared Answers",
+                value=(
+                    f"**{self.singleflight_stats['answer_followers']}** answers shared with an in-flight twin\n"
+                    f"**{self.singleflight_stats['search_followers']}** searches shared\n"
+                    f"**{len(self._inflight_answers) + len(self._inflight_searches)}** in flight now"
+                ),
+                inline=True
+            )
+            embed.add_field(
+                name="History Writes",
+                value=(
+                    f"**{self.write_stats['completed']}** completed\n"
+                    f"**{self.write_stats['failed']}** failed\n"
+                    f"**{len(self._pending_writes)}** pending"
+                ),
+                inline=True
+            )
+            embed.add_field(
+                name="Search Cache",
+                value=(
+                    f"**{len(self.search_cache)}** entries\n"
+                    f"Hit rate: **{cache_hit_rate:.0%}** ({self.search_cache.hits}/{cache_lookups})"
+                ),
+                inline=True
+            )
             
+            result = await self.bot.safe_send(ctx.channel, embed=embed)
+            if result.should_fallback:
+                await self.bot.safe_send(
+                    ctx.channel,
+                    f"AskNyx: {stats['skipped']}/{stats['total']} searches skipped ({stats['skip_rate']:.0%}), "
+                    f"~{stats['seconds_saved']:.1f}s saved"
+                )
         except Exception as e:
-            self.logger.error(f"Error processing question: {e}")
-            raise
+            self.logger.error(f"Error in asknyx_stats: {e}")
+            await self.bot.safe_send(ctx.channel, "❌ Error retrieving AskNyx stats.")
 
     async def perform_web_search(self, query: str) -> str:
         """Perform web search using Google Custom Search API and DuckDuckGo fallback."""
+        no_results = f"🔍 [Searched the web for: {query}] - No specific results found, but I'll use my knowledge to help."
+        
+        # Serve repeated queries from the cache before spending any search quota
+        cached = self.search_cache.get(query)
+        if cached is not None:
+            self.logger.debug(f"Search cache hit ({cached['provider']}) for: {query}")
+            self.search_stats['cached'] += 1
+            return cached['results'] or no_results
+        
+        # Only real provider calls count as searches (and towards the average search time)
+        search_started = time.perf_counter()
+        try:
+            return await self.search_providers(query, no_results)
+        finally:
+            self.search_stats['searched'] += 1
+            self.search_stats['search_seconds'] += time.perf_counter() - search_started
+
+    async def search_providers(self, query: str, no_results: str) -> str:
+        """Query Google, then DuckDuckGo, caching whatever comes back."""
         try:
             import aiohttp
             from urllib.parse import quote_plus
             
             search_results = []
+            result_links = []
             
             # Approach 1: Google Custom Search API (Primary)
             try:
@@ -318,10 +995,14 @@ You're Nyx answering questions with the help of current web information while ma
                                         result_text = result_text[:197] + "..."
                                     
                                     search_results.append(result_text)
+                                    if link:
+                                        result_links.append(link)
                                 
                                 if search_results:
                                     formatted_results = "\n\n".join(search_results)
-                                    return f"🌐 **Current Web Search Results:**\n\n{formatted_results}"
+                                    formatted_results = f"🌐 **Current Web Search Results:**\n\n{formatted_results}"
+                                    self.search_cache.put(query, "google", formatted_results, result_links)
+                                    return formatted_results
                         
                         elif response.status == 403:
                             self.logger.warning("Google API quota exceeded or invalid key")
@@ -343,6 +1024,8 @@ You're Nyx answering questions with the help of current web information while ma
                             # Extract abstract
                             if data.get('Abstract'):
                                 search_results.append(f"📖 **Summary:** {data['Abstract']}")
+                                if data.get('AbstractURL'):
+                                    result_links.append(data['AbstractURL'])
                             
                             # Extract definition
                             if data.get('Definition'):
@@ -368,10 +1051,13 @@ You're Nyx answering questions with the help of current web information while ma
             # Return results if found
             if search_results:
                 formatted_results = "\n\n".join(search_results[:4])  # Limit to 4 results max
-                return f"🌐 **Web Search Results:**\n\n{formatted_results}"
+                formatted_results = f"🌐 **Web Search Results:**\n\n{formatted_results}"
+                self.search_cache.put(query, "duckduckgo", formatted_results, result_links)
+                return formatted_results
             
-            # No results found
-            return f"🔍 [Searched the web for: {query}] - No specific results found, but I'll use my knowledge to help."
+            # No results found - remember that briefly so retries don't hammer the APIs
+            self.search_cache.put(query, "none", "")
+            return no_results
             
         except ImportError:
             self.logger.warning("aiohttp not available for web search")
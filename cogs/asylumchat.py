@@ -3,14 +3,18 @@ import os
 import json
 import asyncio
 import aiofiles
-import time
+from collections import deque
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
-from discord.ext import commands
+from discord.ext import commands, tasks
+from discord import app_commands
 import discord
 import random
 import logging
 
+import nyxsessions
+from nyxoutbound import Priority
+
 try:
     from anthropic import Anthropic
     ANTHROPIC_AVAILABLE = True
@@ -22,6 +26,11 @@ except ImportError:
 NYX_COLOR = 0x76b887
 STORAGE_PATH = os.getenv("STORAGE_PATH", "./nyxnotes")
 os.makedirs(STORAGE_PATH, exist_ok=True)
+HISTORY_KEEP_SESSIONS = 20  # Sessions per channel kept in the hot history file; older ones are archived
+HISTORY_KEEP_MESSAGES = 20  # Messages per session kept in the hot history file
+CONTEXT_BUFFER_SIZE = 8  # Recent turns kept in memory per channel for model context
+USER_REPLY_COOLDOWN = 15.0    # Seconds between replies to the same user
+GLOBAL_REPLY_COOLDOWN = 8.0   # Seconds between any two replies across channels
 
 # ★ Asylum channel IDs
 ASYLUM_CHANNEL_IDS = [
@@ -35,6 +44,47 @@ ASYLUM_CHANNEL_IDS = [
     1392517005608751174,  # private testing 
 ]
 
+# ★ Personas offered at the start of a session: (number typed, mode key, menu label)
+ASYLUM_MODE_CHOICES = [
+    ("1", "default", "Default - Meet the true mysteriously charming Atypical Asylum Nurse"),
+    ("2", "best_friend", "Best Friend - Meet your sarcastic ride-or-die best friend"),
+    ("3", "psych_analyst", "Psychological & Dream Analyst - Meet your intellectual and introspective psychoanalyst"),
+    ("4", "rage_debater", "Rage-baiting Debater - Meet your devil's advocate, overly confident Frat bro Nyx"),
+]
+
+class AsylumModeView(discord.ui.View):
+    """Persona select menu attached to the mode embed - picking is one interaction instead of a typed reply."""
+    
+    def __init__(self, cog: "AsylumChat", channel_id: int):
+        super().__init__(timeout=nyxsessions.SESSION_IDLE_TTLS['asylumchat'])
+        self.cog = cog
+        self.channel_id = channel_id
+        select = discord.ui.Select(
+            placeholder="Choose Nyx's persona...",
+            options=[
+                discord.SelectOption(label=label.split(" - ")[0], value=mode, description=label.split(" - ", 1)[1][:100])
+                for _, mode, label in ASYLUM_MODE_CHOICES
+            ]
+        )
+        select.callback = self.on_select
+        self.add_item(select)
+    
+    async def on_select(self, interaction: discord.Interaction):
+        session = self.cog.active_sessions.get(f"asylum-{self.channel_id}")
+        if not session or session.get('state') != 'selecting_mode':
+            await interaction.response.edit_message(view=None)
+            self.stop()
+            return
+        
+        # Acknowledge now - warming the context buffer can read history from disk
+        await interaction.response.defer()
+        self.stop()
+        await self.cog.activate_asylum_mode(interaction.channel, interaction.data['values'][0])
+        try:
+            await interaction.edit_original_response(view=None)
+        except discord.HTTPException:
+            pass
+
 class AsylumChat(commands.Cog):
     """Cog for Nyx's public channel Claude-powered conversation, with 4 selectable modes."""
     
@@ -43,13 +93,18 @@ class AsylumChat(commands.Cog):
         self.logger = logging.getLogger("asylumchat")
         self.storage_path = STORAGE_PATH
         self.asylum_history_file = os.path.join(self.storage_path, 'asylum_history.json')
+        self.asylum_archive_dir = os.path.join(self.storage_path, 'archive', 'asylum_history')
+        self.asylum_journal_dir = os.path.join(self.storage_path, 'journals', 'asylum')
+        self.asylum_commit_log = os.path.join(self.storage_path, 'asylum_commits.jsonl')
+        self.asylum_snapshot_file = os.path.join(self.storage_path, 'snapshots', 'asylum_sessions.json')
         self._lock = asyncio.Lock()
+        self._history_write_lock = asyncio.Lock()  # Serializes read-modify-write of the history file
         
-        # ENHANCED cooldowns to prevent API spam
-        self._user_cooldowns = {}
-        self._last_response_time = {}
         self._processing_messages = set()  # Track messages being processed
         
+        # Per-channel ring buffer of recent turns (filled from disk once per channel)
+        self._channel_context: Dict[int, deque] = {}
+        
         # Ensure storage directory exists
         os.makedirs(self.storage_path, exist_ok=True)
 
@@ -149,9 +204,24 @@ You're here to argue, rage-bait, and push buttons. You're chatting in a public c
                     else:
                         self.logger.warning("⚠️ ANTHROPIC_API_KEY not found in environment")
             
-            # Initialize unified session storage on bot if not exists (matching chat.py pattern)
-            if not hasattr(self.bot, 'active_sessions'):
-                self.bot.active_sessions = {}
+            # Initialize unified session registry on bot if not exists
+            nyxsessions.ensure_session_registry(self.bot)
+            
+            # Reply cooldowns on the bot's shared cooldown service to prevent API spam
+            self.bot.cooldowns.configure("asylumchat", "user", 1, USER_REPLY_COOLDOWN)
+            self.bot.cooldowns.configure("asylumchat", "global", 1, GLOBAL_REPLY_COOLDOWN)
+            
+            # Pick up sessions snapshotted by the previous shutdown or reload
+            await self.restore_asylum_sessions()
+            
+            # Recover sessions committed (or interrupted) since the last fold
+            await self.fold_asylum_journals()
+            
+            # Start background history compaction and idle-session sweeping
+            if not self.history_compaction_task.is_running():
+                self.history_compaction_task.start()
+            if not self.session_sweep_task.is_running():
+                self.session_sweep_task.start()
                 
             self.logger.info("AsylumChat cog loaded successfully")
         except Exception as e:
@@ -162,35 +232,50 @@ You're here to argue, rage-bait, and push buttons. You're chatting in a public c
         """Called when cog is unloaded - clean up gracefully"""
         try:
             self.logger.info("AsylumChat cog unloading...")
-            # End all active asylum sessions gracefully
+            if self.history_compaction_task.is_running():
+                self.history_compaction_task.cancel()
+            if self.session_sweep_task.is_running():
+                self.session_sweep_task.cancel()
+            self.bot.router.remove_owner("asylumchat")
+            # Snapshot live sessions instead of ending them - cog_load picks them back up
             if hasattr(self.bot, 'active_sessions'):
                 asylum_sessions = [
-                    session_id for session_id, session in self.bot.active_sessions.items()
+                    [session_id, session] for session_id, session in self.bot.active_sessions.items()
                     if session.get('type') == 'asylumchat'
                 ]
-                
-                # SEQUENTIAL cleanup to prevent API flooding
-                for session_id in asylum_sessions:
-                    try:
-                        await asyncio.sleep(0.5)  # Delay between cleanups
-                        # Session ID format: f"asylum-{channel_id}"
-                        if session_id.startswith("asylum-"):
-                            channel_id = int(session_id.split("-")[1])
-                            channel = self.bot.get_channel(channel_id)
-                            if channel:
-                                await self.end_asylum_session(channel, "cog_unload")
-                    except Exception as e:
-                        self.logger.error(f"Error ending asylum session {session_id}: {e}")
+                try:
+                    await asyncio.to_thread(nyxsessions.save_snapshot, self.asylum_snapshot_file, asylum_sessions)
+                    self.logger.info(f"Snapshotted {len(asylum_sessions)} asylum sessions")
+                except Exception as e:
+                    self.logger.error(f"Error snapshotting asylum sessions: {e}")
             self.logger.info("AsylumChat cog unloaded successfully")
         except Exception as e:
             self.logger.error(f"Error during asylumchat cog unload: {e}")
 
     @property
-    def active_sessions(self):
-        """Get the bot's global active_sessions (matching other cogs)."""
-        if not hasattr(self.bot, 'active_sessions'):
-            self.bot.active_sessions = {}
-        return self.bot.active_sessions
+    def active_sessions(self) -> nyxsessions.SessionRegistry:
+        """Get the bot's global active_sessions registry (matching other cogs)."""
+        return nyxsessions.ensure_session_registry(self.bot)
+
+    @tasks.loop(minutes=1)
+    async def session_sweep_task(self):
+        """Close asylum sessions that went idle and persist any the registry evicted."""
+        try:
+            for session_key, session in self.active_sessions.drain_evicted('asylumchat'):
+                await self.commit_asylum_session(session['channel_id'], session, "evicted")
+                self.bot.router.remove_channel(session['channel_id'], "asylumchat")
+            
+            for session_key in self.active_sessions.expired_keys('asylumchat'):
+                session = self.active_sessions.peek(session_key)
+                channel = self.bot.get_channel(session['channel_id'])
+                if channel:
+                    await self.end_asylum_session(channel, "idle_timeout")
+                else:
+                    await self.commit_asylum_session(session['channel_id'], session, "idle_timeout")
+                    self.active_sessions.pop(session_key, None)
+                    self.bot.router.remove_channel(session['channel_id'], "asylumchat")
+        except Exception as e:
+            self.logger.error(f"Error in asylum session sweep task: {e}")
 
     async def load_asylum_history(self) -> Dict:
         """Load asylum chat history from persistent storage (matching chat.py pattern)."""
@@ -240,54 +325,200 @@ You're here to argue, rage-bait, and push buttons. You're chatting in a public c
                     except Exception as restore_error:
                         self.logger.error(f"Failed to restore backup: {restore_error}")
 
-    @commands.command(name="asylumchat")
-    async def asylumchat(self, ctx):
-        """Start an AsylumChat session with Nyx in the current channel."""
-        # Check if command is used in allowed channel
-        if ctx.channel.id not in ASYLUM_CHANNEL_IDS:
-            await self.bot.safe_send(ctx.channel, "This command can only be used in Asylum chat channels.")
+    @tasks.loop(hours=6)
+    async def history_compaction_task(self):
+        """Periodically move old sessions out of the hot history file."""
+        try:
+            await self.fold_asylum_journals()
+            await self.compact_asylum_history()
+        except Exception as e:
+            self.logger.error(f"Error in asylum history compaction task: {e}")
+
+    async def fold_asylum_journals(self) -> int:
+        """
+        Merge ended (and crash-interrupted) session journals into asylum_history.json.
+        
+        Returns:
+            Number of journals folded
+        """
+        active_journals = {
+            session.get('journal') for session in self.active_sessions.values()
+            if session.get('type') == 'asylumchat' and session.get('journal')
+        }
+        async with self._history_write_lock:
+            asylum_history = await self.load_asylum_history()
+            asylum_history, folded = await asyncio.to_thread(
+                nyxsessions.fold_journals, asylum_history, self.asylum_journal_dir,
+                self.asylum_commit_log, active_journals, HISTORY_KEEP_MESSAGES
+            )
+            if not folded and not os.path.exists(self.asylum_commit_log):
+                return 0
+            
+            await self.save_asylum_history(asylum_history)
+            await asyncio.to_thread(nyxsessions.clear_folded, self.asylum_journal_dir, self.asylum_commit_log, folded)
+        
+        self.logger.debug(f"Folded {len(folded)} asylum session journals into history")
+        return len(folded)
+
+    async def restore_asylum_sessions(self) -> int:
+        """
+        Restore asylum sessions from the warm-restart snapshot. Sessions still in
+        bot.active_sessions (a reload rather than a restart) are left as they are.
+        Either way, every asylum session's channel is routed to this cog instance.
+        
+        Returns:
+            Number of sessions restored
+        """
+        try:
+            snapshot = await asyncio.to_thread(nyxsessions.load_snapshot, self.asylum_snapshot_file)
+        except Exception as e:
+            self.logger.error(f"Error loading asylum session snapshot: {e}")
+            snapshot = None
+        
+        restored = 0
+        for session_id, session in snapshot or []:
+            if session_id not in self.active_sessions:
+                if session.get('state') == 'activating':
+                    session['state'] = 'selecting_mode'  # Snapshotted mid-pick - let them pick again
+                self.active_sessions[session_id] = session
+                restored += 1
+        for session_id, session in self.active_sessions.items():
+            if session.get('type') == 'asylumchat':
+                self.bot.router.add_channel(session['channel_id'], "asylumchat", self.handle_channel_message)
+        if restored:
+            self.logger.info(f"Restored {restored} asylum sessions from snapshot")
+        return restored
+
+    async def journal_asylum_message(self, session: Dict, record: Dict):
+        """Append one record to the session's journal so a crash loses at most the current turn."""
+        if not session.get('journal'):
             return
+        try:
+            path = os.path.join(self.asylum_journal_dir, session['journal'])
+            await asyncio.to_thread(nyxsessions.append_jsonl, path, record)
+        except Exception as e:
+            self.logger.error(f"Error journaling asylum message for channel {session.get('channel_id')}: {e}")
+
+    async def compact_asylum_history(self) -> int:
+        """
+        Keep the last HISTORY_KEEP_SESSIONS sessions per channel in asylum_history.json
+        and append older ones to monthly gzip archive segments.
+        
+        Returns:
+            Number of sessions archived
+        """
+        async with self._history_write_lock:
+            asylum_history = await self.load_asylum_history()
+            hot_history, archived = nyxsessions.split_for_retention(asylum_history, HISTORY_KEEP_SESSIONS)
+            if not archived:
+                return 0
+            
+            # Archive first: a crash in between duplicates sessions instead of losing them
+            await asyncio.to_thread(nyxsessions.archive_sessions, self.asylum_archive_dir, archived)
+            await self.save_asylum_history(hot_history)
+        
+        self.logger.info(f"Archived {len(archived)} old asylum sessions")
+        return len(archived)
+
+    async def get_channel_context(self, channel_id: int) -> deque:
+        """Get a channel's recent-turn buffer, seeding it from the last saved session on first use."""
+        buffer = self._channel_context.get(channel_id)
+        if buffer is None:
+            buffer = deque(maxlen=CONTEXT_BUFFER_SIZE)
+            # Sessions ended since the last fold are newer than anything in the history file
+            pending = await asyncio.to_thread(
+                nyxsessions.latest_committed_messages, self.asylum_journal_dir, self.asylum_commit_log, str(channel_id)
+            )
+            if pending is not None:
+                buffer.extend(nyxsessions.records_from_dicts(pending[-2:]))  # Last 2 messages only
+            else:
+                asylum_history = await self.load_asylum_history()
+                channel_history = asylum_history.get(str(channel_id), [])
+                for past_session in channel_history[-1:]:  # Only last session
+                    buffer.extend(nyxsessions.records_from_dicts(past_session.get('messages', [])[-2:]))  # Last 2 messages only
+            self._channel_context[channel_id] = buffer
+        return buffer
+
+    def asylum_start_error(self, channel_id: int) -> Optional[Dict[str, Any]]:
+        """Why a session can't start in this channel, as message kwargs - or None if it can."""
+        # Check if command is used in allowed channel
+        if channel_id not in ASYLUM_CHANNEL_IDS:
+            return {"content": "This command can only be used in Asylum chat channels."}
 
         # Check if channel already has an active session (using session key format)
-        session_key = f"asylum-{ctx.channel.id}"
+        session_key = f"asylum-{channel_id}"
         if session_key in self.active_sessions and self.active_sessions[session_key].get("active"):
-            embed = discord.Embed(
+            return {"embed": discord.Embed(
                 title="⚠️ Active Session",
                 description="A chat session is already active in this channel. Use `!endasylumchat` to end it first.",
                 color=NYX_COLOR
+            )}
+        return None
+
+    def asylum_mode_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title="🩺 AsylumChat: Choose Nyx's Persona",
+            description=(
+                "**Select a mode for this chat:**\n\n"
+                + "\n".join(f"**{number}.** {label}" for number, _, label in ASYLUM_MODE_CHOICES)
+                + "\n\nPick one from the menu below, or type the number (1-4)."
+            ),
+            color=NYX_COLOR
+        )
+        embed.set_footer(text="Atypical Asylum Nyx • Monospace", icon_url=None)
+        return embed
+
+    def create_asylum_session(self, channel_id: int, initiator_id: int):
+        """Register a session waiting for its persona to be picked."""
+        started_at = datetime.now(timezone.utc)
+        self.active_sessions[f"asylum-{channel_id}"] = {
+            'type': 'asylumchat',
+            'channel_id': channel_id,
+            'state': 'selecting_mode',
+            'active': True,
+            'started_at': started_at,
+            'journal': nyxsessions.journal_name(str(channel_id), started_at),
+            'messages': [],
+            'mode': None,
+            'initiator': initiator_id
+        }
+        self.bot.router.add_channel(channel_id, "asylumchat", self.handle_channel_message)
+
+    @app_commands.command(name="asylumchat", description="Start an AsylumChat session with Nyx in this channel")
+    async def asylumchat_slash(self, interaction: discord.Interaction):
+        """Slash version of !asylumchat - the persona menu is the deferred response itself."""
+        error = self.asylum_start_error(interaction.channel_id)
+        if error:
+            await interaction.response.send_message(**error, ephemeral=True)
+            return
+        
+        await interaction.response.defer(thinking=True)
+        try:
+            await interaction.followup.send(
+                embed=self.asylum_mode_embed(),
+                view=AsylumModeView(self, interaction.channel_id)
             )
-            await self.bot.safe_send(ctx.channel, embed=embed)
+            self.create_asylum_session(interaction.channel_id, interaction.user.id)
+        except Exception as e:
+            self.logger.error(f"Error starting asylum chat via slash command in {interaction.channel_id}: {e}")
+            try:
+                await interaction.followup.send("An error occurred while setting up AsylumChat. Please try again.", ephemeral=True)
+            except discord.HTTPException:
+                pass
+
+    @commands.command(name="asylumchat")
+    async def asylumchat(self, ctx):
+        """Start an AsylumChat session with Nyx in the current channel."""
+        error = self.asylum_start_error(ctx.channel.id)
+        if error:
+            await self.bot.safe_send(ctx.channel, **error)
             return
 
         try:
-            # Send mode selection embed
-            embed = discord.Embed(
-                title="🩺 AsylumChat: Choose Nyx's Persona",
-                description=(
-                    "**Select a mode for this chat:**\n\n"
-                    "**1.** Default - Meet the true mysteriously charming Atypical Asylum Nurse\n"
-                    "**2.** Best Friend - Meet your sarcastic ride-or-die best friend\n"
-                    "**3.** Psychological & Dream Analyst - Meet your intellectual and introspective psychoanalyst\n"
-                    "**4.** Rage-baiting Debater - Meet your devil's advocate, overly confident Frat bro Nyx\n\n"
-                    "Type the number (1-4) to select a mode."
-                ),
-                color=NYX_COLOR
-            )
-            embed.set_footer(text="Atypical Asylum Nyx • Monospace", icon_url=None)
-            
-            await self.bot.safe_send(ctx.channel, embed=embed)
+            await self.bot.safe_send(ctx.channel, embed=self.asylum_mode_embed(), view=AsylumModeView(self, ctx.channel.id))
             
             # Create session (matching other cogs' session structure)
-            self.active_sessions[session_key] = {
-                'type': 'asylumchat',
-                'channel_id': ctx.channel.id,
-                'state': 'selecting_mode',
-                'active': True,
-                'started_at': datetime.now(timezone.utc),
-                'messages': [],
-                'mode': None,
-                'initiator': ctx.author.id
-            }
+            self.create_asylum_session(ctx.channel.id, ctx.author.id)
             
         except Exception as e:
             self.logger.error(f"Error starting asylum chat in {ctx.channel.id}: {e}")
@@ -324,16 +555,12 @@ You're here to argue, rage-bait, and push buttons. You're chatting in a public c
             # Force cleanup
             if session_key in self.active_sessions:
                 del self.active_sessions[session_key]
+            self.bot.router.remove_channel(ctx.channel.id, "asylumchat")
             await self.bot.safe_send(ctx.channel, "Session terminated.")
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Handle messages for AsylumChat sessions with enhanced rate limiting."""
+    async def handle_channel_message(self, message):
+        """Handle messages for AsylumChat sessions (routed here by the bot's message router)."""
         try:
-            # Ignore bot messages and DMs
-            if message.author.bot or not message.guild:
-                return
-            
             # Skip commands
             if message.content.startswith("!"):
                 return
@@ -358,93 +585,92 @@ You're here to argue, rage-bait, and push buttons. You're chatting in a public c
                     if session.get("state") == "selecting_mode":
                         await self.process_mode_selection(message)
                     elif session.get("state") == "active_chat":
-                        # CRITICAL: Add rate limiting check here too
-                        user_id = message.author.id
-                        now = time.time()
-                        
-                        # User-specific cooldown (15 seconds - FURTHER INCREASED)
-                        if user_id in self._user_cooldowns:
-                            if now - self._user_cooldowns[user_id] < 15.0:
-                                return
-                        
-                        # Global response cooldown (8 seconds - FURTHER INCREASED)
-                        if hasattr(self, '_last_response_time'):
-                            if now - self._last_response_time.get('global', 0) < 8.0:
-                                return
-                        
-                        self._user_cooldowns[user_id] = now
+                        # Per-user and global reply cooldowns (silently skip while cooling down)
+                        if not self.bot.cooldowns.try_acquire("asylumchat", user_id=message.author.id):
+                            return
                         await self.process_chat_message(message)
                 finally:
                     # Always remove from processing set
                     self._processing_messages.discard(message_id)
+            elif session_key not in self.active_sessions:
+                self.bot.router.remove_channel(message.channel.id, "asylumchat")
                     
         except Exception as e:
-            self.logger.error(f"Error in asylum on_message: {e}")
+            self.logger.error(f"Error in asylum message handler: {e}")
 
     async def process_mode_selection(self, message):
         """Handle mode selection messages."""
         try:
-            session_key = f"asylum-{message.channel.id}"
-            session = self.active_sessions[session_key]
-            
             selection = message.content.strip()
             
             # Map selection to mode
-            mode_map = {
-                "1": "default",
-                "2": "best_friend", 
-                "3": "psych_analyst",
-                "4": "rage_debater"
-            }
+            mode_map = {number: mode for number, mode, _ in ASYLUM_MODE_CHOICES}
             
             if selection not in mode_map:
-                await self.bot.safe_send(message.channel, "Please type a number between 1-4 to select a mode.")
+                await self.bot.safe_send(message.channel, "Please type a number between 1-4 to select a mode.", priority=Priority.INTERACTIVE)
                 return
-                
-            selected_mode = mode_map[selection]
+            
+            await self.activate_asylum_mode(message.channel, mode_map[selection])
+            
+        except Exception as e:
+            self.logger.error(f"Error processing mode selection: {e}")
+
+    async def activate_asylum_mode(self, channel, selected_mode: str):
+        """Move a session from persona selection into chat (typed number or select menu)."""
+        try:
+            session_key = f"asylum-{channel.id}"
+            session = self.active_sessions.get(session_key)
+            if not session or session.get("state") != "selecting_mode":
+                return  # Already picked (menu and typed number raced) or session gone
             mode_info = self.ASYLUM_MODES[selected_mode]
             
+            # Claim the pick before the first await so a racing pick stops at the check above
+            session["state"] = "activating"
+            
+            # Warm the channel's context buffer now so chat replies never touch disk
+            try:
+                await self.get_channel_context(channel.id)
+            except Exception:
+                session["state"] = "selecting_mode"
+                raise
+            
             # Update session to active chat mode
             self.active_sessions[session_key].update({
                 "state": "active_chat",
                 "mode": selected_mode
             })
+            await self.journal_asylum_message(session, {'start': {
+                'key': str(channel.id),
+                'mode': selected_mode,
+                'started_at': session['started_at'].isoformat()
+            }})
             
             # Send welcome message
             embed = discord.Embed(
                 description=mode_info['welcome_message'],
                 color=NYX_COLOR
             )
-            await self.bot.safe_send(message.channel, embed=embed)
+            await self.bot.safe_send(channel, embed=embed, priority=Priority.INTERACTIVE)
             
         except Exception as e:
-            self.logger.error(f"Error processing mode selection: {e}")
+            self.logger.error(f"Error activating asylum mode in {channel.id}: {e}")
 
     async def process_chat_message(self, message):
         """Handle ongoing chat messages in AsylumChat with enhanced rate limiting."""
         try:
             # Rate limiting is already handled in on_message(), no need to duplicate here
-            user_id = message.author.id
-            now = time.time()
-            
-            # Update cooldown timers (moved from duplicate check above)
-            self._user_cooldowns[user_id] = now
-            if not hasattr(self, '_last_response_time'):
-                self._last_response_time = {}
-            self._last_response_time['global'] = now
-            
             session_key = f"asylum-{message.channel.id}"
             session = self.active_sessions[session_key]
             mode = session.get("mode", "default")
             mode_info = self.ASYLUM_MODES[mode]
             
-            # Add user message to session
-            session['messages'].append({
-                'user': message.content,
-                'user_id': message.author.id,
-                'user_name': message.author.display_name,
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            })
+            context_buffer = await self.get_channel_context(message.channel.id)
+            
+            # Add user message to session and the channel's context buffer
+            user_turn = nyxsessions.MessageRecord.user(message.content, message.author.id, message.author.display_name)
+            session['messages'].append(user_turn)
+            context_buffer.append(user_turn)
+            await self.journal_asylum_message(session, user_turn.to_dict())
             
             # Keep only last 20 messages in current session (reduced further for performance)
             if len(session['messages']) > 20:
@@ -455,45 +681,21 @@ You're here to argue, rage-bait, and push buttons. You're chatting in a public c
             try:
                 # Use bot's anthropic client if available (matching chat.py pattern)
                 if hasattr(self.bot, 'anthropic_client') and self.bot.anthropic_client:
-                    # Load channel's conversation history for context
-                    asylum_history = await self.load_asylum_history()
-                    channel_history = asylum_history.get(str(message.channel.id), [])
-                    
-                    # Build conversation context (matching chat.py pattern)
+                    # Build conversation context from the in-memory ring buffer
+                    # (previous session's tail rolls out as this session grows)
                     conversation = []
                     
-                    # Add some previous session context if available (last 4 messages only - reduced)
-                    if channel_history:
-                        recent_history = []
-                        for past_session in channel_history[-1:]:  # Only last session
-                            recent_history.extend(past_session.get('messages', [])[-2:])  # Last 2 messages only
-                        
-                        for msg in recent_history[-4:]:  # Keep last 4 total
-                            if 'user' in msg:
-                                user_name = msg.get('user_name', 'User')
-                                conversation.append({
-                                    'role': 'user',
-                                    'content': f"{user_name}: {msg['user']}"
-                                })
-                            elif 'bot' in msg:
-                                conversation.append({
-                                    'role': 'assistant',
-                                    'content': msg['bot']
-                                })
-                    
-                    # Add current session messages (last 6 only - reduced)
-                    recent_messages = session['messages'][-6:]
-                    for msg in recent_messages:
-                        if 'user' in msg:
-                            user_name = msg.get('user_name', 'User')
+                    for msg in context_buffer:
+                        if msg.role is nyxsessions.Role.USER:
+                            user_name = msg.speaker_name or 'User'
                             conversation.append({
                                 'role': 'user',
-                                'content': f"{user_name}: {msg['user']}"
+                                'content': f"{user_name}: {msg.text}"
                             })
-                        elif 'bot' in msg:
+                        else:
                             conversation.append({
                                 'role': 'assistant',
-                                'content': msg['bot']
+                                'content': msg.text
                             })
                     
                     # Ensure we end with the current user message
@@ -531,22 +733,50 @@ You're here to argue, rage-bait, and push buttons. You're chatting in a public c
                 self.logger.error(f"Error generating asylum chat response: {e}")
                 reply = "I'm having a moment of brain fog, but I'm still here listening. What else would you like to talk about?"
             
-            # Add bot response to session
-            session['messages'].append({
-                'bot': reply,
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            })
+            # Add bot response to session and the channel's context buffer
+            bot_turn = nyxsessions.MessageRecord.bot(reply)
+            session['messages'].append(bot_turn)
+            context_buffer.append(bot_turn)
+            await self.journal_asylum_message(session, bot_turn.to_dict())
             
             # Send reply in channel with ENHANCED safe method
             embed = discord.Embed(
                 description=reply,
                 color=NYX_COLOR
             )
-            await self.bot.safe_send(message.channel, embed=embed)
+            await self.bot.safe_send(message.channel, embed=embed, priority=Priority.INTERACTIVE)
             
         except Exception as e:
             self.logger.error(f"Error processing asylum chat message: {e}")
 
+    async def commit_asylum_session(self, channel_id: int, session: Dict, reason: str):
+        """Record a finished session. Its turns are already journaled, so only metadata is written."""
+        messages = session.get('messages', [])
+        
+        # The next session carries over only this one's last 2 messages, like a buffer seeded from history
+        buffer = self._channel_context.get(channel_id)
+        if buffer is not None:
+            buffer.clear()
+            buffer.extend(messages[-2:])
+        
+        try:
+            session_duration = datetime.now(timezone.utc) - session['started_at']
+            commit = {
+                "key": str(channel_id),
+                "journal": session.get('journal'),
+                "mode": session.get('mode', 'unknown'),
+                "ended_at": datetime.now(timezone.utc).isoformat(),
+                "duration": str(session_duration).split('.')[0],
+                "end_reason": reason
+            }
+            if not session.get('journal'):
+                commit["messages"] = [msg.to_dict() for msg in messages]
+            async with self._history_write_lock:
+                await asyncio.to_thread(nyxsessions.append_jsonl, self.asylum_commit_log, commit)
+            self.logger.debug(f"Committed asylum session for channel {channel_id}: {len(messages)} messages")
+        except Exception as e:
+            self.logger.error(f"Error saving asylum history for channel {channel_id}: {e}")
+
     async def end_asylum_session(self, channel, reason="unknown"):
         """End asylum session and save history (matching chat.py pattern)."""
         try:
@@ -557,29 +787,13 @@ You're here to argue, rage-bait, and push buttons. You're chatting in a public c
                 
             session = self.active_sessions[session_key]
             messages = session.get('messages', [])
-            mode = session.get('mode', 'unknown')
-            session_duration = datetime.now(timezone.utc) - session['started_at']
-            
-            # Save session history
-            try:
-                asylum_history = await self.load_asylum_history()
-                asylum_history.setdefault(str(channel.id), []).append({
-                    "mode": mode,
-                    "messages": messages,
-                    "ended_at": datetime.now(timezone.utc).isoformat(),
-                    "duration": str(session_duration).split('.')[0],
-                    "end_reason": reason,
-                    "message_count": len([msg for msg in messages if 'user' in msg])
-                })
-                await self.save_asylum_history(asylum_history)
-                self.logger.debug(f"Saved asylum history for channel {channel.id}: {len(messages)} messages")
-            except Exception as e:
-                self.logger.error(f"Error saving asylum history for channel {channel.id}: {e}")
+            await self.commit_asylum_session(channel.id, session, reason)
 
             # Clean up session
             del self.active_sessions[session_key]
+            self.bot.router.remove_channel(channel.id, "asylumchat")
             
-            message_count = len([msg for msg in messages if 'user' in msg])
+            message_count = len([msg for msg in messages if msg.role is nyxsessions.Role.USER])
             self.logger.debug(f"Asylum session ended in {channel.name} ({message_count} user messages, reason: {reason})")
             
         except Exception as e:
@@ -590,6 +804,7 @@ You're here to argue, rage-bait, and push buttons. You're chatting in a public c
                 if (session_key in self.active_sessions and 
                     self.active_sessions[session_key].get("type") == "asylumchat"):
                     del self.active_sessions[session_key]
+                self.bot.router.remove_channel(channel.id, "asylumchat")
             except:
                 pass
 
@@ -3,13 +3,18 @@ import os
 import json
 import asyncio
 import aiofiles
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
-from discord.ext import commands
+from typing import Dict, Any, Optional, List
+from discord.ext import commands, tasks
+from discord import app_commands
 import discord
 import random
 import logging
 
+import nyxsessions
+from nyxoutbound import Priority, SendStatus
+
 try:
     from anthropic import Anthropic
     ANTHROPIC_AVAILABLE = True
@@ -21,6 +26,56 @@ except ImportError:
 NYX_COLOR = 0x76b887
 STORAGE_PATH = os.getenv("STORAGE_PATH", "./nyxnotes")
 os.makedirs(STORAGE_PATH, exist_ok=True)
+HISTORY_KEEP_SESSIONS = 10  # Sessions per user kept in the hot history file; older ones are archived
+HISTORY_KEEP_MESSAGES = 25  # Messages per session kept in the hot history file
+PRIOR_CONTEXT_MESSAGES = 2       # Messages carried over from the user's previous session
+PRIOR_CONTEXT_CACHE_USERS = 500  # Users whose previous-session tail stays in memory
+
+# ★ Topics offered at the start of a session: (number typed, mode key, menu label, emoji)
+COMFORT_TOPICS = [
+    ("1", "suicide", "Suicide ideation - Crisis support and empathy", "1️⃣"),
+    ("2", "anxiety", "Anxiety - Grounding techniques, calming strategies, and empathy", "2️⃣"),
+    ("3", "addiction", "Addiction - Recovery support and harm reduction", "3️⃣"),
+    ("4", "comfort", "General comfort - Quick warmth and emotional support plus uplifting messages", "4️⃣"),
+    ("5", "depression", "Depression - Understanding and gentle encouragement during dark times", "5️⃣"),
+    ("6", "anger", "Anger - Processing and channeling emotions", "6️⃣"),
+]
+
+class ComfortTopicView(discord.ui.View):
+    """Topic select menu attached to the DM menu - picking is one interaction instead of a typed reply."""
+    
+    def __init__(self, cog: "Comfort", user_id: int):
+        super().__init__(timeout=nyxsessions.SESSION_IDLE_TTLS['comfort'])
+        self.cog = cog
+        self.user_id = user_id
+        options = [
+            discord.SelectOption(label=label, value=mode, emoji=emoji)
+            for _, mode, label, emoji in COMFORT_TOPICS
+        ]
+        options.append(discord.SelectOption(label="Cancel", value="cancel", emoji="✖️"))
+        select = discord.ui.Select(placeholder="Choose a support topic...", options=options)
+        select.callback = self.on_select
+        self.add_item(select)
+    
+    async def on_select(self, interaction: discord.Interaction):
+        session = self.cog.active_sessions.get(self.user_id)
+        if not session or session.get('type') != 'comfort' or session.get('state') != 'selecting_topic':
+            await interaction.response.edit_message(view=None)
+            self.stop()
+            return
+        
+        # Acknowledge now - loading prior context and sending the welcome can exceed 3 seconds
+        await interaction.response.defer()
+        self.stop()
+        choice = interaction.data['values'][0]
+        if choice == 'cancel':
+            await self.cog.cancel_comfort_selection(interaction.channel, self.user_id)
+        else:
+            await self.cog.activate_comfort_topic(interaction.channel, interaction.user, choice)
+        try:
+            await interaction.edit_original_response(view=None)
+        except discord.HTTPException:
+            pass
 
 class Comfort(commands.Cog):
     """Handles DM comfort sessions with topic selection and support."""
@@ -29,9 +84,17 @@ class Comfort(commands.Cog):
         self.bot = bot
         self.storage_path = STORAGE_PATH
         self.comfort_history_file = os.path.join(self.storage_path, 'comfort_history.json')
+        self.comfort_archive_dir = os.path.join(self.storage_path, 'archive', 'comfort_history')
+        self.comfort_journal_dir = os.path.join(self.storage_path, 'journals', 'comfort')
+        self.comfort_commit_log = os.path.join(self.storage_path, 'comfort_commits.jsonl')
+        self.comfort_snapshot_file = os.path.join(self.storage_path, 'snapshots', 'comfort_sessions.json')
         self._lock = asyncio.Lock()
+        self._history_write_lock = asyncio.Lock()  # Serializes read-modify-write of the history file
         self.logger = logging.getLogger("comfort")
         
+        # Tail of each user's most recent session, so new sessions skip the history file
+        self._prior_context_cache: "OrderedDict[int, List[nyxsessions.MessageRecord]]" = OrderedDict()
+        
         # Ensure storage directory exists
         os.makedirs(self.storage_path, exist_ok=True)
 
@@ -141,9 +204,20 @@ RESPONSE STYLE:
                     else:
                         self.logger.warning("⚠️ ANTHROPIC_API_KEY not found in environment")
             
-            # Initialize unified session storage on bot if not exists
-            if not hasattr(self.bot, 'active_sessions'):
-                self.bot.active_sessions = {}
+            # Initialize unified session registry on bot if not exists
+            nyxsessions.ensure_session_registry(self.bot)
+            
+            # Pick up sessions snapshotted by the previous shutdown or reload
+            await self.restore_comfort_sessions()
+            
+            # Recover sessions committed (or interrupted) since the last fold
+            await self.fold_comfort_journals()
+            
+            # Start background history compaction and idle-session sweeping
+            if not self.history_compaction_task.is_running():
+                self.history_compaction_task.start()
+            if not self.session_sweep_task.is_running():
+                self.session_sweep_task.start()
                 
             self.logger.info("Comfort cog loaded successfully")
         except Exception as e:
@@ -154,32 +228,80 @@ RESPONSE STYLE:
         """Called when cog is unloaded - clean up gracefully"""
         try:
             self.logger.info("Comfort cog unloading...")
-            # End all active comfort sessions gracefully
+            if self.history_compaction_task.is_running():
+                self.history_compaction_task.cancel()
+            if self.session_sweep_task.is_running():
+                self.session_sweep_task.cancel()
+            self.bot.router.remove_owner("comfort")
+            # Snapshot live sessions instead of ending them - cog_load picks them back up
             if hasattr(self.bot, 'active_sessions'):
                 comfort_sessions = [
-                    user_id for user_id, session in self.bot.active_sessions.items()
+                    [user_id, session] for user_id, session in self.bot.active_sessions.items()
                     if session.get('type') == 'comfort'
                 ]
-                
-                # SEQUENTIAL cleanup to prevent API flooding
-                for user_id in comfort_sessions:
-                    try:
-                        await asyncio.sleep(0.5)  # Delay between cleanups
-                        user = self.bot.get_user(user_id)
-                        if user:
-                            await self.end_comfort_dm_session(user, None, "cog_unload")
-                    except Exception as e:
-                        self.logger.error(f"Error ending comfort session for user {user_id}: {e}")
+                try:
+                    await asyncio.to_thread(nyxsessions.save_snapshot, self.comfort_snapshot_file, comfort_sessions)
+                    self.logger.info(f"Snapshotted {len(comfort_sessions)} comfort sessions")
+                except Exception as e:
+                    self.logger.error(f"Error snapshotting comfort sessions: {e}")
             self.logger.info("Comfort cog unloaded successfully")
         except Exception as e:
             self.logger.error(f"Error during comfort cog unload: {e}")
 
     @property
-    def active_sessions(self):
-        """Get the bot's global active_sessions."""
-        if not hasattr(self.bot, 'active_sessions'):
-            self.bot.active_sessions = {}
-        return self.bot.active_sessions
+    def active_sessions(self) -> nyxsessions.SessionRegistry:
+        """Get the bot's global active_sessions registry."""
+        return nyxsessions.ensure_session_registry(self.bot)
+
+    @tasks.loop(minutes=1)
+    async def session_sweep_task(self):
+        """Close comfort sessions that went idle and persist any the registry evicted."""
+        try:
+            for user_id, session in self.active_sessions.drain_evicted('comfort'):
+                await self.commit_comfort_session(user_id, session, "evicted")
+                self.bot.router.remove_dm(user_id, "comfort")
+            
+            for user_id in self.active_sessions.expired_keys('comfort'):
+                session = self.active_sessions.peek(user_id)
+                user = self.bot.get_user(user_id)
+                if user:
+                    await self.end_comfort_dm_session(user, self.bot.get_channel(session.get('channel_id')), "idle_timeout")
+                else:
+                    await self.commit_comfort_session(user_id, session, "idle_timeout")
+                    self.active_sessions.pop(user_id, None)
+                    self.bot.router.remove_dm(user_id, "comfort")
+        except Exception as e:
+            self.logger.error(f"Error in comfort session sweep task: {e}")
+
+    @commands.command(name="sessionstats", hidden=True)
+    @commands.has_permissions(administrator=True)
+    async def session_stats(self, ctx):
+        """Admin command to show active session registry size and evictions."""
+        try:
+            stats = self.active_sessions.stats()
+            by_type = "\n".join(f"{session_type}: **{count}**" for session_type, count in stats['by_type'].items()) or "None"
+            
+            embed = discord.Embed(
+                title="🗂️ Active Sessions",
+                color=NYX_COLOR
+            )
+            embed.add_field(
+                name="Registry",
+                value=(
+                    f"**{stats['sessions']}** / {stats['max_sessions']} sessions\n"
+                    f"**{stats['messages_held']}** messages held in memory"
+                ),
+                inline=True
+            )
+            embed.add_field(name="By Type", value=by_type, inline=True)
+            embed.add_field(
+                name="Closed Automatically",
+                value=f"**{stats['expired']}** idle\n**{stats['evicted']}** evicted (cap)",
+                inline=True
+            )
+            await self.bot.safe_send(ctx.channel, embed=embed)
+        except Exception as e:
+            self.logger.error(f"Error in sessionstats: {e}")
 
     async def load_comfort_history(self) -> Dict:
         """Load comfort history from persistent storage."""
@@ -229,94 +351,241 @@ RESPONSE STYLE:
                     except Exception as restore_error:
                         self.logger.error(f"Failed to restore backup: {restore_error}")
 
-    @commands.command(name="dmcomfort")
-    async def dmcomfort(self, ctx):
-        """Start a specialized comfort DM session with topic selection."""
-        user_id = ctx.author.id
+    @tasks.loop(hours=6)
+    async def history_compaction_task(self):
+        """Periodically move old sessions out of the hot history file."""
+        try:
+            await self.fold_comfort_journals()
+            await self.compact_comfort_history()
+        except Exception as e:
+            self.logger.error(f"Error in comfort history compaction task: {e}")
+
+    async def fold_comfort_journals(self) -> int:
+        """
+        Merge ended (and crash-interrupted) session journals into comfort_history.json.
         
-        # Send initial thinking message using safe method
-        thinking_msg = await self.bot.safe_send(ctx.channel, "Setting up your private comfort session...")
+        Returns:
+            Number of journals folded
+        """
+        active_journals = {
+            session.get('journal') for session in self.active_sessions.values()
+            if session.get('type') == 'comfort' and session.get('journal')
+        }
+        async with self._history_write_lock:
+            history = await self.load_comfort_history()
+            history, folded = await asyncio.to_thread(
+                nyxsessions.fold_journals, history, self.comfort_journal_dir,
+                self.comfort_commit_log, active_journals, HISTORY_KEEP_MESSAGES
+            )
+            if not folded and not os.path.exists(self.comfort_commit_log):
+                return 0
+            
+            await self.save_comfort_history(history)
+            await asyncio.to_thread(nyxsessions.clear_folded, self.comfort_journal_dir, self.comfort_commit_log, folded)
         
-        if not thinking_msg:
-            return  # Failed to send initial message
+        self.logger.debug(f"Folded {len(folded)} comfort session journals into history")
+        return len(folded)
+
+    async def restore_comfort_sessions(self) -> int:
+        """
+        Restore comfort sessions from the warm-restart snapshot. Sessions still in
+        bot.active_sessions (a reload rather than a restart) are left as they are.
+        Either way, every comfort session's DMs are routed to this cog instance.
         
+        Returns:
+            Number of sessions restored
+        """
         try:
-            # Check if user already has active session
-            if user_id in self.active_sessions and self.active_sessions[user_id].get("active"):
-                embed = discord.Embed(
-                    title="⚠️ Active Session",
-                    description="You already have an active comfort session. Use `!endcomfort` to end it first.",
-                    color=NYX_COLOR
-                )
-                await self.bot.safe_send(thinking_msg.channel, embed=embed)
-                try:
-                    await thinking_msg.delete()
-                except:
-                    pass
-                return
+            snapshot = await asyncio.to_thread(nyxsessions.load_snapshot, self.comfort_snapshot_file)
+        except Exception as e:
+            self.logger.error(f"Error loading comfort session snapshot: {e}")
+            snapshot = None
+        
+        restored = 0
+        for user_id, session in snapshot or []:
+            if user_id not in self.active_sessions:
+                if session.get('state') == 'activating':
+                    session['state'] = 'selecting_topic'  # Snapshotted mid-pick - let them pick again
+                self.active_sessions[user_id] = session
+                restored += 1
+        for user_id, session in self.active_sessions.items():
+            if session.get('type') == 'comfort':
+                self.bot.router.add_dm(user_id, "comfort", self.handle_dm)
+        if restored:
+            self.logger.info(f"Restored {restored} comfort sessions from snapshot")
+        return restored
 
-            # Check if user has DM channel
-            try:
-                dm_channel = await ctx.author.create_dm()
-            except discord.Forbidden:
-                embed = discord.Embed(
-                    title="❌ DM Access Required",
-                    description="I need to send you a private message. Please enable DMs from server members and try again.",
-                    color=0xff0000
-                )
-                await self.bot.safe_send(thinking_msg.channel, embed=embed)
-                try:
-                    await thinking_msg.delete()
-                except:
-                    pass
-                return
+    async def journal_comfort_message(self, user_id: int, record: Dict):
+        """Append one record to the session's journal so a crash loses at most the current turn."""
+        session = self.active_sessions.get(user_id)
+        if not session or not session.get('journal'):
+            return
+        try:
+            path = os.path.join(self.comfort_journal_dir, session['journal'])
+            await asyncio.to_thread(nyxsessions.append_jsonl, path, record)
+        except Exception as e:
+            self.logger.error(f"Error journaling comfort message for {user_id}: {e}")
+
+    async def compact_comfort_history(self) -> int:
+        """
+        Keep the last HISTORY_KEEP_SESSIONS sessions per user in comfort_history.json
+        and append older ones to monthly gzip archive segments.
+        
+        Returns:
+            Number of sessions archived
+        """
+        async with self._history_write_lock:
+            history = await self.load_comfort_history()
+            hot_history, archived = nyxsessions.split_for_retention(history, HISTORY_KEEP_SESSIONS)
+            if not archived:
+                return 0
+            
+            # Archive first: a crash in between duplicates sessions instead of losing them
+            await asyncio.to_thread(nyxsessions.archive_sessions, self.comfort_archive_dir, archived)
+            await self.save_comfort_history(hot_history)
+        
+        self.logger.info(f"Archived {len(archived)} old comfort sessions")
+        return len(archived)
+
+    async def get_prior_context(self, user_id: int) -> List[nyxsessions.MessageRecord]:
+        """Last messages of the user's previous session (history file is read at most once per user)."""
+        if user_id in self._prior_context_cache:
+            self._prior_context_cache.move_to_end(user_id)
+            return list(self._prior_context_cache[user_id])
+        
+        # Sessions ended since the last fold are newer than anything in the history file
+        pending = await asyncio.to_thread(
+            nyxsessions.latest_committed_messages, self.comfort_journal_dir, self.comfort_commit_log, str(user_id)
+        )
+        if pending is not None:
+            prior_context = nyxsessions.records_from_dicts(pending[-PRIOR_CONTEXT_MESSAGES:])
+        else:
+            comfort_history = await self.load_comfort_history()
+            user_history = comfort_history.get(str(user_id), [])
+            prior_context = []
+            for past_session in user_history[-1:]:  # Only last session
+                prior_context.extend(nyxsessions.records_from_dicts(past_session.get('messages', [])[-PRIOR_CONTEXT_MESSAGES:]))
+        
+        self._remember_prior_context(user_id, prior_context)
+        return list(prior_context)
 
-            # Send mode selection to DM
-            menu_msg = (
-                f"Hi {ctx.author.display_name} 💕\n\n"
-                "I'm here to support you. What kind of help do you need today?\n\n"
-                "**Please type the number of the topic you'd like support with:**\n\n"
-                "1️⃣ Suicide ideation - Crisis support and empathy\n"
-                "2️⃣ Anxiety - Grounding techniques, calming strategies, and empathy\n"
-                "3️⃣ Addiction - Recovery support and harm reduction\n"
-                "4️⃣ General comfort - Quick warmth and emotional support plus uplifting messages\n"
-                "5️⃣ Depression - Understanding and gentle encouragement during dark times\n"
-                "6️⃣ Anger - Processing and channeling emotions\n\n"
-                "Type a number (1-6) to select, or type 'cancel' to end the session."
+    def _remember_prior_context(self, user_id: int, messages: List[nyxsessions.MessageRecord]):
+        """Cache the tail of a user's latest session, evicting least recently used users."""
+        self._prior_context_cache[user_id] = list(messages[-PRIOR_CONTEXT_MESSAGES:])
+        self._prior_context_cache.move_to_end(user_id)
+        while len(self._prior_context_cache) > PRIOR_CONTEXT_CACHE_USERS:
+            self._prior_context_cache.popitem(last=False)
+
+    def dm_access_embed(self) -> discord.Embed:
+        return discord.Embed(
+            title="❌ DM Access Required",
+            description="I need to send you a private message. Please enable DMs from server members and try again.",
+            color=0xff0000
+        )
+
+    async def open_comfort_session(self, user) -> Optional[discord.Embed]:
+        """
+        Send the topic menu to the user's DMs and create their session.
+        
+        Returns:
+            An embed explaining why no session was started, or None on success
+        """
+        user_id = user.id
+        
+        # Check if user already has active session
+        if user_id in self.active_sessions and self.active_sessions[user_id].get("active"):
+            return discord.Embed(
+                title="⚠️ Active Session",
+                description="You already have an active comfort session. Use `!endcomfort` to end it first.",
+                color=NYX_COLOR
             )
-            embed = discord.Embed(
-                title="🪴 Support Topic Selection",
-                description=menu_msg,
+
+        # Check if user has DM channel
+        try:
+            dm_channel = await user.create_dm()
+        except discord.Forbidden:
+            return self.dm_access_embed()
+
+        # Send topic selection to DM - the select menu is the quick path, typing a number still works
+        menu_msg = (
+            f"Hi {user.display_name} 💕\n\n"
+            "I'm here to support you. What kind of help do you need today?\n\n"
+            "**Please pick a topic from the menu below, or type its number:**\n\n"
+            + "\n".join(f"{emoji} {label}" for _, _, label, emoji in COMFORT_TOPICS)
+            + "\n\nType a number (1-6) to select, or type 'cancel' to end the session."
+        )
+        embed = discord.Embed(
+            title="🪴 Support Topic Selection",
+            description=menu_msg,
+            color=NYX_COLOR
+        )
+        
+        # Send to DM using safe method
+        dm_result = await self.bot.safe_send(dm_channel, embed=embed, view=ComfortTopicView(self, user_id))
+        if dm_result.status == SendStatus.FORBIDDEN:
+            return self.dm_access_embed()
+        if not dm_result:
+            return discord.Embed(
+                title="⏳ Couldn't Reach You",
+                description="I couldn't send your DM just now. Please try again in a moment.",
+                color=0xff0000
+            )
+        
+        # Create session
+        started_at = datetime.now(timezone.utc)
+        self.active_sessions[user_id] = {
+            'type': 'comfort',
+            'channel_id': dm_channel.id,
+            'state': 'selecting_topic',
+            'active': True,
+            'started_at': started_at,
+            'journal': nyxsessions.journal_name(str(user_id), started_at),
+            'messages': [],
+            'topic': None,
+            'initiator': user_id
+        }
+        self.bot.router.add_dm(user_id, "comfort", self.handle_dm)
+        return None
+
+    @app_commands.command(name="dmcomfort", description="Start a private comfort session in your DMs")
+    async def dmcomfort_slash(self, interaction: discord.Interaction):
+        """Slash version of !dmcomfort - replies privately instead of posting and editing a status message."""
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            error_embed = await self.open_comfort_session(interaction.user)
+            embed = error_embed or discord.Embed(
+                title="✅ Comfort Session Started",
+                description="Check your DMs to continue with your comfort session.",
                 color=NYX_COLOR
             )
-            
-            # Send to DM using safe method
-            dm_result = await self.bot.safe_send(dm_channel, embed=embed)
-            if not dm_result:
-                embed = discord.Embed(
-                    title="❌ DM Access Required",
-                    description="I need to send you a private message. Please enable DMs from server members and try again.",
-                    color=0xff0000
-                )
-                await self.bot.safe_send(thinking_msg.channel, embed=embed)
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        except Exception as e:
+            self.logger.error(f"Error starting comfort via slash command for {interaction.user.id}: {e}")
+            try:
+                await interaction.followup.send("An error occurred while setting up your comfort session. Please try again.", ephemeral=True)
+            except discord.HTTPException:
+                pass
+
+    @commands.command(name="dmcomfort")
+    async def dmcomfort(self, ctx):
+        """Start a specialized comfort DM session with topic selection."""
+        # Send initial thinking message using safe method
+        thinking_result = await self.bot.safe_send(ctx.channel, "Setting up your private comfort session...")
+        
+        if not thinking_result:
+            return  # Failed to send initial message
+        thinking_msg = thinking_result.message
+        
+        try:
+            error_embed = await self.open_comfort_session(ctx.author)
+            if error_embed:
+                await self.bot.safe_send(thinking_msg.channel, embed=error_embed)
                 try:
                     await thinking_msg.delete()
                 except:
                     pass
                 return
             
-            # Create session
-            self.active_sessions[user_id] = {
-                'type': 'comfort',
-                'channel_id': dm_channel.id,
-                'state': 'selecting_topic',
-                'active': True,
-                'started_at': datetime.now(timezone.utc),
-                'messages': [],
-                'topic': None,
-                'initiator': ctx.author.id
-            }
-            
             # Update original message
             embed = discord.Embed(
                 title="✅ Comfort Session Started",
@@ -365,6 +634,7 @@ RESPONSE STYLE:
                 # Force cleanup
                 if user_id in self.active_sessions and self.active_sessions[user_id].get('type') == 'comfort':
                     del self.active_sessions[user_id]
+                self.bot.router.remove_dm(user_id, "comfort")
                 embed = discord.Embed(
                     title="✅ Session Terminated",
                     description="Your comfort session has been terminated. There was an error during cleanup, but the session is now ended.",
@@ -388,14 +658,9 @@ RESPONSE STYLE:
                 )
             await self.bot.safe_send(ctx.channel, embed=embed)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Handle DM messages for comfort sessions."""
+    async def handle_dm(self, message):
+        """Handle DM messages for comfort sessions (routed here by the bot's message router)."""
         try:
-            # Only process DM messages from non-bot users
-            if not isinstance(message.channel, discord.DMChannel) or message.author.bot:
-                return
-            
             user_id = message.author.id
             
             # Check if this user has an active comfort session
@@ -405,11 +670,15 @@ RESPONSE STYLE:
                 session = self.active_sessions[user_id]
                 if session.get('state') == 'selecting_topic':
                     await self.process_comfort_topic_selection(message.channel, message.author, message.content)
+                elif session.get('state') == 'activating':
+                    return  # Topic pick still being set up
                 else:
                     await self.process_comfort_support_message(message.channel, message.author, message.content)
+            else:
+                self.bot.router.remove_dm(user_id, "comfort")
                     
         except Exception as e:
-            self.logger.error(f"Error in comfort on_message: {e}")
+            self.logger.error(f"Error in comfort message handler: {e}")
 
     async def process_comfort_topic_selection(self, channel, user, message_content):
         """Handle topic selection messages."""
@@ -425,38 +694,66 @@ RESPONSE STYLE:
                 
             selection = message_content.strip().lower()
             if selection == 'cancel':
-                await self.bot.safe_send(channel, "No problem! The session has been cancelled. Take care! 💕")
-                del self.active_sessions[user_id]
+                await self.cancel_comfort_selection(channel, user_id)
                 return
             
-            topic_map = {
-                '1': 'suicide',
-                '2': 'anxiety', 
-                '3': 'addiction',
-                '4': 'comfort',
-                '5': 'depression',
-                '6': 'anger'
-            }
+            topic_map = {number: mode for number, mode, _, _ in COMFORT_TOPICS}
             
             if selection not in topic_map:
-                await self.bot.safe_send(channel, "Please type a number between 1-6 to select a topic, or 'cancel' to end.")
+                await self.bot.safe_send(channel, "Please type a number between 1-6 to select a topic, or 'cancel' to end.", priority=Priority.INTERACTIVE)
                 return
+            
+            await self.activate_comfort_topic(channel, user, topic_map[selection])
                 
-            selected_topic = topic_map[selection]
+        except Exception as e:
+            self.logger.error(f"Error processing comfort topic selection from {user.id}: {e}")
+
+    async def cancel_comfort_selection(self, channel, user_id: int):
+        """Cancel a session that never got past topic selection."""
+        await self.bot.safe_send(channel, "No problem! The session has been cancelled. Take care! 💕", priority=Priority.INTERACTIVE)
+        self.active_sessions.pop(user_id, None)
+        self.bot.router.remove_dm(user_id, "comfort")
+
+    async def activate_comfort_topic(self, channel, user, selected_topic: str):
+        """Move a session from topic selection into chat (typed number or select menu)."""
+        try:
+            user_id = user.id
+            session_data = self.active_sessions.get(user_id)
+            if not session_data or session_data.get('state') != 'selecting_topic':
+                return  # Already picked (menu and typed number raced) or session gone
             mode_info = self.DM_COMFORT_MODES[selected_topic]
             
+            # Claim the pick before the first await so a racing pick stops at the check above
+            session_data['state'] = 'activating'
+            
+            # Load prior-session context once; support messages reuse it from the session
+            try:
+                prior_context = await self.get_prior_context(user_id)
+            except Exception:
+                session_data['state'] = 'selecting_topic'
+                raise
+            
             # Update session to active comfort mode
             self.active_sessions[user_id].update({
                 'state': 'active_comfort',
-                'comfort_mode': selected_topic
+                'comfort_mode': selected_topic,
+                'prior_context': prior_context
             })
+            await self.journal_comfort_message(user_id, {'start': {
+                'key': str(user_id),
+                'mode': selected_topic,
+                'started_at': session_data['started_at'].isoformat()
+            }})
             
             # Send welcome message first
-            welcome_result = await self.bot.safe_send(channel, mode_info['welcome_message'])
-            if not welcome_result:
-                self.logger.warning(f"Failed to send welcome message to user {user_id} - ending session")
+            welcome_result = await self.bot.safe_send(channel, mode_info['welcome_message'], priority=Priority.INTERACTIVE)
+            if welcome_result.status == SendStatus.FORBIDDEN:
+                self.logger.warning(f"DMs to user {user_id} are blocked - ending session")
                 await self.end_comfort_dm_session(user, None, "dm_blocked")
                 return
+            if not welcome_result:
+                # Rate limited or a transient failure - the session is live, the confirmation below still tells them so
+                self.logger.warning(f"Welcome message to user {user_id} not sent ({welcome_result.status.name}) - continuing")
             
             confirm_msg = (
                 f"I'm here to help with {mode_info['name'].lower()}.\n\n"
@@ -470,10 +767,12 @@ RESPONSE STYLE:
                 color=NYX_COLOR
             )
             
-            confirm_result = await self.bot.safe_send(channel, embed=embed)
-            if not confirm_result:
-                self.logger.warning(f"Failed to send confirmation to user {user_id} - ending session")
+            confirm_result = await self.bot.safe_send(channel, embed=embed, priority=Priority.INTERACTIVE)
+            if confirm_result.status == SendStatus.FORBIDDEN:
+                self.logger.warning(f"DMs to user {user_id} are blocked - ending session")
                 await self.end_comfort_dm_session(user, None, "dm_blocked")
+            elif confirm_result.should_fallback:
+                await self.bot.safe_send(channel, confirm_msg, priority=Priority.INTERACTIVE)
                 
         except Exception as e:
             self.logger.error(f"Error processing comfort topic selection from {user.id}: {e}")
@@ -495,10 +794,9 @@ RESPONSE STYLE:
             comfort_mode = session.get('comfort_mode', 'comfort')
             
             # Add user message to session
-            session['messages'].append({
-                'user': message_content,
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            })
+            user_turn = nyxsessions.MessageRecord.user(message_content)
+            session['messages'].append(user_turn)
+            await self.journal_comfort_message(user_id, user_turn.to_dict())
             
             # Keep only last 25 messages in current session (reduced from 50)
             if len(session['messages']) > 25:
@@ -512,44 +810,27 @@ RESPONSE STYLE:
             try:
                 # Use bot's anthropic client if available
                 if hasattr(self.bot, 'anthropic_client') and self.bot.anthropic_client:
-                    # Load user's comfort history for context
-                    comfort_history = await self.load_comfort_history()
-                    user_history = comfort_history.get(str(user_id), [])
+                    # Previous-session context was loaded once at topic selection
+                    recent_history = session.get('prior_context', [])
                     
                     # Build conversation context
                     conversation = []
                     
-                    # Add some previous session context if available (last 4 messages - reduced from 10)
-                    if user_history:
-                        recent_history = []
-                        for past_session in user_history[-1:]:  # Only last 1 session (reduced from 2)
-                            recent_history.extend(past_session.get('messages', [])[-2:])  # Last 2 messages each (reduced from 5)
-                        
+                    # Add some previous session context if available
+                    if recent_history:
                         for msg in recent_history[-4:]:  # Keep last 4 total
-                            if 'user' in msg:
-                                conversation.append({
-                                    'role': 'user',
-                                    'content': msg['user']
-                                })
-                            elif 'bot' in msg:
-                                conversation.append({
-                                    'role': 'assistant',
-                                    'content': msg['bot']
-                                })
+                            conversation.append({
+                                'role': 'user' if msg.role is nyxsessions.Role.USER else 'assistant',
+                                'content': msg.text
+                            })
                     
                     # Add current session messages (reduced from 20 to 8)
                     recent_messages = session['messages'][-8:]
                     for msg in recent_messages:
-                        if 'user' in msg:
-                            conversation.append({
-                                'role': 'user',
-                                'content': msg['user']
-                            })
-                        elif 'bot' in msg:
-                            conversation.append({
-                                'role': 'assistant',
-                                'content': msg['bot']
-                            })
+                        conversation.append({
+                            'role': 'user' if msg.role is nyxsessions.Role.USER else 'assistant',
+                            'content': msg.text
+                        })
                     
                     # Ensure we end with the current user message
                     if not conversation or conversation[-1]['role'] != 'user' or conversation[-1]['content'] != message_content:
@@ -584,18 +865,41 @@ RESPONSE STYLE:
                 reply = "I'm having a moment of difficulty, but I'm still here listening. What else would you like to talk about?"
             
             # Add bot response to session
-            session['messages'].append({
-                'bot': reply,
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            })
+            bot_turn = nyxsessions.MessageRecord.bot(reply)
+            session['messages'].append(bot_turn)
+            await self.journal_comfort_message(user_id, bot_turn.to_dict())
             
             # Send reply using ENHANCED safe method
-            await self.bot.safe_send(channel, reply)
+            await self.bot.safe_send(channel, reply, priority=Priority.INTERACTIVE)
                 
         except Exception as e:
             self.logger.error(f"Error processing comfort support message from {user_id}: {e}")
             # Try to send error message to user using safe method
-            await self.bot.safe_send(channel, "I'm having trouble processing that message right now, but I'm still here! Try saying something else.")
+            await self.bot.safe_send(channel, "I'm having trouble processing that message right now, but I'm still here! Try saying something else.", priority=Priority.INTERACTIVE)
+
+    async def commit_comfort_session(self, user_id: int, session: Dict, reason: str):
+        """Record a finished session. Its turns are already journaled, so only metadata is written."""
+        messages = session.get('messages', [])
+        try:
+            session_duration = datetime.now(timezone.utc) - session['started_at']
+            commit = {
+                "key": str(user_id),
+                "journal": session.get('journal'),
+                "mode": session.get('comfort_mode', 'unknown'),
+                "ended_at": datetime.now(timezone.utc).isoformat(),
+                "duration": str(session_duration).split('.')[0],
+                "end_reason": reason
+            }
+            if not session.get('journal'):
+                commit["messages"] = [msg.to_dict() for msg in messages]
+            async with self._history_write_lock:
+                await asyncio.to_thread(nyxsessions.append_jsonl, self.comfort_commit_log, commit)
+            self.logger.debug(f"Committed comfort session for {user_id}: {len(messages)} messages")
+            
+            # This session is now the "previous session" for the next one
+            self._remember_prior_context(user_id, messages)
+        except Exception as e:
+            self.logger.error(f"Error saving comfort history for {user_id}: {e}")
 
     async def end_comfort_dm_session(self, user, dm_channel, reason="unknown"):
         """End comfort session and save history."""
@@ -607,24 +911,7 @@ RESPONSE STYLE:
                 
             session = self.active_sessions[user_id]
             messages = session.get('messages', [])
-            comfort_mode = session.get('comfort_mode', 'unknown')
-            session_duration = datetime.now(timezone.utc) - session['started_at']
-            
-            # Save session history
-            try:
-                history = await self.load_comfort_history()
-                history.setdefault(str(user_id), []).append({
-                    "mode": comfort_mode,
-                    "messages": messages,
-                    "ended_at": datetime.now(timezone.utc).isoformat(),
-                    "duration": str(session_duration).split('.')[0],
-                    "end_reason": reason,
-                    "message_count": len([msg for msg in messages if 'user' in msg])
-                })
-                await self.save_comfort_history(history)
-                self.logger.debug(f"Saved comfort history for {user_id}: {len(messages)} messages")
-            except Exception as e:
-                self.logger.error(f"Error saving comfort history for {user_id}: {e}")
+            await self.commit_comfort_session(user_id, session, reason)
 
             # Send farewell message if channel is available and reason isn't dm_blocked
             if dm_channel and reason != "dm_blocked":
@@ -633,12 +920,13 @@ RESPONSE STYLE:
                     f"Session ended. Remember, you're not alone, {user.display_name}.",
                     f"Goodbye for now, {user.display_name}. Reach out anytime."
                 ])
-                await self.bot.safe_send(dm_channel, farewell)
+                await self.bot.safe_send(dm_channel, farewell, priority=Priority.INTERACTIVE)
             
             # Clean up session
             del self.active_sessions[user_id]
+            self.bot.router.remove_dm(user_id, "comfort")
             
-            message_count = len([msg for msg in messages if 'user' in msg])
+            message_count = len([msg for msg in messages if msg.role is nyxsessions.Role.USER])
             self.logger.debug(f"Comfort session ended for {user.display_name} ({message_count} user messages, reason: {reason})")
             
         except Exception as e:
@@ -648,6 +936,7 @@ RESPONSE STYLE:
                 if (user.id in self.active_sessions and 
                     self.active_sessions[user.id].get('type') == 'comfort'):
                     del self.active_sessions[user.id]
+                self.bot.router.remove_dm(user.id, "comfort")
             except:
                 pass
 
@@ -234,7 +234,7 @@ class Memory(commands.Cog):
             
             # Use safe send method with rate limiting
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 await self.bot.safe_send(ctx.channel, f"{member.display_name}: {points:,} 🪙")
         except Exception as e:
             self.logger.error(f"Error in show_nyx_notes: {e}")
@@ -258,7 +258,7 @@ class Memory(commands.Cog):
                     color=self.nyx_color
                 )
                 result = await self.bot.safe_send(ctx.channel, embed=embed)
-                if not result:
+                if result.should_fallback:
                     await self.bot.safe_send(ctx.channel, "No users found with Nyx Notes yet!")
                 return
             
@@ -307,7 +307,7 @@ class Memory(commands.Cog):
             
             # Use safe send method with fallback
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 text_leaderboard = "🏆 Nyx Notes Leaderboard\n" + "\n".join(description_lines)
                 await self.bot.safe_send(ctx.channel, text_leaderboard)
                 
@@ -330,7 +330,7 @@ class Memory(commands.Cog):
             
             # Use safe send method with fallback
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 await self.bot.safe_send(ctx.channel, f"Gave {amount:,} 🪙 to {member.display_name}. New total: {new_total:,} 🪙")
         except Exception as e:
             self.logger.error(f"Error in give_points: {e}")
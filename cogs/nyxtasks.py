@@ -10,6 +10,8 @@ from typing import Dict, Optional, List
 import random
 from datetime import datetime, timedelta
 
+from nyxoutbound import Priority
+
 # Define color and environment key (keep consistent with nyxcore.py)
 NYX_COLOR = 0x76b887
 STORAGE_PATH = os.getenv("STORAGE_PATH", "./nyxnotes")
@@ -284,15 +286,11 @@ class NyxTasks(commands.Cog):
             )
             
             # Send message with rate limiting
-            message = await self.bot.safe_send(channel, embed=embed)
-            if message:
-                # Add reactions for mood tracking
+            result = await self.bot.safe_send(channel, embed=embed, priority=Priority.BULK)
+            if result:
+                # Add reactions for mood tracking (queued in order, paced by the reaction bucket)
                 for emoji in self.mood_options.keys():
-                    try:
-                        await message.add_reaction(emoji)
-                        await asyncio.sleep(0.5)  # Rate limit protection
-                    except Exception as e:
-                        self.logger.error(f"Error adding reaction {emoji}: {e}")
+                    self.bot.reactions.schedule(result.message, emoji)
                 
                 # Update last nudge time
                 self.nudge_data['last_nudge_time'] = datetime.utcnow().isoformat()
@@ -375,7 +373,7 @@ class NyxTasks(commands.Cog):
                 
                 # Send reward message
                 result = await self.bot.safe_send(reaction.message.channel, embed=embed)
-                if not result:
+                if result.should_fallback:
                     # Fallback text message
                     await self.bot.safe_send(
                         reaction.message.channel,
@@ -435,7 +433,7 @@ class NyxTasks(commands.Cog):
             embed.set_thumbnail(url=member.display_avatar.url)
             
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 await self.bot.safe_send(
                     ctx.channel,
                     f"{member.display_name}: {total_submissions} mood check-ins, "
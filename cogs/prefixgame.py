@@ -8,6 +8,8 @@ import re
 import logging
 from typing import Dict, Set, Optional
 
+from nyxoutbound import Priority
+
 # ★ Consistent color (matches nyxcore.py and memory.py)
 NYX_COLOR = 0x76b887
 STORAGE_PATH = os.getenv("STORAGE_PATH", "./nyxnotes")
@@ -277,7 +279,7 @@ class PrefixGame(commands.Cog):
             )
             game_embed.set_footer(text="You have 20 seconds to submit as many words as possible!")
             result = await self.bot.safe_send(ctx.channel, embed=game_embed)
-            if not result:
+            if result.should_fallback:
                 await self.bot.safe_send(ctx.channel, f"🎮 Prefix Word Game started! Submit words starting with: {prefix.upper()}\nYou have 20 seconds!")
 
             # ★ Collect responses - FIXED SCORING SYSTEM
@@ -286,18 +288,13 @@ class PrefixGame(commands.Cog):
             longest_word = ""
             longest_user_id = None
             
-            def check(msg):
-                # Only messages in same channel, from real users, not bots
-                if (msg.channel != ctx.channel or 
-                    msg.author.bot):
-                    return False
-                
-                word = msg.content.strip().lower()
-                return self.is_valid_word(word, prefix)
+            # ★ This channel's messages (from real users) are routed here by the bot's message router.
+            # Keyed by the invoking message, so two games in one channel each get every message.
+            game_key = f"prefixgame:{ctx.message.id}"
+            inbox = self.bot.router.open_inbox(ctx.channel.id, game_key)
 
             # ★ Game loop - collect words for exactly 20 seconds
             timeout_duration = 20  # 20 seconds to submit words
-            reaction_cooldown = {}  # Track reaction cooldowns per user
             
             try:
                 # Wait for the full 20 seconds, collecting all valid submissions
@@ -309,9 +306,11 @@ class PrefixGame(commands.Cog):
                         break
                         
                     try:
-                        # Wait for next valid word (but only for remaining time)
-                        msg = await self.bot.wait_for('message', timeout=remaining_time, check=check)
+                        # Wait for next word (but only for remaining time)
+                        msg = await asyncio.wait_for(inbox.get(), timeout=remaining_time)
                         word = msg.content.strip().lower()
+                        if not self.is_valid_word(word, prefix):
+                            continue
                         user_id = msg.author.id
                         
                         # Initialize user's word set if not exists
@@ -329,16 +328,8 @@ class PrefixGame(commands.Cog):
                             longest_word = word
                             longest_user_id = user_id
                         
-                        # CHECKMARK ALL VALID WORDS with cooldown per user
-                        try:
-                            current_time = asyncio.get_event_loop().time()
-                            if (user_id not in reaction_cooldown or 
-                                current_time - reaction_cooldown[user_id] > 1.0):  # 1 second cooldown per user
-                                await msg.add_reaction("✅")
-                                reaction_cooldown[user_id] = current_time
-                        except discord.HTTPException:
-                            # Skip reactions if rate limited
-                            pass
+                        # CHECKMARK ALL VALID WORDS - queued, so collection never waits on the API
+                        self.bot.reactions.schedule(msg, "✅", Priority.BULK, group=game_key)
                                 
                     except asyncio.TimeoutError:
                         # Time ran out, exit the loop
@@ -347,7 +338,12 @@ class PrefixGame(commands.Cog):
             except Exception as e:
                 # Handle any errors during word collection
                 self.logger.error(f"Error during word collection: {e}")
+            finally:
+                self.bot.router.close_inbox(ctx.channel.id, game_key, inbox)
                     
+            # ★ Game ended - checkmarks still queued are stale now
+            self.bot.reactions.cancel_group(game_key)
+            
             # ★ Game ended - process results
             if not user_words or not longest_word:
                 embed = discord.Embed(
@@ -453,7 +449,7 @@ class PrefixGame(commands.Cog):
             
             # ★ Use safe send with fallback
             result = await self.bot.safe_send(ctx.channel, embed=results_embed)
-            if not result:
+            if result.should_fallback:
                 fallback_text = (
                     f"🏆 Game Complete!\n"
                     f"Longest Word: {winner_name} - {longest_word.upper()} ({len(longest_word)} letters)\n"
@@ -470,7 +466,7 @@ class PrefixGame(commands.Cog):
                 color=discord.Color.red()
             )
             result = await self.bot.safe_send(ctx.channel, embed=error_embed)
-            if not result:
+            if result.should_fallback:
                 await self.bot.safe_send(ctx.channel, f"❌ Game error: {str(e)}")
 
     # ★ Command to start the game
@@ -531,7 +527,7 @@ class PrefixGame(commands.Cog):
             
             # ★ Use safe send with fallback
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 fallback_text = f"Word: {word} | Valid: {'Yes' if is_valid else 'No'} | Points: {base_points if is_valid else 0} 🪙"
                 await self.bot.safe_send(ctx.channel, fallback_text)
         except Exception as e:
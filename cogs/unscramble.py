@@ -8,6 +8,9 @@ import asyncio
 import logging
 from datetime import datetime, timezone
 
+import nyxsessions
+from nyxoutbound import Priority
+
 NYX_COLOR = 0x76b887
 FONT = "monospace"
 COMMON_WORDS_FILE = "./common_words.txt"  # Ensure path is correct for your project
@@ -23,6 +26,7 @@ class Unscramble(commands.Cog):
         self.word_list = []
         self.memory = None  # Will be set in cog_load
         self.logger = logging.getLogger("Unscramble")
+        self.snapshot_file = os.path.join(STORAGE_PATH, 'snapshots', 'unscramble_games.json')
 
     async def cog_load(self):
         # Load words from common_words.txt on cog load
@@ -33,32 +37,50 @@ class Unscramble(commands.Cog):
             self.memory = self.bot.get_cog("Memory")
             if not self.memory:
                 raise RuntimeError("Memory cog not loaded - Unscramble requires persistent storage.")
+            # Pick up games snapshotted by the previous shutdown or reload
+            await self.restore_games()
             self.logger.info("Unscramble cog loaded successfully")
         except Exception as e:
             self.logger.error(f"Error in Unscramble cog_load: {e}")
             raise
 
     async def cog_unload(self):
-        """Called when cog is unloaded - cleanup active games sequentially."""
+        """Called when cog is unloaded - snapshot active games so cog_load can resume them."""
         try:
             self.logger.info("Unscramble cog unloading...")
             
-            # End all active games gracefully with delays
-            active_channels = list(self.active_games.keys())
-            for channel_id in active_channels:
-                try:
-                    await asyncio.sleep(0.5)  # Delay between cleanups
-                    channel = self.bot.get_channel(channel_id)
-                    if channel:
-                        await self.bot.safe_send(channel, "🔤 Unscramble game ended due to bot restart.")
-                    del self.active_games[channel_id]
-                except Exception as e:
-                    self.logger.error(f"Error ending unscramble game in channel {channel_id}: {e}")
+            try:
+                await asyncio.to_thread(nyxsessions.save_snapshot, self.snapshot_file, self.active_games)
+                self.logger.info(f"Snapshotted {len(self.active_games)} unscramble games")
+            except Exception as e:
+                self.logger.error(f"Error snapshotting unscramble games: {e}")
+            # Stop this instance's in-flight rounds; the reloaded cog owns the games now
+            self.active_games.clear()
+            self.bot.router.remove_owner("unscramble")
             
             self.logger.info("Unscramble cog unloaded successfully")
         except Exception as e:
             self.logger.error(f"Error during Unscramble cog unload: {e}")
 
+    async def restore_games(self):
+        """Restore games from the warm-restart snapshot, resuming any round that was about to start."""
+        try:
+            snapshot = await asyncio.to_thread(nyxsessions.load_snapshot, self.snapshot_file)
+        except Exception as e:
+            self.logger.error(f"Error loading unscramble snapshot: {e}")
+            return
+        
+        for channel_id, game in (snapshot or {}).items():
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                continue
+            self.active_games[channel_id] = game
+            self.bot.router.add_channel(channel_id, "unscramble", self.handle_guess)
+            if game.get("round_pending"):
+                asyncio.create_task(self.next_round(channel))
+        if self.active_games:
+            self.logger.info(f"Restored {len(self.active_games)} unscramble games from snapshot")
+
     async def load_words(self):
         words = []
         if not os.path.exists(COMMON_WORDS_FILE):
@@ -184,6 +206,7 @@ class Unscramble(commands.Cog):
             "found_by": {},      # NEW: Track who found each word {word: user_id}
             "user_display_names": {}  # Store display names during game
         }
+        self.bot.router.add_channel(channel_id, "unscramble", self.handle_guess)
         
         # Send game announcement
         embed = discord.Embed(
@@ -202,28 +225,35 @@ class Unscramble(commands.Cog):
         embed.set_footer(text="Starting first round...")
         
         result = await self.bot.safe_send(ctx.channel, embed=embed)
-        if not result:
+        if result.should_fallback:
             await self.bot.safe_send(ctx.channel, f"🔤 Unscramble Game Started! {ROUNDS_PER_GAME} rounds, {NYX_NOTES_PER_CORRECT} points each!")
         
-        # Start first round with delay
+        # Start first round with delay - unless the game was ended (or handed off) during the sends
+        game = self.active_games.get(channel_id)
+        if game is None:
+            return
+        game["round_pending"] = True
         await asyncio.sleep(2)
-        await self.next_round(ctx)
+        await self.next_round(ctx.channel)
 
-    async def next_round(self, ctx):
+    async def next_round(self, channel):
         """Start the next round of the unscramble game"""
-        channel_id = ctx.channel.id
-        game = self.active_games[channel_id]
+        channel_id = channel.id
+        game = self.active_games.get(channel_id)
+        if not game:
+            return  # Game ended (or was handed to a reloaded cog) during the pause
+        game["round_pending"] = False
         
         # Check if game is complete
         if game["current_round"] >= game["total_rounds"]:
-            await self.end_game(ctx)
+            await self.end_game(channel)
             return
 
         # Pick new word
         word = self.pick_unused_word(game["used_words"])
         if not word:
-            await self.bot.safe_send(ctx.channel, "No more eligible words to use. Ending game.")
-            await self.end_game(ctx)
+            await self.bot.safe_send(channel, "No more eligible words to use. Ending game.")
+            await self.end_game(channel)
             return
             
         # Update game state
@@ -245,9 +275,9 @@ class Unscramble(commands.Cog):
             inline=True
         )
         
-        result = await self.bot.safe_send(ctx.channel, embed=embed)
-        if not result:
-            await self.bot.safe_send(ctx.channel, f"Round {game['current_round']}/{game['total_rounds']}: {game['current_scrambled']} (Type your guess!)")
+        result = await self.bot.safe_send(channel, embed=embed, priority=Priority.INTERACTIVE)
+        if result.should_fallback:
+            await self.bot.safe_send(channel, f"Round {game['current_round']}/{game['total_rounds']}: {game['current_scrambled']} (Type your guess!)", priority=Priority.INTERACTIVE)
 
     @commands.command(name="endunscramble")
     async def end_unscramble(self, ctx):
@@ -255,11 +285,11 @@ class Unscramble(commands.Cog):
         if channel_id not in self.active_games:
             await self.bot.safe_send(ctx.channel, "No active unscramble game to end in this channel.")
             return
-        await self.end_game(ctx, aborted=True)
+        await self.end_game(ctx.channel, aborted=True)
 
-    async def end_game(self, ctx, aborted=False):
+    async def end_game(self, channel, aborted=False):
         """End the current unscramble game"""
-        channel_id = ctx.channel.id
+        channel_id = channel.id
         game = self.active_games[channel_id]
         game["active"] = False
         
@@ -312,11 +342,12 @@ class Unscramble(commands.Cog):
         
         embed.set_footer(text="Thanks for playing!")
         
-        result = await self.bot.safe_send(ctx.channel, embed=embed)
-        if not result:
-            await self.bot.safe_send(ctx.channel, f"Game Over! Earned {total_points_earned} 🪙 total.")
+        result = await self.bot.safe_send(channel, embed=embed)
+        if result.should_fallback:
+            await self.bot.safe_send(channel, f"Game Over! Earned {total_points_earned} 🪙 total.")
         
-        del self.active_games[channel_id]
+        self.active_games.pop(channel_id, None)
+        self.bot.router.remove_channel(channel_id, "unscramble")
 
     @commands.command(name="hint")
     async def hint(self, ctx):
@@ -350,7 +381,7 @@ class Unscramble(commands.Cog):
         embed.set_footer(text="You still get full points even after using hints!")
         
         result = await self.bot.safe_send(ctx.channel, embed=embed)
-        if not result:
+        if result.should_fallback:
             await self.bot.safe_send(ctx.channel, f"💡 Hint: {hint_display} ({len(word)} letters)")
 
     @commands.command(name="reveal")
@@ -361,9 +392,10 @@ class Unscramble(commands.Cog):
             return
 
         game = self.active_games[ctx.channel.id]
-        if not game["active"] or not game["current_word"]:
+        if not game["active"] or not game["current_word"] or game.get("round_pending"):
             await self.bot.safe_send(ctx.channel, "No current word to reveal.")
             return
+        game["round_pending"] = True  # Claimed now, so a correct guess racing the reveal doesn't advance twice
 
         embed = discord.Embed(
             title="🔤 Word Revealed",
@@ -378,32 +410,28 @@ class Unscramble(commands.Cog):
         embed.set_footer(text="Moving to next round...")
         
         result = await self.bot.safe_send(ctx.channel, embed=embed)
-        if not result:
+        if result.should_fallback:
             await self.bot.safe_send(ctx.channel, f"🔤 Word revealed: {game['current_word']}")
         
         # Move to next round after short delay
         await asyncio.sleep(2)
-        await self.next_round(ctx)
-
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        # Only process guesses if a game is active in the channel
-        if message.author.bot or not message.guild:
-            return
+        await self.next_round(ctx.channel)
 
+    async def handle_guess(self, message):
+        """Check a guess - the bot's message router only calls this for channels with a game."""
         channel_id = message.channel.id
         if channel_id not in self.active_games:
+            self.bot.router.remove_channel(channel_id, "unscramble")
             return
         
         game = self.active_games[channel_id]
-        if not game["active"] or not game["current_word"]:
-            return
-
-        # Add enhanced rate limiting delay
-        await asyncio.sleep(0.1)
+        if not game["active"] or not game["current_word"] or game.get("round_pending"):
+            return  # No word up, or this round was already won
 
         guess = message.content.strip().lower()
         if guess == game["current_word"]:
+            # Claim the round before any await - only the first correct guess scores and advances it
+            game["round_pending"] = True
             game["correct_count"] += 1
             user_id = message.author.id
             
@@ -430,15 +458,13 @@ class Unscramble(commands.Cog):
                 inline=True
             )
             
-            result = await self.bot.safe_send(message.channel, embed=embed)
-            if not result:
-                fallback_text = f"Correct! {display_name} unscrambled: {game['current_word']} (+{NYX_NOTES_PER_CORRECT} 🪙 pending)"
-                await self.bot.safe_send(message.channel, fallback_text)
+            # Goes through the coalescer like the rest of the game feedback
+            line = f"Correct! {display_name} unscrambled: {game['current_word']} (+{NYX_NOTES_PER_CORRECT} 🪙 pending)"
+            await self.bot.coalescer.send(message.channel, "unscramble_correct", line, embed=embed)
             
             # Proceed to next round after a brief pause
             await asyncio.sleep(3)
-            ctx = await self.bot.get_context(message)
-            await self.next_round(ctx)
+            await self.next_round(message.channel)
 
     # Ensure Memory cog is referenced on reload
     async def cog_reload(self):
@@ -8,6 +8,8 @@ import asyncio
 from datetime import datetime, timezone
 import logging
 
+import nyxsessions
+
 # ★ Constants – align with Nyx bot style
 NYX_COLOR = 0x76b887
 FONT = "monospace"
@@ -21,6 +23,7 @@ class WordHunt(commands.Cog):
         self.active_games = {}  # {guild_id: {channel_id: game_data}}
         self.memory = None
         self.logger = logging.getLogger("WordHunt")
+        self.snapshot_file = os.path.join(STORAGE_PATH, 'snapshots', 'wordhunt_games.json')
 
     async def cog_load(self):
         try:
@@ -28,32 +31,49 @@ class WordHunt(commands.Cog):
             self.memory = self.bot.get_cog("Memory")
             if not self.memory:
                 raise RuntimeError("Memory cog not loaded for WordHunt.")
+            # Pick up games snapshotted by the previous shutdown or reload
+            await self.restore_games()
             self.logger.info("WordHunt cog loaded successfully")
         except Exception as e:
             self.logger.error(f"Error in WordHunt cog_load: {e}")
             raise
 
     async def cog_unload(self):
-        """Called when cog is unloaded - cleanup active games sequentially."""
+        """Called when cog is unloaded - snapshot active games so cog_load can resume them."""
         try:
             self.logger.info("WordHunt cog unloading...")
             
-            # End all active games gracefully with delays
-            for guild_id in list(self.active_games.keys()):
-                for channel_id in list(self.active_games[guild_id].keys()):
-                    try:
-                        await asyncio.sleep(0.5)  # Delay between cleanups
-                        channel = self.bot.get_channel(channel_id)
-                        if channel:
-                            await self.bot.safe_send(channel, "🔍 Word Hunt game ended due to bot restart.")
-                        del self.active_games[guild_id][channel_id]
-                    except Exception as e:
-                        self.logger.error(f"Error ending word hunt game in channel {channel_id}: {e}")
+            game_count = sum(len(games) for games in self.active_games.values())
+            try:
+                await asyncio.to_thread(nyxsessions.save_snapshot, self.snapshot_file, self.active_games)
+                self.logger.info(f"Snapshotted {game_count} word hunt games")
+            except Exception as e:
+                self.logger.error(f"Error snapshotting word hunt games: {e}")
+            self.active_games.clear()
+            self.bot.router.remove_owner("wordhunt")
                         
             self.logger.info("WordHunt cog unloaded successfully")
         except Exception as e:
             self.logger.error(f"Error during WordHunt cog unload: {e}")
 
+    async def restore_games(self):
+        """Restore games from the warm-restart snapshot."""
+        try:
+            snapshot = await asyncio.to_thread(nyxsessions.load_snapshot, self.snapshot_file)
+        except Exception as e:
+            self.logger.error(f"Error loading word hunt snapshot: {e}")
+            return
+        
+        restored = 0
+        for guild_id, games in (snapshot or {}).items():
+            for channel_id, game in games.items():
+                if self.bot.get_channel(channel_id):
+                    self.active_games.setdefault(guild_id, {})[channel_id] = game
+                    self.bot.router.add_channel(channel_id, "wordhunt", self.handle_guess)
+                    restored += 1
+        if restored:
+            self.logger.info(f"Restored {restored} word hunt games from snapshot")
+
     # ★ Utility: Load word list (min_len/max_len inclusive)
     async def load_words(self, min_len: int, max_len: int) -> List[str]:
         try:
@@ -225,6 +245,7 @@ class WordHunt(commands.Cog):
                 "found_by": {},     # NEW: Track who found each word {word: user_id}
                 "user_display_names": {}  # Store display names during game
             }
+            self.bot.router.add_channel(ctx.channel.id, "wordhunt", self.handle_guess)
 
             # Create embed - DON'T SHOW THE WORDS!
             embed = discord.Embed(
@@ -241,7 +262,7 @@ class WordHunt(commands.Cog):
             
             # ★ Use safe send with fallback
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 fallback_text = (
                     f"🟩 Easy Word Hunt\n"
                     f"Find 3 hidden 4-letter words in the grid!\n"
@@ -281,7 +302,7 @@ class WordHunt(commands.Cog):
         
         # ★ Use safe send with fallback
         result = await self.bot.safe_send(ctx.channel, embed=embed)
-        if not result:
+        if result.should_fallback:
             await self.bot.safe_send(ctx.channel, f"💡 Hints: {', '.join(hints)} (Found: {len(game['found'])}/3)")
 
     @commands.command(name="easyreveal")
@@ -316,7 +337,7 @@ class WordHunt(commands.Cog):
         
         # ★ Use safe send with fallback
         result = await self.bot.safe_send(ctx.channel, embed=embed)
-        if not result:
+        if result.should_fallback:
             fallback_text = (
                 f"🟩 Easy Word Hunt Complete!\n"
                 f"All words: {', '.join(game['words'])}\n"
@@ -330,6 +351,7 @@ class WordHunt(commands.Cog):
         # Clean up game
         if ctx.guild.id in self.active_games and ctx.channel.id in self.active_games[ctx.guild.id]:
             del self.active_games[ctx.guild.id][ctx.channel.id]
+        self.bot.router.remove_channel(ctx.channel.id, "wordhunt")
 
     @commands.command(name="hardwordhunt")
     async def hard_word_hunt(self, ctx):
@@ -380,6 +402,7 @@ class WordHunt(commands.Cog):
                 "found_by": {},     # NEW: Track who found each word {word: user_id}
                 "user_display_names": {}  # Store display names during game
             }
+            self.bot.router.add_channel(ctx.channel.id, "wordhunt", self.handle_guess)
 
             # Create embed - DON'T SHOW THE WORDS!
             embed = discord.Embed(
@@ -396,7 +419,7 @@ class WordHunt(commands.Cog):
             
             # ★ Use safe send with fallback
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 fallback_text = (
                     f"🟥 Hard Word Hunt\n"
                     f"Find 4 hidden words (4-7 letters) in the grid!\n"
@@ -436,7 +459,7 @@ class WordHunt(commands.Cog):
         
         # ★ Use safe send with fallback
         result = await self.bot.safe_send(ctx.channel, embed=embed)
-        if not result:
+        if result.should_fallback:
             await self.bot.safe_send(ctx.channel, f"💡 Hints: {', '.join(hints)} (Found: {len(game['found'])}/4)")
 
     @commands.command(name="hardreveal")
@@ -471,7 +494,7 @@ class WordHunt(commands.Cog):
         
         # ★ Use safe send with fallback
         result = await self.bot.safe_send(ctx.channel, embed=embed)
-        if not result:
+        if result.should_fallback:
             fallback_text = (
                 f"🟥 Hard Word Hunt Complete!\n"
                 f"All words: {', '.join(game['words'])}\n"
@@ -485,31 +508,25 @@ class WordHunt(commands.Cog):
         # Clean up game
         if ctx.guild.id in self.active_games and ctx.channel.id in self.active_games[ctx.guild.id]:
             del self.active_games[ctx.guild.id][ctx.channel.id]
+        self.bot.router.remove_channel(ctx.channel.id, "wordhunt")
 
-    # ★ Event: Message listener for guesses - COMPLETELY REWRITTEN for batched scoring
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        # Ignore bot/self
-        if message.author.bot or not message.guild:
-            return
-        
+    # ★ Guess handler - the bot's message router only calls this for channels with a game
+    async def handle_guess(self, message):
         channel = message.channel
         game = self.active_games.get(message.guild.id, {}).get(channel.id)
         if not game:
+            self.bot.router.remove_channel(channel.id, "wordhunt")
             return
         
         # Skip commands
         if message.content.startswith("!"):
             return
         
-        # Add enhanced rate limiting delay
-        await asyncio.sleep(0.1)  # Increased delay
-        
         guess = message.content.strip().lower()
         
         # Check if word is already found
         if guess in game["found"]:
-            await self.bot.safe_send(channel, f"Already found **{guess}**.")
+            await self.bot.coalescer.send(channel, "wordhunt_already_found", f"Already found **{guess}**.")
             return
 
         # Check if word is correct
@@ -542,9 +559,14 @@ class WordHunt(commands.Cog):
                 inline=True
             )
             
-            result = await self.bot.safe_send(channel, embed=embed)
-            if not result:
-                await self.bot.safe_send(channel, f"✅ Correct! **{guess.upper()}** found by {message.author.display_name}! (+{points} Nyx Notes pending)")
+            # Finds within the same moment are merged into one embed (the coalescer falls back to text)
+            await self.bot.coalescer.send(
+                channel,
+                "wordhunt_found",
+                f"✅ **{guess.upper()}** found by {message.author.display_name}! (+{points} Nyx Notes pending)",
+                embed=embed,
+                title="✅ Correct Words Found!"
+            )
 
             # Check if all words found - AWARD ALL POINTS AT ONCE
             if len(game["found"]) == len(game["words"]):
@@ -575,12 +597,13 @@ class WordHunt(commands.Cog):
                 
                 # ★ Use safe send with fallback
                 result = await self.bot.safe_send(channel, embed=embed)
-                if not result:
+                if result.should_fallback:
                     await self.bot.safe_send(channel, f"🎉 {'Easy' if game['mode'] == 'easy' else 'Hard'} Word Hunt Complete! All words found!")
                 
                 # Clean up game
                 if message.guild.id in self.active_games and channel.id in self.active_games[message.guild.id]:
                     del self.active_games[message.guild.id][channel.id]
+                self.bot.router.remove_channel(channel.id, "wordhunt")
 
 # ★ Cog setup (async for compatibility with your main file)
 async def setup(bot):
@@ -311,7 +311,7 @@ class Workshop(commands.Cog):
 
             # ★ Use safe send with fallback
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 fallback_text = (
                     f"✅ Workshop Submission Received: {day}\n"
                     f"Submitted by: {ctx.author.display_name}\n"
@@ -329,7 +329,7 @@ class Workshop(commands.Cog):
                 color=discord.Color.red()
             )
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 await self.bot.safe_send(ctx.channel, f"❌ Submission Error: {str(e)}")
 
     @commands.command(name="monday")
@@ -399,7 +399,7 @@ class Workshop(commands.Cog):
             
             # ★ Use safe send with fallback
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 fallback_text = (
                     f"📝 Weekend Writing Prompt\n"
                     f"{selected_prompt}\n\n"
@@ -415,7 +415,7 @@ class Workshop(commands.Cog):
                 color=discord.Color.red()
             )
             result = await self.bot.safe_send(ctx.channel, embed=embed)
-            if not result:
+            if result.should_fallback:
                 await self.bot.safe_send(ctx.channel, "❌ Failed to generate weekend prompt. Please try again.")
 
     @commands.command(name="weekendsubmit")
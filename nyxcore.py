@@ -4,13 +4,21 @@ import os
 import sys
 import logging
 import asyncio
+import re
+from collections import OrderedDict, deque
 from datetime import datetime
+import aiohttp
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
-from typing import Optional
+import time
+import random
+from typing import Callable, Dict, List, Optional, Tuple
 import traceback
 
+import nyxoutbound
+from nyxoutbound import Priority, SendResult, SendStatus
+
 # Add at the top of nyxcore.py after imports:
 current_dir = os.path.dirname(os.path.abspath(__file__)) or '.'
 sys.path.insert(0, current_dir)
@@ -25,6 +33,8 @@ COG_DIRECTORY = "."
 STORAGE_PATH = os.getenv("STORAGE_PATH", "./nyxnotes")
 TOKEN = os.getenv("DISCORD_TOKEN")
 LOG_CHANNEL_ID = 1388809359206780998
+SEND_RETRY_DEADLINE = 15.0  # Seconds a rate-limited send keeps retrying before giving up
+SEND_RETRY_JITTER = 0.5     # Max random delay added to each 429 retry
 
 # ★ Ensure storage directory exists
 os.makedirs(STORAGE_PATH, exist_ok=True)
@@ -70,26 +80,414 @@ def setup_logging() -> logging.Logger:
 # ★ Initialize logging system IMMEDIATELY
 logger = setup_logging()
 
-# ★ MINIMAL Rate Limiter - MUCH simpler
-class GlobalRateLimiter:
-    """Minimal global rate limiter for Discord API calls."""
+# ★ Per-route rate limiter - token buckets per channel, global throttle only near the limit
+class TokenBucket:
+    """Token bucket that hands out reservations: callers sleep for the returned wait."""
+    
+    def __init__(self, capacity: int, per: float):
+        self.capacity = capacity
+        self.per = per
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+    
+    def _refill(self, now: float):
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.capacity / self.per)
+            self.updated_at = now
+    
+    def reserve(self, now: float) -> float:
+        """Take a token (possibly going into debt) and return how long to wait before using it."""
+        start = max(now, self.blocked_until)
+        self._refill(start)
+        self.tokens -= 1
+        wait = -self.tokens * self.per / self.capacity if self.tokens < 0 else 0.0
+        return (start - now) + wait
+    
+    def sync(self, limit: int, remaining: int, reset_after: float, now: float):
+        """
+        Adopt Discord's view of this bucket from X-RateLimit-* headers. Only ever lowers the
+        local count - reservations already handed out aren't in Discord's count yet.
+        """
+        self.capacity = max(1, limit)
+        self._refill(now)
+        if remaining > 0:
+            self.tokens = min(self.tokens, float(min(remaining, self.capacity)))
+        else:
+            # Exhausted: nothing until the window resets, then (at most) a full bucket
+            self.blocked_until = max(self.blocked_until, now + reset_after)
+            self.tokens = min(self.tokens, float(self.capacity))
+            self.updated_at = self.blocked_until
+    
+    def block(self, seconds: float, now: float):
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+class RouteRateLimiter:
+    """
+    Rate limiter for Discord API calls, keyed by route (e.g. "channel:<id>").
+    
+    Each route gets its own bucket, so different channels send in parallel. Buckets
+    start at Discord's documented per-channel send limit and are corrected from the
+    X-RateLimit-* headers (and bucket IDs) on responses we get to see. A bot-wide
+    bucket sized just under the global limit only delays sends when it runs dry.
+    """
+    
+    DEFAULT_ROUTE_LIMIT = (5, 5.0)  # Messages per seconds per channel
+    ROUTE_LIMITS = {"reaction": (1, 0.25)}  # Overrides by route prefix (reactions: 1 per 250ms per channel)
+    GLOBAL_LIMIT = (45, 1.0)        # Documented global limit is 50/s; keep a little headroom
+    MAX_ROUTES = 1024               # Least recently used route buckets are dropped past this
     
     def __init__(self):
-        self.last_api_call = 0
-        self.min_interval = 3.0  # 3 seconds minimum between API calls (INCREASED)
-        self._lock = asyncio.Lock()
-    
-    async def wait_if_needed(self):
-        """Wait if we're making API calls too quickly."""
-        async with self._lock:
-            current_time = asyncio.get_event_loop().time()
-            time_since_last = current_time - self.last_api_call
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._route_buckets: "OrderedDict[str, str]" = OrderedDict()  # route -> Discord bucket ID
+        self._global = TokenBucket(*self.GLOBAL_LIMIT)
+        self.stats = {"waits": 0, "wait_seconds": 0.0, "rate_limited": 0}
+    
+    def _bucket(self, route: str) -> TokenBucket:
+        # Routes sharing a Discord bucket ID in the same channel share one limiter,
+        # keyed "<bucket id>:<channel id>" (routes look like "<kind>:<channel id>")
+        bucket_id = self._route_buckets.get(route)
+        key = f"{bucket_id}:{route.split(':', 1)[-1]}" if bucket_id else route
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limit = self.ROUTE_LIMITS.get(route.split(":", 1)[0], self.DEFAULT_ROUTE_LIMIT)
+            bucket = self._buckets[key] = TokenBucket(*limit)
+            while len(self._buckets) > self.MAX_ROUTES:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+    
+    async def acquire(self, route: str):
+        """Wait until a request on this route fits both its bucket and the global bucket."""
+        now = time.monotonic()
+        wait = max(self._bucket(route).reserve(now), self._global.reserve(now))
+        if wait > 0:
+            self.stats["waits"] += 1
+            self.stats["wait_seconds"] += wait
+            await asyncio.sleep(wait)
+    
+    @staticmethod
+    def route_for(method: str, path: str) -> Optional[str]:
+        """Our route name for a Discord API request path, or None if we don't limit it."""
+        match = re.search(r"/channels/(\d+)/messages(?:/\d+/reactions/[^/]+/@me)?$", path)
+        if match is None:
+            return None
+        if "/reactions/" in path:
+            return f"reaction:{match.group(1)}" if method == "PUT" else None
+        return f"channel:{match.group(1)}" if method == "POST" else None
+    
+    def update_from_headers(self, route: str, headers, status: Optional[int] = None):
+        """Learn bucket limits from a response's X-RateLimit-* headers."""
+        if not headers:
+            return
+        now = time.monotonic()
+        try:
+            # Learn the bucket first, so a 429 and the limits below land on the shared limiter
+            bucket_id = headers.get("X-RateLimit-Bucket")
+            if bucket_id and self._route_buckets.get(route) != bucket_id:
+                self._route_buckets[route] = bucket_id
+                while len(self._route_buckets) > self.MAX_ROUTES:
+                    self._route_buckets.popitem(last=False)
             
-            if time_since_last < self.min_interval:
-                wait_time = self.min_interval - time_since_last
-                await asyncio.sleep(wait_time)
+            if status == 429:
+                self.stats["rate_limited"] += 1
+                retry_after = float(headers.get("Retry-After", 1.0))
+                if headers.get("X-RateLimit-Global") == "true" or headers.get("X-RateLimit-Scope") == "global":
+                    self._global.block(retry_after, now)
+                    logger.warning(f"Global rate limit hit - pausing all sends for {retry_after:.1f}s")
+                else:
+                    self._bucket(route).block(retry_after, now)
             
-            self.last_api_call = asyncio.get_event_loop().time()
+            if "X-RateLimit-Limit" in headers and "X-RateLimit-Remaining" in headers:
+                self._bucket(route).sync(
+                    int(headers["X-RateLimit-Limit"]),
+                    int(headers["X-RateLimit-Remaining"]),
+                    float(headers.get("X-RateLimit-Reset-After", self.DEFAULT_ROUTE_LIMIT[1])),
+                    now
+                )
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Ignoring malformed rate limit headers for {route}: {e}")
+
+# ★ Shared cooldown service - token buckets per (feature, user), (feature, channel) and global
+class CooldownService:
+    """
+    Token-bucket cooldowns shared by all cogs.
+    
+    A feature configures up to three scopes ("user", "channel", "global"), each allowing
+    `rate` uses per `per` seconds. A full bucket is indistinguishable from no bucket, so
+    buckets are dropped as soon as they refill (checked lazily, plus an amortized sweep).
+    """
+    
+    SCOPES = ("user", "channel", "global")
+    SWEEP_EVERY = 1024  # Operations between sweeps of refilled buckets
+    
+    def __init__(self):
+        self._rules: Dict[str, Dict[str, Tuple[int, float]]] = {}  # feature -> scope -> (rate, per)
+        self._buckets: Dict[Tuple[str, str, int], List[float]] = {}  # (feature, scope, id) -> [tokens, updated_at]
+        self._ops = 0
+    
+    def configure(self, feature: str, scope: str, rate: int, per: float):
+        """Allow `rate` uses per `per` seconds for a feature in one scope."""
+        if scope not in self.SCOPES:
+            raise ValueError(f"Unknown cooldown scope: {scope}")
+        self._rules.setdefault(feature, {})[scope] = (rate, per)
+    
+    def _keys(self, feature: str, user_id: Optional[int], channel_id: Optional[int]):
+        ids = {"user": user_id, "channel": channel_id, "global": 0}
+        for scope, (rate, per) in self._rules.get(feature, {}).items():
+            if ids[scope] is not None:
+                yield (feature, scope, ids[scope]), rate, per
+    
+    def _tokens(self, key, rate: int, per: float, now: float) -> float:
+        """Current tokens for a bucket, dropping it if it has fully refilled."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(rate)
+        tokens = min(rate, bucket[0] + (now - bucket[1]) * rate / per)
+        if tokens >= rate:
+            del self._buckets[key]
+        return tokens
+    
+    def try_acquire(self, feature: str, user_id: Optional[int] = None, channel_id: Optional[int] = None) -> bool:
+        """Take one token from every configured scope, or none if any scope is empty."""
+        now = time.monotonic()
+        self._maybe_sweep(now)
+        
+        keys = list(self._keys(feature, user_id, channel_id))
+        levels = [(key, rate, self._tokens(key, rate, per, now)) for key, rate, per in keys]
+        if any(tokens < 1 for _, _, tokens in levels):
+            return False
+        for key, rate, tokens in levels:
+            self._buckets[key] = [tokens - 1, now]
+        return True
+    
+    def retry_after(self, feature: str, user_id: Optional[int] = None, channel_id: Optional[int] = None) -> float:
+        """Seconds until try_acquire would succeed (0.0 if it would succeed now)."""
+        now = time.monotonic()
+        wait = 0.0
+        for key, rate, per in self._keys(feature, user_id, channel_id):
+            tokens = self._tokens(key, rate, per, now)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) * per / rate)
+        return wait
+    
+    def reset(self, feature: str, user_id: Optional[int] = None, channel_id: Optional[int] = None):
+        """Refill a feature's buckets (e.g. when a request failed before doing any work)."""
+        for key, _, _ in list(self._keys(feature, user_id, channel_id)):
+            self._buckets.pop(key, None)
+    
+    def _maybe_sweep(self, now: float):
+        self._ops += 1
+        if self._ops % self.SWEEP_EVERY:
+            return
+        for key in list(self._buckets):
+            feature, scope, _ = key
+            rule = self._rules.get(feature, {}).get(scope)
+            if rule is None:
+                del self._buckets[key]
+            else:
+                self._tokens(key, rule[0], rule[1], now)
+    
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+# ★ Central message router - channel id / DM user id -> owning game or session
+class MessageRouter:
+    """
+    Index of which games and sessions want which messages.
+    
+    Guild messages are looked up by channel ID and DMs by author ID, so each message
+    costs one dict lookup and only its owners' handlers run (each in its own task, like
+    listeners). Owners are names such as "unscramble"; one channel can have several.
+    Handlers still validate their own state, and may remove a route that went stale.
+    """
+    
+    INBOX_SIZE = 500  # Messages an inbox holds before new ones are dropped
+    
+    def __init__(self):
+        self._channels: Dict[int, Dict[str, Callable]] = {}
+        self._dm_users: Dict[int, Dict[str, Callable]] = {}
+        self.stats = {"routed": 0, "unrouted": 0, "errors": 0}
+    
+    @staticmethod
+    def _add(index: Dict, key: int, owner: str, handler: Callable):
+        index.setdefault(key, {})[owner] = handler
+    
+    @staticmethod
+    def _remove(index: Dict, key: int, owner: str):
+        handlers = index.get(key)
+        if handlers is not None:
+            handlers.pop(owner, None)
+            if not handlers:
+                del index[key]
+    
+    def add_channel(self, channel_id: int, owner: str, handler: Callable):
+        """Send messages from a guild channel to `handler` (an async function taking the message)."""
+        self._add(self._channels, channel_id, owner, handler)
+    
+    def remove_channel(self, channel_id: int, owner: str):
+        self._remove(self._channels, channel_id, owner)
+    
+    def add_dm(self, user_id: int, owner: str, handler: Callable):
+        """Send a user's DMs to `handler`."""
+        self._add(self._dm_users, user_id, owner, handler)
+    
+    def remove_dm(self, user_id: int, owner: str):
+        self._remove(self._dm_users, user_id, owner)
+    
+    def remove_owner(self, owner: str):
+        """Drop every route belonging to `owner` (used when its cog unloads)."""
+        for index in (self._channels, self._dm_users):
+            for key in [key for key, handlers in index.items() if owner in handlers]:
+                self._remove(index, key, owner)
+    
+    def open_inbox(self, channel_id: int, owner: str) -> asyncio.Queue:
+        """
+        Route a channel's messages into a queue, for game loops that collect submissions.
+        Close it with close_inbox when the loop ends.
+        """
+        inbox = asyncio.Queue(self.INBOX_SIZE)
+        
+        async def deliver(message):
+            if not inbox.full():
+                inbox.put_nowait(message)
+        
+        deliver.inbox = inbox
+        self.add_channel(channel_id, owner, deliver)
+        return inbox
+    
+    def close_inbox(self, channel_id: int, owner: str, inbox: asyncio.Queue):
+        """Stop routing to `inbox` - unless the route has since been taken over (e.g. by a reloaded cog)."""
+        handler = self._channels.get(channel_id, {}).get(owner)
+        if getattr(handler, "inbox", None) is inbox:
+            self.remove_channel(channel_id, owner)
+    
+    def dispatch(self, message):
+        """Start the handlers that own this message. Does not wait for them."""
+        if message.author.bot:
+            return
+        if message.guild is None:
+            handlers = self._dm_users.get(message.author.id)
+        else:
+            handlers = self._channels.get(message.channel.id)
+        if not handlers:
+            self.stats["unrouted"] += 1
+            return
+        self.stats["routed"] += 1
+        for owner, handler in list(handlers.items()):
+            asyncio.create_task(self._run(owner, handler, message))
+    
+    async def _run(self, owner: str, handler: Callable, message):
+        try:
+            await handler(message)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Error in {owner} message handler: {e}")
+    
+    def __len__(self) -> int:
+        return len(self._channels) + len(self._dm_users)
+
+# ★ Startup gate - commands sent while cogs are still loading wait for their cog instead of failing
+class StartupGate:
+    """
+    Readiness tracking for startup, plus a buffer for commands that arrive too early.
+    
+    Until load_cogs finishes, a prefix command that doesn't exist yet is held (at most
+    BUFFER_SIZE messages, each for at most BUFFER_DEADLINE seconds). Each time a cog
+    loads, held messages whose command now exists are replayed in arrival order. Anything
+    still held when loading finishes was never a real command and is dropped.
+    """
+    
+    BUFFER_SIZE = 50  # Held commands before new ones are turned away
+    BUFFER_DEADLINE = 60.0  # Seconds a held command waits before it is given up on
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.started_at = time.monotonic()
+        self.ready_at: Optional[float] = None
+        self.cogs: Dict[str, str] = {}  # Cog name -> "waiting" | "loading" | "ready" | "lazy" | "failed" | "skipped" | "missing"
+        self._held: deque = deque()  # (held at, command name, message)
+        self.stats = {"held": 0, "replayed": 0, "expired": 0, "turned_away": 0, "dropped": 0}
+    
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+    
+    def set_cog_status(self, name: str, status: str):
+        self.cogs[name] = status
+    
+    async def hold(self, message) -> bool:
+        """Hold `message` if it's a command whose cog hasn't loaded yet. Returns True if it was held."""
+        if self.ready or message.author.bot:
+            return False
+        ctx = await self.bot.get_context(message)
+        if ctx.prefix is None or not ctx.invoked_with or ctx.command is not None:
+            return False
+        
+        self._expire()
+        if len(self._held) >= self.BUFFER_SIZE:
+            self.stats["turned_away"] += 1
+            asyncio.create_task(self._notify(message, "🌙 Nyx is still waking up - try that again in a moment."))
+            return True
+        self._held.append((time.monotonic(), ctx.invoked_with, message))
+        self.stats["held"] += 1
+        return True
+    
+    def cog_ready(self, name: str, status: str = "ready"):
+        """Mark a cog loaded (or deferred) and replay the held commands it now answers."""
+        self.set_cog_status(name, status)
+        self._expire()
+        still_held = deque()
+        for entry in self._held:
+            if self.bot.get_command(entry[1]) is None:
+                still_held.append(entry)
+            else:
+                self.stats["replayed"] += 1
+                asyncio.create_task(self._replay(entry[2]))
+        self._held = still_held
+    
+    def finish(self):
+        """Open the gate - commands run directly from now on."""
+        self._expire()
+        self.stats["dropped"] += len(self._held)
+        self._held.clear()
+        self.ready_at = time.monotonic()
+        logger.info(
+            f"🚦 Ready after {self.ready_at - self.started_at:.1f}s - "
+            f"{self.stats['replayed']} early commands replayed, {self.stats['expired']} expired, "
+            f"{self.stats['dropped']} unknown dropped"
+        )
+    
+    def _expire(self):
+        cutoff = time.monotonic() - self.BUFFER_DEADLINE
+        while self._held and self._held[0][0] < cutoff:
+            _, _, message = self._held.popleft()
+            self.stats["expired"] += 1
+            asyncio.create_task(self._notify(message, "🌙 Nyx took too long to wake up - please try that again."))
+    
+    async def _replay(self, message):
+        try:
+            await self.bot.process_commands(message)
+        except Exception as e:
+            logger.error(f"Error replaying held command: {e}")
+    
+    async def _notify(self, message, text: str):
+        try:
+            await self.bot.safe_send(message.channel, text, priority=Priority.INTERACTIVE)
+        except Exception as e:
+            logger.error(f"Error notifying held command: {e}")
+    
+    def status(self) -> Dict:
+        """Readiness snapshot for the health command."""
+        now = time.monotonic()
+        return {
+            "ready": self.ready,
+            "startup_seconds": (self.ready_at or now) - self.started_at,
+            "cogs": dict(self.cogs),
+            "held_now": len(self._held),
+            **self.stats,
+        }
 
 # ★ Create bot with MINIMAL intents
 intents = discord.Intents.default()
@@ -99,54 +497,147 @@ intents.presences = False
 intents.typing = False
 intents.voice_states = False
 
+# ★ Every API response (not just errors) keeps the rate limiter in step with Discord's buckets
+async def on_http_response(session, trace_ctx, params):
+    """aiohttp trace hook: learn limits from X-RateLimit-* headers on successful sends and reactions."""
+    if params.response.status >= 400:
+        return  # Error responses are handled (with their status) where the call failed
+    route = RouteRateLimiter.route_for(params.method, params.url.path)
+    if route is not None:
+        bot.rate_limiter.update_from_headers(route, params.response.headers, params.response.status)
+
+http_trace = aiohttp.TraceConfig()
+http_trace.on_request_end.append(on_http_response)
+
 bot = commands.Bot(
     command_prefix="!", 
     intents=intents,
-    help_command=None  # Disable default help to prevent conflicts
+    help_command=None,  # Disable default help to prevent conflicts
+    http_trace=http_trace
 )
 
 # ★ Add rate limiter IMMEDIATELY
-bot.rate_limiter = GlobalRateLimiter()
+bot.rate_limiter = RouteRateLimiter()
+bot.cooldowns = CooldownService()
+bot.router = MessageRouter()
+bot.startup = StartupGate(bot)
 
 # ★ ULTRA-SAFE message sender
-async def safe_send_message(channel, content=None, embed=None):
-    """Ultra-safe message sender with maximum protection."""
-    try:
-        # Wait for rate limit
-        await bot.rate_limiter.wait_if_needed()
-        
-        # Make API call with additional safety delay
-        await asyncio.sleep(0.1)  # Extra safety delay before each send
-        
-        if embed and content:
-            return await channel.send(content=content, embed=embed)
-        elif embed:
-            return await channel.send(embed=embed)
-        elif content:
-            return await channel.send(content=content)
-        else:
-            return None
+async def deliver_message(channel, content=None, embed=None, view=None) -> SendResult:
+    """
+    Send one message, respecting the channel's rate limit bucket. Run by the outbound workers.
+    
+    A 429 is retried after its Retry-After (plus jitter) until SEND_RETRY_DEADLINE; other
+    failures are reported straight away. The result tells the caller which case it was.
+    """
+    route = f"channel:{getattr(channel, 'id', None)}"
+    deadline = time.monotonic() + SEND_RETRY_DEADLINE
+    attempts = 0
+    bucket_wait = 0.0
+    latency = 0.0
+    
+    def finish(result: SendResult) -> SendResult:
+        # Timings for the delivery metrics
+        result.bucket_wait = bucket_wait
+        result.latency = latency
+        return result
+    
+    while True:
+        attempts += 1
+        call_started = time.monotonic()
+        try:
+            # Wait for this channel's bucket (other channels are not held up)
+            await bot.rate_limiter.acquire(route)
+            bucket_wait += time.monotonic() - call_started
+            call_started = time.monotonic()
+            
+            send_kwargs = {}
+            if content:
+                send_kwargs['content'] = content
+            if embed:
+                send_kwargs['embed'] = embed
+            if not send_kwargs:
+                return SendResult(SendStatus.DROPPED)
+            if view:
+                send_kwargs['view'] = view  # Components ride along with the message, never alone
+            message = await channel.send(**send_kwargs)
+            latency = time.monotonic() - call_started
+            return finish(SendResult(SendStatus.SENT, message, attempts=attempts))
             
+        except discord.HTTPException as e:
+            latency = time.monotonic() - call_started
+            headers = getattr(e.response, 'headers', None)
+            bot.rate_limiter.update_from_headers(route, headers, e.status)
+            if e.status == 429:  # Rate limited - the bucket is now blocked until Retry-After
+                try:
+                    retry_after = float((headers or {}).get("Retry-After", 1.0))
+                except (TypeError, ValueError):
+                    retry_after = 1.0
+                delay = random.uniform(0, SEND_RETRY_JITTER)
+                if time.monotonic() + retry_after + delay > deadline:
+                    logger.error(f"RATE LIMITED on {route} after {attempts} attempt(s) - giving up: {e}")
+                    return finish(SendResult(SendStatus.RATE_LIMITED, retry_after=retry_after, attempts=attempts))
+                logger.warning(f"RATE LIMITED on {route} - retrying in {retry_after + delay:.2f}s")
+                # Jitter spreads out retries that were all blocked by the same reset
+                await asyncio.sleep(delay)
+                continue
+            elif e.status in [403, 404]:
+                logger.warning(f"Cannot send message (403/404): {e}")
+                return finish(SendResult(SendStatus.FORBIDDEN, attempts=attempts))
+            else:
+                logger.error(f"HTTP error: {e}")
+                return finish(SendResult(SendStatus.FAILED, attempts=attempts))
+        except Exception as e:
+            logger.error(f"Unexpected error in safe_send: {e}")
+            return finish(SendResult(SendStatus.FAILED, attempts=attempts))
+
+# ★ Delivery metrics - per-module/per-channel outcomes and wait/latency histograms (see !sendstats)
+bot.send_metrics = nyxoutbound.SendMetrics()
+
+# ★ Outbound dispatcher - per-channel FIFOs, bounded worker pool, priority classes
+bot.outbound = nyxoutbound.OutboundDispatcher(deliver_message, metrics=bot.send_metrics)
+
+async def safe_send_message(channel, content=None, embed=None, priority: Priority = Priority.NORMAL, view=None) -> SendResult:
+    """Queue a message (optionally with a discord.ui.View) and wait for it to be sent (the Message is on `result.message`)."""
+    source = nyxoutbound.caller_source()
+    if not (content or embed):
+        result = SendResult(SendStatus.DROPPED)
+        bot.send_metrics.record(source, getattr(channel, 'id', None), result)
+        return result
+    return await bot.outbound.submit(channel, priority, source, content=content, embed=embed, view=view)
+
+# Add to bot
+bot.safe_send = safe_send_message
+
+# ★ Coalescer - merges bursts of game feedback to one channel into a single message
+bot.coalescer = nyxoutbound.OutboundCoalescer(bot.outbound)
+
+async def deliver_reaction(message, emoji) -> SendResult:
+    """Add one reaction, respecting the channel's reaction bucket. Run by the reaction scheduler."""
+    route = f"reaction:{getattr(message.channel, 'id', None)}"
+    try:
+        await bot.rate_limiter.acquire(route)
+        await message.add_reaction(emoji)
+        return SendResult(SendStatus.SENT, message)
     except discord.HTTPException as e:
-        if e.status == 429:  # Rate limited
-            logger.error(f"RATE LIMITED: {e}")
-            # Don't retry - just fail silently
-            return None
+        bot.rate_limiter.update_from_headers(route, getattr(e.response, 'headers', None), e.status)
+        if e.status == 429:
+            logger.warning(f"RATE LIMITED adding reaction on {route}: {e}")
+            return SendResult(SendStatus.RATE_LIMITED)
         elif e.status in [403, 404]:
-            logger.warning(f"Cannot send message (403/404): {e}")
-            return None
-        else:
-            logger.error(f"HTTP error: {e}")
-            return None
+            return SendResult(SendStatus.FORBIDDEN)
+        logger.error(f"HTTP error adding reaction: {e}")
+        return SendResult(SendStatus.FAILED)
     except Exception as e:
-        logger.error(f"Unexpected error in safe_send: {e}")
-        return None
+        logger.error(f"Unexpected error adding reaction: {e}")
+        return SendResult(SendStatus.FAILED)
 
-# Add to bot
-bot.safe_send = safe_send_message
+# ★ Reaction scheduler - reactions are queued and paced per channel, never awaited by callers
+bot.reactions = nyxoutbound.ReactionScheduler(deliver_reaction)
 
 # ★ Track if cogs are already loaded
 bot._cogs_loaded = False
+bot.cog_load_times: Dict[str, float] = {}  # Extension name -> seconds its load took
 
 # ★ MINIMAL event handlers
 @bot.event
@@ -157,15 +648,37 @@ async def on_ready():
     # CRITICAL: Only load cogs ONCE
     if not bot._cogs_loaded:
         logger.info("🔄 Loading cogs for the first time...")
-        await load_cogs()
+        try:
+            await load_cogs()
+        finally:
+            bot.startup.finish()
         bot._cogs_loaded = True
         logger.info("✅ Cogs loaded successfully!")
+        
+        # Register slash commands (once per start - syncing is itself rate limited)
+        try:
+            synced = await bot.tree.sync()
+            logger.info(f"✅ Synced {len(synced)} slash commands")
+        except Exception as e:
+            logger.error(f"Failed to sync slash commands: {e}")
     else:
         logger.info("ℹ️ Bot reconnected - cogs already loaded")
 
+@bot.event
+async def on_message(message):
+    """Hand the message to whichever game or session owns it, then run commands (held until their cog loads)."""
+    bot.router.dispatch(message)
+    if await bot.startup.hold(message):
+        return
+    await bot.process_commands(message)
+
 @bot.event
 async def on_command_error(ctx, error):
     """Minimal error handler."""
+    # Commands for a cog that is loading on first use run once it has loaded
+    if isinstance(error, commands.CommandNotFound) and await bot.lazy_cogs.recover(ctx):
+        return
+    
     # Ignore common non-errors
     if isinstance(error, (commands.CommandNotFound, commands.DisabledCommand)):
         return
@@ -180,8 +693,169 @@ async def on_command_error(ctx, error):
         pass
 
 # ★ CONSERVATIVE cog loader
+# ★ Cogs to load, with the cogs each one needs loaded first (they look them up in cog_load)
+COG_DEPENDENCIES = {
+    "memory.py": [],
+    "nyxtasks.py": [],
+    "comfort.py": [],
+    "prefixgame.py": [],
+    "unscramble.py": ["memory.py"],
+    "wordhunt.py": ["memory.py"],
+    "workshop.py": [],
+    "asylumchat.py": [],
+    "alliteration.py": ["memory.py"],
+    "asknyx.py": [],
+    "qotd.py": [],
+}
+
+def resolve_cog(filename: str) -> Tuple[Optional[str], str]:
+    """Find a cog file and return (extension name, path) - name is None if the file is missing."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    # Try cogs/ subdirectory first (local development)
+    cog_path = os.path.join(script_dir, "cogs", filename)
+    if os.path.exists(cog_path):
+        return f"cogs.{filename[:-3]}", cog_path
+    
+    # If not found, try root directory (Render deployment)
+    cog_path = os.path.join(script_dir, filename)
+    if os.path.exists(cog_path):
+        return filename[:-3], cog_path  # Just the module name without cogs prefix
+    return None, cog_path
+
+def dependency_order(dependencies: Dict[str, List[str]]) -> List[str]:
+    """Topological order of the cog manifest; raises ValueError on a cycle or an undeclared dependency."""
+    order: List[str] = []
+    state: Dict[str, str] = {}  # filename -> "visiting" | "done"
+    
+    def visit(filename: str, path: List[str]):
+        if state.get(filename) == "done":
+            return
+        if state.get(filename) == "visiting":
+            raise ValueError(f"Cog dependency cycle: {' -> '.join(path + [filename])}")
+        if filename not in dependencies:
+            raise ValueError(f"Unknown cog dependency: {filename} (needed by {path[-1]})")
+        state[filename] = "visiting"
+        for dependency in dependencies[filename]:
+            visit(dependency, path + [filename])
+        state[filename] = "done"
+        order.append(filename)
+    
+    for filename in dependencies:
+        visit(filename, [])
+    return order
+
+# ★ Rarely used cogs - only placeholder commands at startup, the real cog loads on first use
+LAZY_COG_LOADING = os.getenv("NYX_LAZY_COGS", "true").lower() in ("1", "true", "yes")
+LAZY_COGS = {
+    "workshop.py": ["monday", "tuesday", "thursday", "friday", "weekend", "weekendsubmit"],
+    "asknyx.py": ["asknyx", "asknyxstats"],
+    "alliteration.py": ["alliterations", "alliteration", "allit", "allitcheck"],
+}
+# Warm-restart snapshots (in STORAGE_PATH/snapshots) a lazy cog resumes in cog_load - if one exists, load it at startup
+LAZY_COG_SNAPSHOTS = {
+    "alliteration.py": "alliteration_games.json",
+}
+
+class LazyCogs:
+    """
+    Placeholder commands standing in for cogs that haven't been imported yet.
+    
+    The first invocation removes the placeholders, loads the real extension (its imports,
+    word lists and stores) and runs the message again against the real command. If loading
+    fails the placeholders go back, so a later use can try again. Commands that arrive while
+    a cog is mid-activation find no command at all; on_command_error hands them to recover().
+    """
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._filenames = {name: filename for filename, names in LAZY_COGS.items() for name in names}
+        self.activated: Dict[str, float] = {}  # Filename -> seconds its first-use load took
+        self.deferred = set()  # Filenames currently standing in as placeholders
+    
+    @staticmethod
+    def has_snapshot(filename: str) -> bool:
+        """True if the cog left state behind that its cog_load needs to resume."""
+        snapshot = LAZY_COG_SNAPSHOTS.get(filename)
+        return snapshot is not None and os.path.exists(os.path.join(STORAGE_PATH, "snapshots", snapshot))
+    
+    def deferred_filename(self, extension: str) -> Optional[str]:
+        """The deferred cog file for an extension name such as "cogs.workshop", if it is still deferred."""
+        for filename in self.deferred:
+            if extension in (filename[:-3], f"cogs.{filename[:-3]}"):
+                return filename
+        return None
+    
+    def defer(self, filename: str):
+        """Register placeholder commands for a cog instead of loading it."""
+        self.deferred.add(filename)
+        for name in LAZY_COGS[filename]:
+            self.bot.add_command(commands.Command(self._placeholder(filename), name=name, hidden=True))
+    
+    def _placeholder(self, filename: str) -> Callable:
+        async def placeholder(ctx):
+            if await self.activate(filename):
+                await self.bot.process_commands(ctx.message)
+            else:
+                await safe_send_message(ctx.channel, "❌ That feature isn't available right now.")
+        return placeholder
+    
+    async def activate(self, filename: str) -> bool:
+        """Load a deferred cog now. Returns True once it is loaded."""
+        async with self._locks.setdefault(filename, asyncio.Lock()):
+            if filename in self.activated:
+                return True
+            # Same rule as the eager loader: never load a cog whose dependencies didn't load
+            missing = [dependency for dependency in COG_DEPENDENCIES.get(filename, [])
+                       if self.bot.startup.cogs.get(dependency[:-3]) != "ready"]
+            if missing:
+                logger.error(f"❌ Not activating {filename}: dependencies not loaded: {', '.join(missing)}")
+                return False
+            cog_name, cog_path = resolve_cog(filename)
+            if cog_name is None:
+                logger.warning(f"⚠️ Cog file not found: {cog_path}")
+                return False
+            
+            for name in LAZY_COGS[filename]:
+                self.bot.remove_command(name)
+            modules_before = len(sys.modules)
+            started = time.monotonic()
+            try:
+                await self.bot.load_extension(cog_name)
+            except Exception as e:
+                logger.error(f"❌ Failed to activate {cog_name}: {e}")
+                logger.error(traceback.format_exc())
+                self.defer(filename)
+                return False
+            
+            elapsed = time.monotonic() - started
+            self.deferred.discard(filename)
+            self.activated[filename] = elapsed
+            self.bot.cog_load_times[cog_name] = elapsed
+            self.bot.startup.set_cog_status(filename[:-3], "ready")
+            logger.info(f"⚡ Activated {cog_name} on first use in {elapsed:.2f}s (+{len(sys.modules) - modules_before} modules)")
+            return True
+    
+    async def recover(self, ctx) -> bool:
+        """Rerun a command that arrived while its cog was activating. Returns False if it didn't."""
+        lock = self._locks.get(self._filenames.get(ctx.invoked_with))
+        if lock is None or not lock.locked():
+            return False
+        async with lock:
+            pass
+        if self.bot.get_command(ctx.invoked_with) is not None:
+            await self.bot.process_commands(ctx.message)
+        return True
+
+bot.lazy_cogs = LazyCogs(bot)
+
 async def load_cogs():
-    """Load cogs with maximum safety and delays."""
+    """
+    Load every cog concurrently, each one as soon as the cogs it depends on have loaded.
+    Startup takes as long as the slowest dependency chain; per-cog times land in bot.cog_load_times.
+    With LAZY_COG_LOADING, the cogs in LAZY_COGS only get placeholder commands here (unless they have a snapshot to resume).
+    """
     
     # DEBUG: Log environment info for troubleshooting
     logger.info(f"📂 Script location: {os.path.abspath(__file__)}")
@@ -192,52 +866,66 @@ async def load_cogs():
     else:
         logger.error("❌ Cogs directory not found!")
     
-    cog_files = [
-        "memory.py", "nyxtasks.py", "comfort.py", "prefixgame.py", 
-        "unscramble.py", "wordhunt.py", "workshop.py", "asylumchat.py", "alliteration.py", "asknyx.py", "qotd.py"
-    ]
+    try:
+        order = dependency_order(COG_DEPENDENCIES)
+    except ValueError as e:
+        logger.error(f"❌ Invalid cog manifest: {e}")
+        return
     
-    loaded = 0
+    started = time.monotonic()
+    loads: Dict[str, asyncio.Task] = {}
     
-    for filename in cog_files:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Try cogs/ subdirectory first (local development)
-        cog_path = os.path.join(script_dir, "cogs", filename)
-        cog_name = f"cogs.{filename[:-3]}"
-        
-        # If not found, try root directory (Render deployment)
-        if not os.path.exists(cog_path):
-            cog_path = os.path.join(script_dir, filename)
-            cog_name = filename[:-3]  # Just the module name without cogs prefix
+    async def load_one(filename: str) -> bool:
+        status_name = filename[:-3]
+        for dependency in COG_DEPENDENCIES[filename]:
+            if not await loads[dependency]:
+                logger.error(f"❌ Skipping {filename}: dependency {dependency} did not load")
+                bot.startup.set_cog_status(status_name, "skipped")
+                return False
         
+        cog_name, cog_path = resolve_cog(filename)
         logger.debug(f"🔍 Checking for cog file: {cog_path}")
-        
-        if not os.path.exists(cog_path):
+        if cog_name is None:
             logger.warning(f"⚠️ Cog file not found: {cog_path}")
-            continue
+            bot.startup.set_cog_status(status_name, "missing")
+            return False
+        
+        if LAZY_COG_LOADING and filename in LAZY_COGS:
+            if not bot.lazy_cogs.has_snapshot(filename):
+                bot.lazy_cogs.defer(filename)
+                logger.info(f"💤 Deferred: {cog_name} (loads on first !{LAZY_COGS[filename][0]})")
+                bot.startup.cog_ready(status_name, "lazy")
+                return True
+            logger.info(f"📸 {cog_name} has a snapshot to resume - loading it now")
         
         try:
-            # LONG delay between each cog
-            if loaded > 0:
-                logger.info(f"⏳ Waiting 5 seconds before loading {cog_name}...")
-                await asyncio.sleep(5.0)  # 5 second delay!
-            
             logger.info(f"🔄 Loading cog: {cog_name}")
+            bot.startup.set_cog_status(status_name, "loading")
+            load_started = time.monotonic()
             await bot.load_extension(cog_name)
-            logger.info(f"✅ Loaded: {cog_name}")
-            loaded += 1
-            
-            # Small delay after successful load
-            await asyncio.sleep(1.0)
-            
+            bot.cog_load_times[cog_name] = time.monotonic() - load_started
+            logger.info(f"✅ Loaded: {cog_name} ({bot.cog_load_times[cog_name]:.2f}s)")
+            bot.startup.cog_ready(status_name)
+            return True
         except Exception as e:
             logger.error(f"❌ Failed to load {cog_name}: {e}")
             logger.error(traceback.format_exc())
-            # Wait even after failures
-            await asyncio.sleep(2.0)
+            bot.startup.set_cog_status(status_name, "failed")
+            return False
+    
+    # Created in dependency order so every task's dependencies already have tasks to await
+    for filename in order:
+        bot.startup.set_cog_status(filename[:-3], "waiting")
+        loads[filename] = asyncio.create_task(load_one(filename))
+    results = await asyncio.gather(*loads.values())
     
-    logger.info(f"🎯 Loaded {loaded}/{len(cog_files)} cogs")
+    loaded = sum(1 for ok in results if ok)
+    deferred = sum(1 for status in bot.startup.cogs.values() if status == "lazy")
+    slowest = sorted(bot.cog_load_times.items(), key=lambda item: item[1], reverse=True)[:3]
+    logger.info(
+        f"🎯 Loaded {loaded}/{len(COG_DEPENDENCIES)} cogs ({deferred} deferred) in {time.monotonic() - started:.2f}s "
+        f"(slowest: {', '.join(f'{name} {seconds:.2f}s' for name, seconds in slowest) or 'none'})"
+    )
 
 # ★ MINIMAL help command
 @bot.command(name='nyxhelp')
@@ -256,8 +944,8 @@ async def nyx_help(ctx):
 `!easywordhunt` / `!hardwordhunt` - Word hunt
 
 **💬 Chat**
-`!dmcomfort` - Support chat
-`!asylumchat` - Multi-personality chat
+`!dmcomfort` or `/dmcomfort` - Support chat
+`!asylumchat` or `/asylumchat` - Multi-personality chat
 `!asknyx [question]` - Ask questions with web search
 
 **📝 Workshop**
@@ -283,6 +971,15 @@ async def emergency_restart(ctx):
 async def reload_cog(ctx, cog_name: str):
     """Reload a specific cog."""
     try:
+        # A deferred cog was never loaded - activate it instead
+        deferred = bot.lazy_cogs.deferred_filename(cog_name)
+        if deferred is not None:
+            if await bot.lazy_cogs.activate(deferred):
+                await safe_send_message(ctx.channel, f"✅ Loaded deferred cog {cog_name}")
+            else:
+                await safe_send_message(ctx.channel, f"❌ Failed to load deferred cog {cog_name}")
+            return
+        
         await bot.reload_extension(cog_name)
         await safe_send_message(ctx.channel, f"✅ Reloaded {cog_name}")
         logger.info(f"Reloaded cog: {cog_name}")
@@ -290,6 +987,104 @@ async def reload_cog(ctx, cog_name: str):
         await safe_send_message(ctx.channel, f"❌ Failed to reload {cog_name}: {e}")
         logger.error(f"Failed to reload {cog_name}: {e}")
 
+@bot.command(name='sendstats', hidden=True)
+@commands.has_permissions(administrator=True)
+async def send_stats(ctx):
+    """Admin command to show message delivery metrics."""
+    try:
+        metrics = bot.send_metrics
+        queue_wait = metrics.queue_wait.summary()
+        api_latency = metrics.api_latency.summary()
+        uptime_minutes = (time.time() - metrics.started_at) / 60
+        
+        embed = discord.Embed(
+            title="📬 Send Stats",
+            description=f"Last {uptime_minutes:.0f} minutes - **{sum(metrics.outcomes.values())}** sends, **{metrics.retries}** retries",
+            color=NYX_COLOR
+        )
+        embed.add_field(
+            name="Outcomes",
+            value="\n".join(f"{outcome}: **{count}**" for outcome, count in metrics.outcomes.items()),
+            inline=True
+        )
+        embed.add_field(
+            name="Queue Wait",
+            value=f"avg {queue_wait['avg']:.2f}s\np50 ≤{queue_wait['p50']:.2f}s\np95 ≤{queue_wait['p95']:.2f}s\nmax {queue_wait['max']:.2f}s",
+            inline=True
+        )
+        embed.add_field(
+            name="API Latency",
+            value=f"avg {api_latency['avg']:.2f}s\np50 ≤{api_latency['p50']:.2f}s\np95 ≤{api_latency['p95']:.2f}s\nmax {api_latency['max']:.2f}s",
+            inline=True
+        )
+        embed.add_field(
+            name="Top Senders",
+            value="\n".join(f"{source}: **{total}** ({failed} not sent)" for source, total, failed in metrics.top(metrics.by_source)) or "None",
+            inline=False
+        )
+        embed.add_field(
+            name="Top Channels",
+            value="\n".join(
+                f"{'other' if channel_id == 'other' else f'<#{channel_id}>'}: **{total}** ({failed} not sent)"
+                for channel_id, total, failed in metrics.top(metrics.by_channel)
+            ) or "None",
+            inline=False
+        )
+        dispatcher = bot.outbound.get_stats()
+        embed.add_field(
+            name="Queue by Priority",
+            value="\n".join(
+                f"{name}: **{stats['sent']}** sent, {stats['failed']} failed, {stats['dropped']} dropped - "
+                f"wait avg {stats['avg_wait']:.2f}s, max {stats['max_wait']:.2f}s"
+                for name, stats in dispatcher.items()
+            ),
+            inline=False
+        )
+        queued = sum(stats["queued"] for stats in dispatcher.values())
+        embed.set_footer(text=f"Queued now: {queued} messages, {bot.reactions.queue_depth()} reactions")
+        await safe_send_message(ctx.channel, embed=embed)
+    except Exception as e:
+        logger.error(f"Error in sendstats: {e}")
+
+@bot.command(name='health', hidden=True)
+@commands.has_permissions(administrator=True)
+async def health(ctx):
+    """Admin command to show startup readiness and service health."""
+    try:
+        status = bot.startup.status()
+        state = "🟢 Ready" if status["ready"] else "🟡 Starting"
+        embed = discord.Embed(
+            title="🩺 Health",
+            description=f"{state} - startup took {status['startup_seconds']:.1f}s, gateway latency {bot.latency * 1000:.0f}ms",
+            color=NYX_COLOR
+        )
+        cog_lines = []
+        for name, cog_status in status["cogs"].items():
+            seconds = bot.cog_load_times.get(f"cogs.{name}", bot.cog_load_times.get(name))
+            cog_lines.append(f"{name}: **{cog_status}**" + (f" ({seconds:.2f}s)" if seconds is not None else ""))
+        embed.add_field(name="Cogs", value="\n".join(cog_lines) or "None", inline=True)
+        embed.add_field(
+            name="Early Commands",
+            value=(
+                f"held now: **{status['held_now']}** (of {status['held']})\nreplayed: **{status['replayed']}**\n"
+                f"expired: **{status['expired']}**\nturned away: **{status['turned_away']}**\n"
+                f"dropped: **{status['dropped']}**"
+            ),
+            inline=True
+        )
+        depth = bot.outbound.queue_depth()
+        embed.add_field(
+            name="Services",
+            value=(
+                f"routes: **{len(bot.router)}**\nrouter errors: **{bot.router.stats['errors']}**\n"
+                f"queued messages: **{sum(depth.values())}**\nqueued reactions: **{bot.reactions.queue_depth()}**"
+            ),
+            inline=True
+        )
+        await safe_send_message(ctx.channel, embed=embed)
+    except Exception as e:
+        logger.error(f"Error in health: {e}")
+
 # ★ SIMPLIFIED main function
 async def main():
     """Start the bot with maximum safety."""
@@ -0,0 +1,480 @@
+# nyxoutbound.py
+# Outbound message delivery for bot.safe_send: per-channel FIFOs drained by a
+# bounded worker pool, with priority classes so interactive replies go first,
+# a coalescer that merges bursts of similar game feedback into one message, and a
+# reaction scheduler so emoji reactions never block the code that asks for them.
+import asyncio
+import heapq
+import itertools
+import logging
+import sys
+import time
+from collections import OrderedDict, deque
+from enum import IntEnum
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger("nyxoutbound")
+
+OUTBOUND_WORKERS = 8               # Concurrent sends across all channels
+MAX_QUEUED_PER_CHANNEL = 100       # Messages waiting per channel before new ones are dropped
+COALESCE_WINDOW = 0.75             # Seconds a coalesced message waits for others to merge with
+MAX_EMBED_DESCRIPTION = 4096       # Discord's embed description limit
+MAX_MESSAGE_LENGTH = 2000          # Discord's message content limit
+REACTION_MAX_ATTEMPTS = 3          # Tries per reaction when Discord answers 429
+MAX_TRACKED_CHANNELS = 256         # Channels with their own send counters (least recent fold into "other")
+MAX_TRACKED_SOURCES = 64           # Same for sending modules
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # Histogram upper bounds in seconds
+
+class Priority(IntEnum):
+    """Send priority - lower goes first."""
+    INTERACTIVE = 0  # DM comfort replies, game feedback
+    NORMAL = 1       # Command responses
+    BULK = 2         # Nudges, payouts, background announcements
+
+class SendStatus(IntEnum):
+    """How a send ended."""
+    SENT = 0
+    RATE_LIMITED = 1  # Still 429 after retrying until the deadline
+    FORBIDDEN = 2     # 403/404 - the channel is gone or we cannot post there
+    FAILED = 3        # Any other error, e.g. a rejected embed
+    DROPPED = 4       # Never attempted: queue full or nothing to send
+
+class SendResult:
+    """
+    Outcome of bot.safe_send. Truthy only when the message went out, so `if result:`
+    keeps working; `should_fallback` says whether a plain-text retry could help.
+    """
+    __slots__ = ("status", "message", "retry_after", "attempts", "bucket_wait", "latency")
+
+    def __init__(self, status: SendStatus, message=None, retry_after: float = 0.0, attempts: int = 0):
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+        self.attempts = attempts
+        self.bucket_wait = 0.0  # Time spent waiting on rate limit buckets
+        self.latency = 0.0      # Duration of the last API call
+
+    def __bool__(self) -> bool:
+        return self.status == SendStatus.SENT
+
+    def __repr__(self) -> str:
+        return f"SendResult({self.status.name}, attempts={self.attempts}, retry_after={self.retry_after:.2f})"
+
+    @property
+    def rate_limited(self) -> bool:
+        return self.status == SendStatus.RATE_LIMITED
+
+    @property
+    def should_fallback(self) -> bool:
+        """A text fallback only makes sense when the payload itself was the problem."""
+        return self.status == SendStatus.FAILED
+
+def caller_source(depth: int = 2) -> str:
+    """Short name of the module that called into the send path, e.g. "wordhunt" for cogs.wordhunt."""
+    try:
+        frame = sys._getframe(depth)
+    except ValueError:
+        return "unknown"
+    # Skip our own frames and asyncio's (a send started with create_task has no cog frame above it)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module != __name__ and not module.startswith("asyncio"):
+            return module.rsplit(".", 1)[-1] or "unknown"
+        frame = frame.f_back
+    return "unknown"
+
+class Histogram:
+    """Fixed-bucket latency histogram (constant memory)."""
+    __slots__ = ("counts", "total", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        index = 0
+        while index < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.total += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of observations (never above the max seen)."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(LATENCY_BUCKETS[index], self.max) if index < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": self.max,
+        }
+
+class SendMetrics:
+    """
+    Bounded in-memory registry of delivery metrics: outcome counts per sending module
+    and per channel, queue-wait and API-latency histograms, and why sends did not go
+    out. Channel and module tables keep their most recent entries and fold the rest
+    into "other", so memory stays flat however many channels the bot talks in.
+    """
+
+    def __init__(self, max_channels: int = MAX_TRACKED_CHANNELS, max_sources: int = MAX_TRACKED_SOURCES):
+        self._max_channels = max_channels
+        self._max_sources = max_sources
+        self.by_source: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self.by_channel: "OrderedDict[int, Dict[str, int]]" = OrderedDict()
+        self.outcomes = {status.name.lower(): 0 for status in SendStatus}
+        self.queue_wait = Histogram()
+        self.api_latency = Histogram()
+        self.retries = 0
+        self.started_at = time.time()
+
+    @staticmethod
+    def _count(table: OrderedDict, key, limit: int, outcome: str):
+        counters = table.get(key)
+        if counters is None:
+            while len(table) - ("other" in table) >= limit:
+                oldest = next(existing for existing in table if existing != "other")
+                other = table.setdefault("other", {})
+                for name, value in table.pop(oldest).items():
+                    other[name] = other.get(name, 0) + value
+            counters = table[key] = {}
+        else:
+            table.move_to_end(key)
+        counters[outcome] = counters.get(outcome, 0) + 1
+
+    def record(self, source: str, channel_id, result: SendResult, queue_wait: float = 0.0):
+        """Record one finished (or dropped) send."""
+        outcome = result.status.name.lower()
+        self.outcomes[outcome] += 1
+        self._count(self.by_source, source or "unknown", self._max_sources, outcome)
+        self._count(self.by_channel, channel_id, self._max_channels, outcome)
+        if result.status != SendStatus.DROPPED:
+            self.queue_wait.observe(queue_wait + result.bucket_wait)
+            self.api_latency.observe(result.latency)
+            self.retries += max(0, result.attempts - 1)
+
+    def top(self, table: OrderedDict, count: int = 5) -> List[Tuple[object, int, int]]:
+        """(key, total, not sent) for the busiest entries of a table."""
+        rows = []
+        for key, counters in table.items():
+            total = sum(counters.values())
+            rows.append((key, total, total - counters.get("sent", 0)))
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows[:count]
+
+class _Job:
+    __slots__ = ("channel", "kwargs", "priority", "future", "enqueued_at", "source")
+
+    def __init__(self, channel, kwargs: Dict, priority: Priority, future: asyncio.Future, source: str = None):
+        self.channel = channel
+        self.kwargs = kwargs
+        self.priority = priority
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.source = source
+
+class OutboundDispatcher:
+    """
+    Queues outbound messages in one FIFO per channel and sends them from a bounded
+    worker pool. A channel is handed to at most one worker at a time, so its messages
+    stay in order; among ready channels, the one whose next message has the highest
+    priority is served first.
+    """
+
+    def __init__(self, send_func: Callable[..., Awaitable], workers: int = OUTBOUND_WORKERS,
+                 max_queued_per_channel: int = MAX_QUEUED_PER_CHANNEL, metrics: SendMetrics = None):
+        self._send_func = send_func
+        self.metrics = metrics
+        self._worker_count = workers
+        self._max_queued = max_queued_per_channel
+        self._queues: Dict[int, Deque[_Job]] = {}
+        self._scheduled: Set[int] = set()  # Channels in the ready queue or being served
+        self._ready: "asyncio.PriorityQueue | None" = None
+        self._workers = []
+        self._seq = itertools.count()
+        self.stats = {
+            priority.name.lower(): {"sent": 0, "failed": 0, "dropped": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for priority in Priority
+        }
+
+    def _ensure_workers(self):
+        # Started lazily: the dispatcher is built before the event loop runs
+        if self._ready is None:
+            self._ready = asyncio.PriorityQueue()
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self._worker_count:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def submit(self, channel, priority: Priority = Priority.NORMAL, source: str = None, **kwargs) -> SendResult:
+        """Queue a message for a channel and wait for the send result. `source` names the sender for metrics."""
+        self._ensure_workers()
+        channel_id = getattr(channel, "id", None)
+        queue = self._queues.setdefault(channel_id, deque())
+        if len(queue) >= self._max_queued:
+            self.stats[priority.name.lower()]["dropped"] += 1
+            logger.warning(f"Outbound queue full for channel {channel_id} - dropping {priority.name} message")
+            result = SendResult(SendStatus.DROPPED)
+            if self.metrics:
+                self.metrics.record(source, channel_id, result)
+            return result
+
+        job = _Job(channel, kwargs, priority, asyncio.get_running_loop().create_future(), source)
+        queue.append(job)
+        if channel_id not in self._scheduled:
+            self._scheduled.add(channel_id)
+            self._ready.put_nowait((job.priority, next(self._seq), channel_id))
+        return await job.future
+
+    async def _worker(self):
+        while True:
+            _, _, channel_id = await self._ready.get()
+            queue = self._queues.get(channel_id)
+            if not queue:
+                self._scheduled.discard(channel_id)
+                self._queues.pop(channel_id, None)
+                continue
+
+            job = queue.popleft()
+            waited = time.monotonic() - job.enqueued_at
+            stats = self.stats[job.priority.name.lower()]
+            stats["wait_total"] += waited
+            stats["wait_max"] = max(stats["wait_max"], waited)
+            try:
+                result = await self._send_func(job.channel, **job.kwargs)
+            except Exception as e:
+                logger.error(f"Unexpected error delivering to channel {channel_id}: {e}")
+                result = SendResult(SendStatus.FAILED)
+            stats["sent" if result.status == SendStatus.SENT else "failed"] += 1
+            if self.metrics:
+                self.metrics.record(job.source, channel_id, result, waited)
+            if not job.future.done():
+                job.future.set_result(result)
+
+            if queue:
+                self._ready.put_nowait((queue[0].priority, next(self._seq), channel_id))
+            else:
+                self._scheduled.discard(channel_id)
+                self._queues.pop(channel_id, None)
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Messages waiting right now, by priority."""
+        depth = {priority.name.lower(): 0 for priority in Priority}
+        for queue in self._queues.values():
+            for job in queue:
+                depth[job.priority.name.lower()] += 1
+        return depth
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-priority sent/failed/dropped counts, average and max queue wait, and current depth."""
+        depth = self.queue_depth()
+        return {
+            name: {
+                "sent": stats["sent"],
+                "failed": stats["failed"],
+                "dropped": stats["dropped"],
+                "avg_wait": stats["wait_total"] / (stats["sent"] + stats["failed"]) if stats["sent"] + stats["failed"] else 0.0,
+                "max_wait": stats["wait_max"],
+                "queued": depth[name],
+            }
+            for name, stats in self.stats.items()
+        }
+
+class _Batch:
+    __slots__ = ("lines", "embed", "title", "priority", "future", "source")
+
+    def __init__(self, priority: Priority, future: asyncio.Future, source: str = None):
+        self.lines = []
+        self.embed = None
+        self.title = None
+        self.priority = priority
+        self.future = future
+        self.source = source
+
+class OutboundCoalescer:
+    """
+    Merges bursts of similar messages to one channel into a single send.
+
+    Each contribution has a short text line and optionally the embed it would have
+    sent alone. The first contribution for a (channel, key) opens a window; when it
+    closes, a lone contribution goes out unchanged, and several go out as one message
+    whose lines are de-duplicated (as an embed built from the last one, if any had an
+    embed). If the embed is rejected, the lines are sent as plain text instead, so
+    callers do not need their own fallbacks.
+    """
+
+    def __init__(self, dispatcher: OutboundDispatcher, window: float = COALESCE_WINDOW):
+        self._dispatcher = dispatcher
+        self._window = window
+        self._batches: Dict[tuple, _Batch] = {}
+        self.stats = {"contributions": 0, "sends": 0}
+
+    async def send(self, channel, key: str, line: str, embed=None, title: str = None,
+                   priority: Priority = Priority.INTERACTIVE):
+        """
+        Contribute to the channel's pending batch for `key` and wait for it to be sent.
+
+        Args:
+            channel: Destination channel
+            key: Kind of message; only contributions with the same key are merged
+            line: This contribution's text when merged (or sent as plain text)
+            embed: Embed to send if this contribution ends up alone
+            title: Embed title to use when several contributions are merged
+            priority: Outbound priority of the merged message
+        """
+        self.stats["contributions"] += 1
+        batch_key = (getattr(channel, "id", None), key)
+        batch = self._batches.get(batch_key)
+        if batch is None:
+            batch = self._batches[batch_key] = _Batch(priority, asyncio.get_running_loop().create_future(), caller_source())
+            asyncio.create_task(self._flush_later(batch_key, channel))
+        if line not in batch.lines:
+            batch.lines.append(line)
+        if embed is not None:
+            batch.embed = embed
+        if title:
+            batch.title = title
+        batch.priority = min(batch.priority, priority)
+        return await asyncio.shield(batch.future)
+
+    async def _flush_later(self, batch_key: tuple, channel):
+        await asyncio.sleep(self._window)
+        batch = self._batches.pop(batch_key)
+        self.stats["sends"] += 1
+        try:
+            result = SendResult(SendStatus.DROPPED)
+            text = "\n".join(batch.lines)
+            if batch.embed is not None:
+                embed = batch.embed
+                if len(batch.lines) > 1:
+                    embed = batch.embed.copy()
+                    embed.description = text[:MAX_EMBED_DESCRIPTION]
+                    if batch.title:
+                        embed.title = batch.title
+                result = await self._dispatcher.submit(channel, batch.priority, batch.source, embed=embed)
+            if batch.embed is None or result.should_fallback:
+                result = await self._dispatcher.submit(channel, batch.priority, batch.source, content=text[:MAX_MESSAGE_LENGTH])
+        except Exception as e:
+            logger.error(f"Error sending coalesced message for {batch_key}: {e}")
+            result = SendResult(SendStatus.FAILED)
+        if not batch.future.done():
+            batch.future.set_result(result)
+
+class _Reaction:
+    __slots__ = ("message", "emoji", "priority", "group", "attempts")
+
+    def __init__(self, message, emoji: str, priority: Priority, group: Optional[str]):
+        self.message = message
+        self.emoji = emoji
+        self.priority = priority
+        self.group = group
+        self.attempts = 0
+
+class ReactionScheduler:
+    """
+    Adds emoji reactions in the background, one channel at a time per runner.
+
+    `schedule` returns immediately. Each channel with pending reactions has a runner
+    task that adds them in priority order (FIFO within a priority); the react function
+    waits on the channel's reaction bucket, so pacing follows Discord's real limit.
+    The same emoji on the same message is only queued once, and a game can drop its
+    leftover low-priority checkmarks with `cancel_group` when it ends.
+    """
+
+    def __init__(self, react_func: Callable[..., Awaitable], max_queued_per_channel: int = MAX_QUEUED_PER_CHANNEL):
+        self._react = react_func
+        self._max_queued = max_queued_per_channel
+        self._pending: Dict[int, List[Tuple[int, int, _Reaction]]] = {}  # channel -> heap
+        self._queued: Set[Tuple[int, str]] = set()  # (message id, emoji) waiting to be added
+        self._runners: Dict[int, asyncio.Task] = {}
+        self._seq = itertools.count()
+        self.stats = {"added": 0, "deduped": 0, "dropped": 0, "cancelled": 0, "failed": 0}
+
+    def schedule(self, message, emoji: str, priority: Priority = Priority.NORMAL, group: str = None) -> bool:
+        """
+        Queue a reaction without waiting for it.
+
+        Args:
+            message: Message to react to
+            emoji: Emoji to add
+            priority: Order among this channel's pending reactions
+            group: Tag for `cancel_group`, e.g. "prefixgame:<channel id>"
+
+        Returns:
+            bool: False if it was a duplicate or the channel's queue is full
+        """
+        key = (message.id, str(emoji))
+        if key in self._queued:
+            self.stats["deduped"] += 1
+            return False
+
+        channel_id = getattr(message.channel, "id", None)
+        heap = self._pending.setdefault(channel_id, [])
+        if len(heap) >= self._max_queued:
+            self.stats["dropped"] += 1
+            return False
+
+        heapq.heappush(heap, (priority, next(self._seq), _Reaction(message, emoji, priority, group)))
+        self._queued.add(key)
+        if channel_id not in self._runners:
+            self._runners[channel_id] = asyncio.create_task(self._run(channel_id))
+        return True
+
+    def cancel_group(self, group: str, min_priority: Priority = Priority.BULK) -> int:
+        """Drop queued reactions tagged `group` with priority `min_priority` or lower. Returns how many."""
+        cancelled = 0
+        for channel_id, heap in self._pending.items():
+            kept = []
+            for entry in heap:
+                reaction = entry[2]
+                if reaction.group == group and reaction.priority >= min_priority:
+                    self._queued.discard((reaction.message.id, str(reaction.emoji)))
+                    cancelled += 1
+                else:
+                    kept.append(entry)
+            if len(kept) != len(heap):
+                heapq.heapify(kept)
+                heap[:] = kept
+        self.stats["cancelled"] += cancelled
+        return cancelled
+
+    async def _run(self, channel_id: int):
+        heap = self._pending[channel_id]
+        try:
+            while heap:
+                _, _, reaction = heapq.heappop(heap)
+                key = (reaction.message.id, str(reaction.emoji))
+                reaction.attempts += 1
+                try:
+                    result = await self._react(reaction.message, reaction.emoji)
+                except Exception as e:
+                    logger.error(f"Unexpected error adding reaction in channel {channel_id}: {e}")
+                    result = SendResult(SendStatus.FAILED)
+
+                if result.rate_limited and reaction.attempts < REACTION_MAX_ATTEMPTS:
+                    # Same priority, back of the line; the bucket is already blocked until the reset
+                    heapq.heappush(heap, (reaction.priority, next(self._seq), reaction))
+                    continue
+                self._queued.discard(key)
+                self.stats["added" if result else "failed"] += 1
+        finally:
+            self._runners.pop(channel_id, None)
+            if not heap:
+                self._pending.pop(channel_id, None)
+
+    def queue_depth(self) -> int:
+        """Reactions waiting right now across all channels."""
+        return sum(len(heap) for heap in self._pending.values())
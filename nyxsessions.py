@@ -0,0 +1,479 @@
+# nyxsessions.py
+# Shared session helpers: the bot.active_sessions registry, history retention,
+# per-session journals and warm-restart snapshots of in-memory session/game state.
+import os
+import sys
+import json
+import gzip
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from datetime import datetime, timezone
+from enum import IntEnum
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+ARCHIVE_INDEX_FILE = "index.json"
+SNAPSHOT_MAX_AGE = 900  # Seconds a warm-restart snapshot stays valid
+SESSION_IDLE_TTLS = {"comfort": 3600, "asylumchat": 1800}  # Idle seconds before a session is closed, by type
+DEFAULT_SESSION_IDLE_TTL = 1800
+MAX_ACTIVE_SESSIONS = 1000  # Hard cap; the least recently used session is evicted past it
+
+# ★ Message records
+# Session transcripts keep one MessageRecord per turn in memory; the dict shape
+# ({"user"|"bot": text, "timestamp": iso, ...}) only exists on disk.
+
+class Role(IntEnum):
+    USER = 0
+    BOT = 1
+
+class MessageRecord:
+    """One session turn. Slotted, with an epoch timestamp and interned speaker names."""
+    __slots__ = ("role", "text", "timestamp", "speaker_id", "speaker_name")
+
+    def __init__(self, role: Role, text: str, timestamp: Optional[float] = None,
+                 speaker_id: Optional[int] = None, speaker_name: Optional[str] = None):
+        self.role = role
+        self.text = text
+        # Float, not int - saved timestamps keep their microseconds, so ISO strings compare and sort as before
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.speaker_id = speaker_id
+        self.speaker_name = sys.intern(speaker_name) if speaker_name else None
+
+    @classmethod
+    def user(cls, text: str, speaker_id: Optional[int] = None, speaker_name: Optional[str] = None) -> "MessageRecord":
+        return cls(Role.USER, text, speaker_id=speaker_id, speaker_name=speaker_name)
+
+    @classmethod
+    def bot(cls, text: str) -> "MessageRecord":
+        return cls(Role.BOT, text)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MessageRecord":
+        """Build a record from the persisted dict shape."""
+        timestamp = None
+        if data.get("timestamp"):
+            try:
+                timestamp = datetime.fromisoformat(data["timestamp"]).timestamp()
+            except (TypeError, ValueError):
+                pass
+        if "user" in data:
+            return cls(Role.USER, data["user"], timestamp, data.get("user_id"), data.get("user_name"))
+        return cls(Role.BOT, data.get("bot", ""), timestamp)
+
+    def to_dict(self) -> Dict:
+        """Persisted dict shape, matching what the history files have always held."""
+        data = {
+            "user" if self.role is Role.USER else "bot": self.text,
+        }
+        if self.speaker_id is not None:
+            data["user_id"] = self.speaker_id
+        if self.speaker_name is not None:
+            data["user_name"] = self.speaker_name
+        data["timestamp"] = datetime.fromtimestamp(self.timestamp, timezone.utc).isoformat()
+        return data
+
+    def __repr__(self) -> str:
+        return f"MessageRecord({self.role.name}, {self.text[:30]!r})"
+
+def records_from_dicts(messages: List[Dict]) -> List[MessageRecord]:
+    return [MessageRecord.from_dict(message) for message in messages]
+
+# ★ Session registry
+
+class SessionRegistry(MutableMapping):
+    """
+    Drop-in replacement for the bot.active_sessions dict.
+
+    Reading a session by key counts as activity. Sessions idle past their type's TTL
+    are reported by expired_keys() so the owning cog can persist and close them, and
+    once max_sessions is exceeded the least recently used session is evicted and
+    queued for its cog to persist (see drain_evicted()).
+    """
+
+    def __init__(self, idle_ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = DEFAULT_SESSION_IDLE_TTL, max_sessions: int = MAX_ACTIVE_SESSIONS):
+        self._sessions: "OrderedDict[Hashable, Dict]" = OrderedDict()  # LRU order, most recent last
+        self._last_seen: Dict[Hashable, float] = {}
+        self._evicted: List[Tuple[Hashable, Dict]] = []
+        self.idle_ttls = dict(SESSION_IDLE_TTLS if idle_ttls is None else idle_ttls)
+        self.default_ttl = default_ttl
+        self.max_sessions = max_sessions
+        self.counters = {"expired": 0, "evicted": 0}
+
+    def __getitem__(self, key):
+        session = self._sessions[key]
+        self.touch(key)
+        return session
+
+    def __setitem__(self, key, session: Dict):
+        self._sessions[key] = session
+        self.touch(key)
+        while len(self._sessions) > self.max_sessions:
+            old_key, old_session = self._sessions.popitem(last=False)
+            self._last_seen.pop(old_key, None)
+            self._evicted.append((old_key, old_session))
+            self.counters["evicted"] += 1
+
+    def __delitem__(self, key):
+        del self._sessions[key]
+        self._last_seen.pop(key, None)
+
+    def __contains__(self, key) -> bool:
+        return key in self._sessions
+
+    def __iter__(self):
+        return iter(self._sessions)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    # Views and peek() read without counting as activity (sweeps, snapshots, metrics)
+    def keys(self):
+        return self._sessions.keys()
+
+    def items(self):
+        return self._sessions.items()
+
+    def values(self):
+        return self._sessions.values()
+
+    def peek(self, key, default=None):
+        return self._sessions.get(key, default)
+
+    def touch(self, key):
+        """Mark a session as active now."""
+        self._last_seen[key] = time.monotonic()
+        self._sessions.move_to_end(key)
+
+    def idle_seconds(self, key) -> float:
+        return time.monotonic() - self._last_seen.get(key, time.monotonic())
+
+    def expired_keys(self, session_type: str) -> List[Hashable]:
+        """Keys of sessions of one type that have been idle longer than their TTL."""
+        ttl = self.idle_ttls.get(session_type, self.default_ttl)
+        now = time.monotonic()
+        expired = [
+            key for key, session in self._sessions.items()
+            if session.get("type") == session_type and now - self._last_seen.get(key, now) > ttl
+        ]
+        self.counters["expired"] += len(expired)
+        return expired
+
+    def drain_evicted(self, session_type: str) -> List[Tuple[Hashable, Dict]]:
+        """Take the evicted sessions of one type so their cog can persist them."""
+        drained = [(key, session) for key, session in self._evicted if session.get("type") == session_type]
+        self._evicted = [(key, session) for key, session in self._evicted if session.get("type") != session_type]
+        return drained
+
+    def stats(self) -> Dict[str, Any]:
+        """Size metrics for logging and admin commands."""
+        by_type: Dict[str, int] = {}
+        message_count = 0
+        for session in self._sessions.values():
+            session_type = session.get("type", "unknown")
+            by_type[session_type] = by_type.get(session_type, 0) + 1
+            message_count += len(session.get("messages", []))
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "by_type": by_type,
+            "messages_held": message_count,
+            "pending_evicted": len(self._evicted),
+            **self.counters,
+        }
+
+def ensure_session_registry(bot) -> SessionRegistry:
+    """Get bot.active_sessions, creating it (or upgrading a plain dict) as a SessionRegistry."""
+    sessions = getattr(bot, "active_sessions", None)
+    if not isinstance(sessions, SessionRegistry):
+        registry = SessionRegistry()
+        for key, session in (sessions or {}).items():
+            registry[key] = session
+        bot.active_sessions = registry
+    return bot.active_sessions
+
+def split_for_retention(history: Dict[str, List[Dict]], keep_last: int) -> Tuple[Dict[str, List[Dict]], List[Tuple[str, Dict]]]:
+    """
+    Split a history file's contents into what stays hot and what gets archived.
+
+    Args:
+        history: {user_id/channel_id: [session, ...]} as stored on disk
+        keep_last: Sessions to keep per key in the hot file
+
+    Returns:
+        Tuple of (hot_history, [(key, archived_session), ...])
+    """
+    hot_history = {}
+    archived = []
+    for key, sessions in history.items():
+        if len(sessions) > keep_last:
+            cutoff = len(sessions) - keep_last
+            archived.extend((key, session) for session in sessions[:cutoff])
+            sessions = sessions[cutoff:]
+        hot_history[key] = sessions
+    return hot_history, archived
+
+def archive_partition(session: Dict) -> str:
+    """Monthly partition name for a session, based on when it ended."""
+    ended_at = session.get("ended_at") or ""
+    return ended_at[:7] if len(ended_at) >= 7 else "unknown"
+
+def archive_sessions(archive_dir: str, archived: List[Tuple[str, Dict]]) -> int:
+    """
+    Append sessions to gzip JSONL segments (one per month) and update the index.
+    Blocking - run it in a thread.
+
+    Returns:
+        Number of sessions archived
+    """
+    if not archived:
+        return 0
+
+    os.makedirs(archive_dir, exist_ok=True)
+    index = load_archive_index(archive_dir)
+
+    by_segment: Dict[str, List[Tuple[str, Dict]]] = {}
+    for key, session in archived:
+        by_segment.setdefault(archive_partition(session), []).append((key, session))
+
+    for partition, rows in by_segment.items():
+        segment = f"{partition}.jsonl.gz"
+        # Appending creates a new gzip member; readers see one continuous stream
+        with gzip.open(os.path.join(archive_dir, segment), "at", encoding="utf-8") as f:
+            for key, session in rows:
+                f.write(json.dumps({"key": key, "session": session}, separators=(",", ":"), ensure_ascii=False))
+                f.write("\n")
+
+        entry = index.setdefault(segment, {"sessions": 0, "keys": {}, "first_ended_at": None, "last_ended_at": None})
+        entry["sessions"] += len(rows)
+        for key, session in rows:
+            entry["keys"][key] = entry["keys"].get(key, 0) + 1
+            ended_at = session.get("ended_at")
+            if ended_at:
+                if not entry["first_ended_at"] or ended_at < entry["first_ended_at"]:
+                    entry["first_ended_at"] = ended_at
+                if not entry["last_ended_at"] or ended_at > entry["last_ended_at"]:
+                    entry["last_ended_at"] = ended_at
+
+    save_archive_index(archive_dir, index)
+    return len(archived)
+
+def load_archive_index(archive_dir: str) -> Dict:
+    """Load the archive index ({segment: stats}), or an empty one."""
+    index_file = os.path.join(archive_dir, ARCHIVE_INDEX_FILE)
+    if os.path.exists(index_file):
+        try:
+            with open(index_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+def save_archive_index(archive_dir: str, index: Dict):
+    """Atomically write the archive index."""
+    index_file = os.path.join(archive_dir, ARCHIVE_INDEX_FILE)
+    temp_file = index_file + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    os.replace(temp_file, index_file)
+
+# ★ Per-session journals
+# Each session appends its turns to journals/<name>.jsonl as they happen. Ending a
+# session only appends one metadata line to the commit log; fold_journals() later
+# merges committed journals into the hot history file.
+
+def journal_name(key: str, started_at: datetime) -> str:
+    """Journal file name for a session."""
+    return f"{key}-{int(started_at.timestamp() * 1000)}.jsonl"
+
+def append_jsonl(path: str, record: Dict):
+    """Append one JSON line to a file. Blocking - run it in a thread."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+        f.write("\n")
+
+def read_jsonl(path: str) -> List[Dict]:
+    """Read a JSON lines file, skipping a torn final line left by a crash."""
+    rows = []
+    if not os.path.exists(path):
+        return rows
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue
+    return rows
+
+def read_journal(journal_dir: str, name: str) -> Tuple[Dict, List[Dict]]:
+    """
+    Read a session journal.
+
+    Returns:
+        Tuple of (header, messages) - header is {} if the session never got one
+    """
+    header = {}
+    messages = []
+    for row in read_jsonl(os.path.join(journal_dir, name)):
+        if "start" in row:
+            header = row["start"]
+        else:
+            messages.append(row)
+    return header, messages
+
+def _folded_session(commit: Dict, messages: List[Dict], keep_messages: int) -> Dict:
+    return {
+        "mode": commit.get("mode", "unknown"),
+        "messages": messages[-keep_messages:],
+        "ended_at": commit.get("ended_at"),
+        "duration": commit.get("duration"),
+        "end_reason": commit.get("end_reason", "unknown"),
+        "message_count": len([msg for msg in messages if "user" in msg]),
+        "journal": commit.get("journal"),
+    }
+
+def fold_journals(history: Dict[str, List[Dict]], journal_dir: str, commit_log: str,
+                  active_journals: Set[str], keep_messages: int) -> Tuple[Dict[str, List[Dict]], List[str]]:
+    """
+    Merge committed sessions (and journals orphaned by a crash) into history.
+    Idempotent: sessions already in history are skipped. Blocking - run it in a thread.
+
+    Args:
+        history: Hot history contents, updated in place
+        journal_dir: Directory holding session journals
+        commit_log: Append-only log of ended-session metadata
+        active_journals: Journals of sessions still running (left alone)
+        keep_messages: Messages kept per session in the hot history
+
+    Returns:
+        Tuple of (history, journal names that can now be deleted)
+    """
+    folded_names = []
+    known = {
+        session.get("journal")
+        for sessions in history.values()
+        for session in sessions
+        if session.get("journal")
+    }
+
+    for commit in read_jsonl(commit_log):
+        name = commit.get("journal")
+        if name and name in known:
+            folded_names.append(name)
+            continue
+        messages = read_journal(journal_dir, name)[1] if name else commit.get("messages", [])
+        history.setdefault(commit["key"], []).append(_folded_session(commit, messages, keep_messages))
+        if name:
+            known.add(name)
+            folded_names.append(name)
+
+    # Journals with no commit belong to sessions that never ended cleanly
+    if os.path.isdir(journal_dir):
+        for name in sorted(os.listdir(journal_dir)):
+            if not name.endswith(".jsonl") or name in known or name in active_journals:
+                continue
+            header, messages = read_journal(journal_dir, name)
+            if header.get("key") and messages:
+                ended_at = messages[-1].get("timestamp")
+                history.setdefault(header["key"], []).append(_folded_session({
+                    "mode": header.get("mode", "unknown"),
+                    "ended_at": ended_at,
+                    "end_reason": "interrupted",
+                    "journal": name,
+                }, messages, keep_messages))
+            folded_names.append(name)
+
+    return history, folded_names
+
+def clear_folded(journal_dir: str, commit_log: str, folded_names: List[str]):
+    """Delete folded journals and reset the commit log. Blocking - run it in a thread."""
+    for name in folded_names:
+        try:
+            os.remove(os.path.join(journal_dir, name))
+        except FileNotFoundError:
+            pass
+    if os.path.exists(commit_log):
+        os.remove(commit_log)
+
+def latest_committed_messages(journal_dir: str, commit_log: str, key: str) -> Optional[List[Dict]]:
+    """Messages of the newest committed-but-unfolded session for a key, or None."""
+    for commit in reversed(read_jsonl(commit_log)):
+        if commit.get("key") == key:
+            name = commit.get("journal")
+            return read_journal(journal_dir, name)[1] if name else commit.get("messages", [])
+    return None
+
+# ★ Warm-restart snapshots
+# Session and game dicts hold message records, datetimes, sets, tuples and int-keyed
+# dicts, so they are tagged on the way out and rebuilt exactly on the way back in.
+
+def _encode_state(value):
+    if isinstance(value, MessageRecord):
+        return {"__message__": value.to_dict()}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": [_encode_state(item) for item in value]}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode_state(item) for item in value]}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {key: _encode_state(item) for key, item in value.items()}
+        return {"__items__": [[_encode_state(key), _encode_state(item)] for key, item in value.items()]}
+    if isinstance(value, list):
+        return [_encode_state(item) for item in value]
+    return value
+
+def _decode_state(value):
+    if isinstance(value, list):
+        return [_decode_state(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__message__" in value:
+        return MessageRecord.from_dict(value["__message__"])
+    if "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    if "__set__" in value:
+        return {_decode_state(item) for item in value["__set__"]}
+    if "__tuple__" in value:
+        return tuple(_decode_state(item) for item in value["__tuple__"])
+    if "__items__" in value:
+        return {_decode_state(key): _decode_state(item) for key, item in value["__items__"]}
+    return {key: _decode_state(item) for key, item in value.items()}
+
+def save_snapshot(path: str, state):
+    """Atomically write a warm-restart snapshot. Blocking - run it in a thread."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_file = path + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump({"saved_at": time.time(), "state": _encode_state(state)}, f, ensure_ascii=False)
+    os.replace(temp_file, path)
+
+def load_snapshot(path: str, max_age: float = SNAPSHOT_MAX_AGE):
+    """
+    Read and consume a warm-restart snapshot. Blocking - run it in a thread.
+
+    Returns:
+        The saved state, or None if there is no snapshot or it is too old to trust
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = None
+    finally:
+        # One-shot: a snapshot is never restored twice
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    if not data or time.time() - data.get("saved_at", 0) > max_age:
+        return None
+    return _decode_state(data.get("state"))
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("discord")
+asknyx = pytest.importorskip("cogs.asknyx")
+
+
+@pytest.fixture
+def cog():
+    # The classifier only needs the class's methods, not a bot
+    return asknyx.AskNyx.__new__(asknyx.AskNyx)
+
+
+def recent_history(seconds_ago=30):
+    asked = datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)
+    return [{"question": "q", "answer": "a", "timestamp": asked.isoformat()}]
+
+
+def test_short_follow_up_to_recent_answer_skips_search(cog):
+    assert cog.needs_web_search("why?", recent_history()) == (False, "follow_up")
+
+
+def test_follow_up_outside_window_is_not_treated_as_follow_up(cog):
+    history = recent_history(asknyx.FOLLOW_UP_WINDOW + 60)
+    assert cog.needs_web_search("why?", history)[1] != "follow_up"
+
+
+def test_bare_pronoun_does_not_make_a_follow_up(cog):
+    should_search, reason = cog.needs_web_search("is that safe for dogs to eat", recent_history())
+    assert should_search
+    assert reason != "follow_up"
+
+
+def test_pronoun_question_with_event_still_searches(cog):
+    assert cog.needs_web_search("who won the election and when was it called", recent_history())[0]
+
+
+def test_named_entity_beats_follow_up(cog):
+    assert cog.needs_web_search("and what about Taylor Swift?", recent_history()) == (True, "named_entity")
+
+
+def test_factual_what_is_the_question_searches(cog):
+    assert cog.needs_web_search("what is the population of canada", [])[0]
+
+
+def test_definitions_and_differences_are_timeless(cog):
+    assert cog.needs_web_search("what is a haiku", []) == (False, "timeless")
+    assert cog.needs_web_search("what is the difference between a crow and a raven", []) == (False, "timeless")
+
+
+def test_recency_and_dates_always_search(cog):
+    assert cog.needs_web_search("what is a good laptop right now", []) == (True, "recency")
+    assert cog.needs_web_search("explain what happened in march 2024", []) == (True, "date")
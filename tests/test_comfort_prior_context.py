@@ -0,0 +1,61 @@
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+pytest.importorskip("discord")
+comfort = pytest.importorskip("cogs.comfort")
+import nyxsessions
+
+
+def make_cog(tmp_path, history):
+    cog = comfort.Comfort.__new__(comfort.Comfort)
+    cog.comfort_journal_dir = str(tmp_path / "journals")
+    cog.comfort_commit_log = str(tmp_path / "commits.jsonl")
+    cog._prior_context_cache = OrderedDict()
+    cog.history_reads = 0
+
+    async def load_comfort_history():
+        cog.history_reads += 1
+        return history
+
+    cog.load_comfort_history = load_comfort_history
+    return cog
+
+
+def session(*texts):
+    return {"messages": [nyxsessions.MessageRecord.user(text).to_dict() for text in texts]}
+
+
+def texts(records):
+    return [record.text for record in records]
+
+
+def test_prior_context_is_the_tail_of_the_last_session(tmp_path):
+    cog = make_cog(tmp_path, {"1": [session("old"), session(*[str(n) for n in range(10)])]})
+    prior = asyncio.run(cog.get_prior_context(1))
+    assert texts(prior) == [str(n) for n in range(10)][-comfort.PRIOR_CONTEXT_MESSAGES:]
+
+
+def test_history_file_is_read_once_per_user(tmp_path):
+    cog = make_cog(tmp_path, {"1": [session("hello")]})
+    asyncio.run(cog.get_prior_context(1))
+    asyncio.run(cog.get_prior_context(1))
+    assert cog.history_reads == 1
+
+
+def test_committed_session_replaces_cached_context(tmp_path):
+    cog = make_cog(tmp_path, {})
+    assert asyncio.run(cog.get_prior_context(1)) == []
+
+    cog._remember_prior_context(1, [nyxsessions.MessageRecord.user("just now")])
+    assert texts(asyncio.run(cog.get_prior_context(1))) == ["just now"]
+    assert cog.history_reads == 1
+
+
+def test_prior_context_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(comfort, "PRIOR_CONTEXT_CACHE_USERS", 2)
+    cog = make_cog(tmp_path, {})
+    for user_id in (1, 2, 3):
+        cog._remember_prior_context(user_id, [])
+    assert list(cog._prior_context_cache) == [2, 3]
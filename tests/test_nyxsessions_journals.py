@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+
+import nyxsessions
+
+
+def user_turn(text, at="2026-01-01T00:00:00+00:00"):
+    return {"user": text, "timestamp": at}
+
+
+def start_journal(journal_dir, key, messages, mode="vent"):
+    name = nyxsessions.journal_name(key, datetime(2026, 1, 1, tzinfo=timezone.utc))
+    path = str(journal_dir / name)
+    nyxsessions.append_jsonl(path, {"start": {"key": key, "mode": mode}})
+    for message in messages:
+        nyxsessions.append_jsonl(path, message)
+    return name
+
+
+def commit(commit_log, key, name, mode="vent"):
+    nyxsessions.append_jsonl(str(commit_log), {
+        "key": key, "journal": name, "mode": mode,
+        "ended_at": "2026-01-01T01:00:00+00:00", "end_reason": "user_ended",
+    })
+
+
+def test_split_for_retention_archives_oldest_sessions():
+    history = {"1": [{"n": 1}, {"n": 2}, {"n": 3}], "2": [{"n": 4}]}
+    hot, archived = nyxsessions.split_for_retention(history, keep_last=2)
+    assert hot == {"1": [{"n": 2}, {"n": 3}], "2": [{"n": 4}]}
+    assert archived == [("1", {"n": 1})]
+
+
+def test_committed_journal_folds_into_history(tmp_path):
+    journal_dir, commit_log = tmp_path / "journals", tmp_path / "commits.jsonl"
+    name = start_journal(journal_dir, "1", [user_turn(str(n)) for n in range(5)])
+    commit(commit_log, "1", name)
+
+    history, folded = nyxsessions.fold_journals({}, str(journal_dir), str(commit_log), set(), keep_messages=2)
+    session = history["1"][0]
+    assert [msg["user"] for msg in session["messages"]] == ["3", "4"]
+    assert session["message_count"] == 5
+    assert session["end_reason"] == "user_ended"
+    assert folded == [name]
+
+
+def test_folding_twice_does_not_duplicate_sessions(tmp_path):
+    journal_dir, commit_log = tmp_path / "journals", tmp_path / "commits.jsonl"
+    name = start_journal(journal_dir, "1", [user_turn("hi")])
+    commit(commit_log, "1", name)
+
+    history, _ = nyxsessions.fold_journals({}, str(journal_dir), str(commit_log), set(), keep_messages=10)
+    history, folded = nyxsessions.fold_journals(history, str(journal_dir), str(commit_log), set(), keep_messages=10)
+    assert len(history["1"]) == 1
+    assert folded == [name]
+
+
+def test_orphaned_journal_folds_as_interrupted_but_active_one_is_left(tmp_path):
+    journal_dir, commit_log = tmp_path / "journals", tmp_path / "commits.jsonl"
+    orphan = start_journal(journal_dir, "1", [user_turn("lost", at="2026-01-01T00:05:00+00:00")])
+    active = start_journal(journal_dir, "2", [user_turn("still here")])
+
+    history, folded = nyxsessions.fold_journals({}, str(journal_dir), str(commit_log), {active}, keep_messages=10)
+    assert history["1"][0]["end_reason"] == "interrupted"
+    assert history["1"][0]["ended_at"] == "2026-01-01T00:05:00+00:00"
+    assert "2" not in history
+    assert folded == [orphan]
+
+
+def test_torn_final_line_is_skipped(tmp_path):
+    journal_dir = tmp_path / "journals"
+    name = start_journal(journal_dir, "1", [user_turn("whole")])
+    with open(journal_dir / name, "a", encoding="utf-8") as f:
+        f.write('{"user": "to')
+
+    header, messages = nyxsessions.read_journal(str(journal_dir), name)
+    assert header["key"] == "1"
+    assert [msg["user"] for msg in messages] == ["whole"]
+
+
+def test_latest_committed_messages_prefers_newest_commit(tmp_path):
+    journal_dir, commit_log = tmp_path / "journals", tmp_path / "commits.jsonl"
+    first = start_journal(journal_dir, "1", [user_turn("first")])
+    commit(commit_log, "1", first)
+    second = nyxsessions.journal_name("1", datetime(2026, 1, 2, tzinfo=timezone.utc))
+    nyxsessions.append_jsonl(str(journal_dir / second), user_turn("second"))
+    commit(commit_log, "1", second)
+
+    messages = nyxsessions.latest_committed_messages(str(journal_dir), str(commit_log), "1")
+    assert [msg["user"] for msg in messages] == ["second"]
+    assert nyxsessions.latest_committed_messages(str(journal_dir), str(commit_log), "2") is None
+
+
+def test_clear_folded_removes_journals_and_commit_log(tmp_path):
+    journal_dir, commit_log = tmp_path / "journals", tmp_path / "commits.jsonl"
+    name = start_journal(journal_dir, "1", [user_turn("hi")])
+    commit(commit_log, "1", name)
+
+    nyxsessions.clear_folded(str(journal_dir), str(commit_log), [name])
+    assert not (journal_dir / name).exists()
+    assert not commit_log.exists()
@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+
+import nyxsessions
+
+
+def test_session_state_round_trips_through_a_snapshot(tmp_path):
+    path = str(tmp_path / "snapshots" / "sessions.json")
+    state = {
+        123: {
+            "type": "comfort",
+            "started_at": datetime(2026, 1, 1, 12, 30, 15, 250000, tzinfo=timezone.utc),
+            "messages": [nyxsessions.MessageRecord.user("hi", speaker_id=7, speaker_name="sam"),
+                         nyxsessions.MessageRecord.bot("hello")],
+            "guessed": {"cat", "dog"},
+            "scores": {7: 2},
+            "position": (3, 4),
+        }
+    }
+
+    nyxsessions.save_snapshot(path, state)
+    restored = nyxsessions.load_snapshot(path)
+
+    session = restored[123]
+    assert session["started_at"] == state[123]["started_at"]
+    assert [message.to_dict() for message in session["messages"]] == \
+        [message.to_dict() for message in state[123]["messages"]]
+    assert session["guessed"] == {"cat", "dog"}
+    assert session["scores"] == {7: 2}
+    assert session["position"] == (3, 4)
+
+
+def test_snapshot_is_consumed_on_load(tmp_path):
+    path = str(tmp_path / "sessions.json")
+    nyxsessions.save_snapshot(path, {"a": 1})
+    assert nyxsessions.load_snapshot(path) == {"a": 1}
+    assert nyxsessions.load_snapshot(path) is None
+
+
+def test_stale_snapshot_is_ignored(tmp_path, monkeypatch):
+    path = str(tmp_path / "sessions.json")
+    nyxsessions.save_snapshot(path, {"a": 1})
+    saved_at = nyxsessions.time.time()
+    monkeypatch.setattr(nyxsessions.time, "time", lambda: saved_at + nyxsessions.SNAPSHOT_MAX_AGE + 1)
+    assert nyxsessions.load_snapshot(path) is None
+
+
+def test_corrupt_snapshot_is_ignored_and_removed(tmp_path):
+    path = tmp_path / "sessions.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert nyxsessions.load_snapshot(str(path)) is None
+    assert not path.exists()
@@ -0,0 +1,82 @@
+import asyncio
+import copy
+from types import SimpleNamespace
+
+from nyxoutbound import OutboundCoalescer, Priority, SendResult, SendStatus
+
+CHANNEL = SimpleNamespace(id=10)
+
+
+class Embed:
+    def __init__(self, title, description):
+        self.title = title
+        self.description = description
+
+    def copy(self):
+        return copy.copy(self)
+
+
+class Dispatcher:
+    def __init__(self, statuses=()):
+        self.sent = []
+        self._statuses = list(statuses)
+
+    async def submit(self, channel, priority=Priority.NORMAL, source=None, **kwargs):
+        self.sent.append((priority, kwargs))
+        return SendResult(self._statuses.pop(0) if self._statuses else SendStatus.SENT)
+
+
+def run(dispatcher, *contributions):
+    async def scenario():
+        coalescer = OutboundCoalescer(dispatcher, window=0.01)
+        results = await asyncio.gather(*(coalescer.send(CHANNEL, **kwargs) for kwargs in contributions))
+        return coalescer, results
+
+    return asyncio.run(scenario())
+
+
+def test_lone_contribution_is_sent_unchanged():
+    dispatcher = Dispatcher()
+    embed = Embed("Correct!", "cat")
+    run(dispatcher, {"key": "guess", "line": "cat", "embed": embed})
+    assert dispatcher.sent == [(Priority.INTERACTIVE, {"embed": embed})]
+
+
+def test_burst_is_merged_into_one_embed_with_deduplicated_lines():
+    dispatcher = Dispatcher()
+    original = Embed("Correct!", "dog")
+    coalescer, results = run(
+        dispatcher,
+        {"key": "guess", "line": "cat", "embed": Embed("Correct!", "cat"), "title": "Guesses"},
+        {"key": "guess", "line": "cat"},
+        {"key": "guess", "line": "dog", "embed": original, "priority": Priority.BULK},
+    )
+
+    assert len(dispatcher.sent) == 1
+    merged = dispatcher.sent[0][1]["embed"]
+    assert merged.description == "cat\ndog"
+    assert merged.title == "Guesses"
+    assert original.description == "dog"
+    assert dispatcher.sent[0][0] == Priority.INTERACTIVE
+    assert all(results)
+    assert coalescer.stats == {"contributions": 3, "sends": 1}
+
+
+def test_different_keys_are_not_merged():
+    dispatcher = Dispatcher()
+    run(dispatcher, {"key": "guess", "line": "cat"}, {"key": "hint", "line": "starts with c"})
+    assert sorted(kwargs["content"] for _, kwargs in dispatcher.sent) == ["cat", "starts with c"]
+
+
+def test_rejected_embed_falls_back_to_plain_text():
+    dispatcher = Dispatcher([SendStatus.FAILED])
+    run(dispatcher, {"key": "guess", "line": "cat", "embed": Embed("Correct!", "cat")},
+        {"key": "guess", "line": "dog"})
+    assert dispatcher.sent[-1][1] == {"content": "cat\ndog"}
+
+
+def test_rate_limited_embed_is_not_resent_as_text():
+    dispatcher = Dispatcher([SendStatus.RATE_LIMITED])
+    _, results = run(dispatcher, {"key": "guess", "line": "cat", "embed": Embed("Correct!", "cat")})
+    assert len(dispatcher.sent) == 1
+    assert results[0].rate_limited
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+from nyxoutbound import REACTION_MAX_ATTEMPTS, Priority, ReactionScheduler, SendResult, SendStatus
+
+CHANNEL = SimpleNamespace(id=10)
+
+
+def message(message_id):
+    return SimpleNamespace(id=message_id, channel=CHANNEL)
+
+
+class Recorder:
+    def __init__(self, statuses=()):
+        self.added = []
+        self._statuses = list(statuses)
+
+    async def __call__(self, msg, emoji):
+        self.added.append((msg.id, emoji))
+        return SendResult(self._statuses.pop(0) if self._statuses else SendStatus.SENT)
+
+
+async def drain():
+    # Let the channel runner work through its queue
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def test_reactions_are_added_in_priority_order():
+    async def scenario():
+        react = Recorder()
+        scheduler = ReactionScheduler(react)
+        scheduler.schedule(message(1), "✅", Priority.BULK)
+        scheduler.schedule(message(2), "✅", Priority.BULK)
+        scheduler.schedule(message(3), "🎉", Priority.INTERACTIVE)
+        await drain()
+        return react.added, scheduler.stats
+
+    added, stats = asyncio.run(scenario())
+    assert added == [(3, "🎉"), (1, "✅"), (2, "✅")]
+    assert stats["added"] == 3
+
+
+def test_same_emoji_on_same_message_is_queued_once():
+    async def scenario():
+        react = Recorder()
+        scheduler = ReactionScheduler(react)
+        assert scheduler.schedule(message(1), "✅")
+        assert not scheduler.schedule(message(1), "✅")
+        assert scheduler.schedule(message(1), "❌")
+        await drain()
+        return react.added, scheduler.stats
+
+    added, stats = asyncio.run(scenario())
+    assert added == [(1, "✅"), (1, "❌")]
+    assert stats["deduped"] == 1
+
+
+def test_cancel_group_drops_only_low_priority_reactions_of_that_group():
+    async def scenario():
+        react = Recorder()
+        scheduler = ReactionScheduler(react)
+        scheduler.schedule(message(1), "✅", Priority.BULK, group="game:a")
+        scheduler.schedule(message(2), "🏆", Priority.INTERACTIVE, group="game:a")
+        scheduler.schedule(message(3), "✅", Priority.BULK, group="game:b")
+        cancelled = scheduler.cancel_group("game:a")
+        await drain()
+        return cancelled, react.added
+
+    cancelled, added = asyncio.run(scenario())
+    assert cancelled == 1
+    assert added == [(2, "🏆"), (3, "✅")]
+
+
+def test_rate_limited_reaction_is_retried_then_given_up():
+    async def scenario():
+        react = Recorder([SendStatus.RATE_LIMITED] * 5)
+        scheduler = ReactionScheduler(react)
+        scheduler.schedule(message(1), "✅")
+        await drain()
+        return react.added, scheduler
+
+    added, scheduler = asyncio.run(scenario())
+    assert len(added) == REACTION_MAX_ATTEMPTS
+    assert scheduler.stats["failed"] == 1
+    assert scheduler.queue_depth() == 0
+
+
+def test_full_channel_queue_drops_new_reactions():
+    async def scenario():
+        scheduler = ReactionScheduler(Recorder(), max_queued_per_channel=2)
+        results = [scheduler.schedule(message(n), "✅") for n in range(3)]
+        await drain()
+        return results, scheduler.stats
+
+    results, stats = asyncio.run(scenario())
+    assert results == [True, True, False]
+    assert stats["dropped"] == 1
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("discord")
+asknyx = pytest.importorskip("cogs.asknyx")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(asknyx.time, "time", lambda: now[0])
+    return now
+
+
+def test_normalize_ignores_case_punctuation_and_spacing():
+    assert asknyx.SearchCache.normalize("  What's the  WEATHER?! ") == "what s the weather"
+
+
+def test_trivially_different_queries_share_an_entry(tmp_path, clock):
+    cache = asknyx.SearchCache(str(tmp_path / "cache.json"))
+    cache.put("Who won the game?", "google", "results")
+    assert cache.get("who won the game")["results"] == "results"
+    assert cache.hits == 1
+
+
+def test_entries_expire_after_their_provider_ttl(tmp_path, clock):
+    cache = asknyx.SearchCache(str(tmp_path / "cache.json"))
+    cache.put("query", "duckduckgo", "results")
+
+    clock[0] += asknyx.SEARCH_CACHE_TTLS["duckduckgo"] - 1
+    assert cache.peek("query") is not None
+
+    clock[0] += 1
+    assert cache.get("query") is None
+    assert cache.misses == 1
+
+
+def test_empty_results_use_the_negative_ttl(tmp_path, clock):
+    cache = asknyx.SearchCache(str(tmp_path / "cache.json"))
+    cache.put("query", "google", "")
+    assert cache.peek("query")["results"] == ""
+
+    clock[0] += asknyx.SEARCH_CACHE_NEGATIVE_TTL
+    assert cache.peek("query") is None
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = asknyx.SearchCache(str(tmp_path / "cache.json"), max_entries=2)
+    cache.put("first", "google", "1")
+    cache.put("second", "google", "2")
+    cache.get("first")
+    cache.put("third", "google", "3")
+
+    assert cache.peek("second") is None
+    assert cache.peek("first") is not None
+    assert cache.peek("third") is not None
+
+
+def test_purge_expired_counts_removed_entries(tmp_path, clock):
+    cache = asknyx.SearchCache(str(tmp_path / "cache.json"))
+    cache.put("old", "duckduckgo", "results")
+    clock[0] += asknyx.SEARCH_CACHE_TTLS["duckduckgo"]
+    cache.put("new", "google", "results")
+
+    assert cache.purge_expired() == 1
+    assert cache.peek("new") is not None
+
+
+def test_save_and_load_round_trip_keeps_live_entries(tmp_path, clock):
+    path = str(tmp_path / "cache.json")
+    cache = asknyx.SearchCache(path)
+    cache.put("query", "google", "results", ["https://example.com"])
+    asyncio.run(cache.save())
+
+    restored = asknyx.SearchCache(path)
+    asyncio.run(restored.load())
+    entry = restored.peek("query")
+    assert entry["results"] == "results"
+    assert entry["links"] == ["https://example.com"]
@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+
+from nyxoutbound import Histogram, OutboundDispatcher, Priority, SendMetrics, SendResult, SendStatus
+
+
+def test_percentile_is_never_above_the_slowest_observation():
+    histogram = Histogram()
+    for seconds in (0.01, 0.02, 0.3):
+        histogram.observe(seconds)
+    assert histogram.percentile(0.5) == 0.05
+    assert histogram.percentile(0.95) == 0.3
+    assert histogram.summary()["count"] == 3
+
+
+def test_empty_histogram_reports_zero():
+    assert Histogram().summary() == {"count": 0, "avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+
+
+def test_channel_table_folds_oldest_channels_into_other():
+    metrics = SendMetrics(max_channels=2)
+    for channel_id in (1, 2, 3):
+        metrics.record("games", channel_id, SendResult(SendStatus.SENT))
+    metrics.record("games", 4, SendResult(SendStatus.FAILED))
+
+    assert list(metrics.by_channel) == ["other", 3, 4]
+    assert metrics.by_channel["other"] == {"sent": 2}
+    assert metrics.outcomes["sent"] == 3
+    assert metrics.outcomes["failed"] == 1
+
+
+def test_dropped_sends_are_counted_but_not_timed():
+    metrics = SendMetrics()
+    metrics.record("games", 1, SendResult(SendStatus.DROPPED))
+    assert metrics.outcomes["dropped"] == 1
+    assert metrics.queue_wait.count == 0
+
+
+def test_dispatcher_counts_failed_sends_separately():
+    async def send(channel, **kwargs):
+        return SendResult(SendStatus.SENT if kwargs["content"] == "ok" else SendStatus.FAILED)
+
+    async def scenario():
+        metrics = SendMetrics()
+        dispatcher = OutboundDispatcher(send, workers=1, metrics=metrics)
+        channel = SimpleNamespace(id=1)
+        await dispatcher.submit(channel, Priority.NORMAL, "games", content="ok")
+        await dispatcher.submit(channel, Priority.NORMAL, "games", content="bad")
+        return dispatcher.get_stats()["normal"], metrics
+
+    stats, metrics = asyncio.run(scenario())
+    assert stats["sent"] == 1
+    assert stats["failed"] == 1
+    assert metrics.top(metrics.by_source) == [("games", 2, 1)]
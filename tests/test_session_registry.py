@@ -0,0 +1,68 @@
+import pytest
+
+import nyxsessions
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(nyxsessions.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_idle_sessions_expire_per_type_ttl(clock):
+    registry = nyxsessions.SessionRegistry(idle_ttls={"comfort": 60, "asylumchat": 30})
+    registry[1] = {"type": "comfort"}
+    registry[2] = {"type": "asylumchat"}
+
+    clock[0] += 45
+    assert registry.expired_keys("comfort") == []
+    assert registry.expired_keys("asylumchat") == [2]
+    assert registry.counters["expired"] == 1
+
+
+def test_reading_a_session_counts_as_activity_but_peek_does_not(clock):
+    registry = nyxsessions.SessionRegistry(idle_ttls={"comfort": 60})
+    registry[1] = {"type": "comfort"}
+    registry[2] = {"type": "comfort"}
+
+    clock[0] += 50
+    registry[1]
+    registry.peek(2)
+    clock[0] += 20
+    assert registry.expired_keys("comfort") == [2]
+
+
+def test_least_recently_used_session_is_evicted_past_the_cap(clock):
+    registry = nyxsessions.SessionRegistry(max_sessions=2)
+    registry[1] = {"type": "comfort"}
+    registry[2] = {"type": "asylumchat"}
+    registry[1]
+    registry[3] = {"type": "comfort"}
+
+    assert 2 not in registry
+    assert list(registry) == [1, 3]
+    assert registry.counters["evicted"] == 1
+
+
+def test_drain_evicted_only_takes_one_session_type(clock):
+    registry = nyxsessions.SessionRegistry(max_sessions=1)
+    registry[1] = {"type": "comfort"}
+    registry[2] = {"type": "asylumchat"}
+    registry[3] = {"type": "comfort"}
+
+    assert registry.drain_evicted("comfort") == [(1, {"type": "comfort"})]
+    assert registry.stats()["pending_evicted"] == 1
+    assert registry.drain_evicted("asylumchat") == [(2, {"type": "asylumchat"})]
+    assert registry.drain_evicted("comfort") == []
+
+
+def test_plain_session_dict_is_upgraded_in_place(clock):
+    class Bot:
+        active_sessions = {1: {"type": "comfort"}}
+
+    bot = Bot()
+    registry = nyxsessions.ensure_session_registry(bot)
+    assert isinstance(bot.active_sessions, nyxsessions.SessionRegistry)
+    assert registry.peek(1) == {"type": "comfort"}
+    assert nyxsessions.ensure_session_registry(bot) is registry